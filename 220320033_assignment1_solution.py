@@ -5,15 +5,28 @@ if sys.version_info < (3, 9):
     print("Please upgrade your Python version to 3.9.0 or higher")
     sys.exit()
 
-# Check user packages are installed
-import importlib.util
+# Only run the program when this is the main process, not when the file is imported by a spawned process
+if __name__ == "__main__":
+    # Parse command line options
+    import argparse
 
-if importlib.util.find_spec("pygame_gui") is None:
-    print("pygame_gui is not installed. Please install it using the following command:")
-    print("pip install pygame_gui")
-    sys.exit()
+    parser = argparse.ArgumentParser(description="SIT215 Assignment 1 - Agent Search")
+    parser.add_argument("--frame-log", metavar="PATH",
+                        help="write per-frame phase timings to PATH, as JSON lines if it ends with .jsonl, otherwise CSV")
+    parser.add_argument("--show-frame-times", action="store_true",
+                        help="show the frame timings overlay on startup, it can also be toggled with F3")
+    args = parser.parse_args()
+
+    # Check user packages are installed. To run searches and benchmarks without the GUI, which doesn't need them, use:
+    # python -m src.headless
+    import importlib.util
+
+    if importlib.util.find_spec("pygame_gui") is None:
+        print("pygame_gui is not installed. Please install it using the following command:")
+        print("pip install pygame_gui")
+        sys.exit()
 
-# Run Program
-from src import app
+    # Run Program
+    from src import app
 
-app.run()
+    app.run(args.frame_log, args.show_frame_times)
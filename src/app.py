@@ -4,11 +4,21 @@ import pygame_gui
 from src import maze_loader
 from src.constants import *
 from src.context import Context
+from src.frame_timer import FrameTimer
+from src.ui.frame_timer_overlay import FrameTimerOverlay
 from src.ui.maze_screen import MazeScreen
 from src.ui.select_screen import SelectScreen
 
+# Phases of the main loop that are timed every frame
+FRAME_PHASES = ["events", "searcher.step", "maze_drawer.draw_maze", "maze_drawer.draw_path", "manager.update",
+                "manager.draw_ui", "display.flip"]
 
-def run():
+
+def run(frame_log_path: str = None, show_frame_times: bool = False):
+    """
+    Runs the app until the window is closed. If frame_log_path is given the time spent in each phase of every frame
+    is written to it as CSV, or as JSON lines if it ends with .jsonl
+    """
     pygame.init()
 
     # Create the window and set the size
@@ -30,8 +40,12 @@ def run():
     # Create an instance of UIManager to handle UI elements
     manager = pygame_gui.UIManager(WINDOW_SIZE)
 
+    # Times each phase of the main loop, with an overlay that can be toggled using F3
+    frame_timer = FrameTimer(FRAME_PHASES, frame_log_path)
+    frame_timer_overlay = FrameTimerOverlay(frame_timer, show_frame_times)
+
     # Initialises the app context, for sharing data/instances between screens
-    ctx = Context(surface, manager, select_screen, maze_screen, mazes)
+    ctx = Context(surface, manager, select_screen, maze_screen, mazes, frame_timer, frame_timer_overlay)
 
     # Sets the starting screen
     ctx.set_screen_to(ctx.select_screen)
@@ -41,6 +55,9 @@ def run():
         # Limit FPS, and calculate time delta between frames
         ctx.time_delta = clock.tick(300) / 1000.0
 
+        # Time spent waiting in clock.tick() is not part of the frame
+        frame_timer.begin_frame()
+
         # Set the background colour
         surface.fill(BACKGROUND_COLOUR)
 
@@ -48,12 +65,21 @@ def run():
         ctx.active_screen.run(ctx)
 
         # Process UI elements
-        manager.update(ctx.time_delta)
+        with frame_timer.phase("manager.update"):
+            manager.update(ctx.time_delta)
 
         # Draw the UI
-        manager.draw_ui(surface)
+        with frame_timer.phase("manager.draw_ui"):
+            manager.draw_ui(surface)
+
+        # Draw the frame timings over the top of everything
+        frame_timer_overlay.draw(surface)
 
         # Update window display with what's been drawn
-        pygame.display.flip()
+        with frame_timer.phase("display.flip"):
+            pygame.display.flip()
+
+        frame_timer.end_frame()
 
+    frame_timer.close()
     pygame.quit()
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+from src.searcher import Searcher, SearchStats
+
+# Number of nodes a search expands before giving the event loop a turn. Lower is fairer between searches, higher
+# spends less time switching between them
+DEFAULT_EXPANSIONS_PER_YIELD = 64
+
+
+class AsyncSearch:
+    """
+    Runs one of the search algorithm generators as an awaitable, stepping it like the GUI does but giving the event
+    loop a turn every few expansions instead of every frame, so thousands of searches can share one event loop with
+    each other and with anything else running on it. A search can be cancelled like any other task, and can be given a
+    deadline after which it stops with a TimeoutError
+    """
+    # Searcher the algorithm runs on, holding the path and statistics when done
+    searcher: Searcher
+
+    # Algorithm to run, any of the run functions in src/search or a functools.partial of one
+    algorithm: object
+
+    # Number of expansions between giving the event loop a turn
+    expansions_per_yield: int
+
+    # Event loop time the search has to finish by, None for no deadline
+    deadline: float
+
+    # Number of times the search gave the event loop a turn
+    slices: int
+
+    # Longest time in seconds the search ran without giving the event loop a turn
+    longest_slice: float
+
+    def __init__(self, searcher: Searcher, algorithm, expansions_per_yield: int = DEFAULT_EXPANSIONS_PER_YIELD,
+                 deadline: float = None):
+        if expansions_per_yield < 1:
+            raise Exception("A search has to expand at least one node before giving the event loop a turn")
+        self.searcher = searcher
+        self.algorithm = algorithm
+        self.expansions_per_yield = expansions_per_yield
+        self.deadline = deadline
+        self.slices = 0
+        self.longest_slice = 0.0
+
+    async def run(self) -> SearchStats:
+        """
+        Runs the search to the end, returning its statistics. The search time only counts the time spent searching, not
+        the time spent waiting for other tasks. Raises TimeoutError if the deadline passes first, and the search is
+        stopped cleanly if the task is cancelled
+        """
+        loop = asyncio.get_running_loop()
+        searcher = self.searcher
+        iterator = iter(self.algorithm(searcher))
+        wall_time = 0.0
+        try:
+            while True:
+                # Step until enough nodes have been expanded or the search is done
+                timer = time.perf_counter()
+                next_yield = searcher.nodes_explored + self.expansions_per_yield
+                done = False
+                for result in iterator:
+                    if result[0]:
+                        done = True
+                        break
+                    if searcher.nodes_explored >= next_yield:
+                        break
+                else:
+                    done = True
+                slice_time = time.perf_counter() - timer
+                wall_time += slice_time
+                self.longest_slice = max(self.longest_slice, slice_time)
+
+                if done:
+                    break
+
+                if self.deadline is not None and loop.time() >= self.deadline:
+                    raise TimeoutError(f"Search passed its deadline after exploring {searcher.nodes_explored} nodes")
+
+                # Give the other tasks a turn, this is also where cancelling the task stops the search
+                self.slices += 1
+                await asyncio.sleep(0)
+        finally:
+            # Closes the algorithm's generator so it doesn't hold on to its state after being stopped early
+            iterator.close()
+
+        searcher.stats.wall_time = wall_time
+        searcher.calculate_path()
+        searcher.stats.state_bytes = searcher.estimate_state_bytes()
+        return searcher.stats
+
+
+async def search(searcher: Searcher, algorithm, expansions_per_yield: int = DEFAULT_EXPANSIONS_PER_YIELD,
+                 timeout: float = None) -> SearchStats:
+    """
+    Runs the algorithm on the searcher without blocking the event loop, returning the search statistics. The path is
+    left on the searcher as with Searcher.run_search. Raises TimeoutError if the search takes longer than timeout
+    seconds, counting time spent waiting for other tasks
+    """
+    deadline = asyncio.get_running_loop().time() + timeout if timeout is not None else None
+    return await AsyncSearch(searcher, algorithm, expansions_per_yield, deadline).run()
+
+
+def start_search(searcher: Searcher, algorithm, expansions_per_yield: int = DEFAULT_EXPANSIONS_PER_YIELD,
+                 timeout: float = None) -> asyncio.Task:
+    """
+    Starts the search as a task on the running event loop, which can be awaited for the statistics or cancelled
+    """
+    return asyncio.create_task(search(searcher, algorithm, expansions_per_yield, timeout))
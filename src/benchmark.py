@@ -0,0 +1,710 @@
+import asyncio
+import functools
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from src.search import dfs, astar, dijkstra, bfs, idastar, smastar, cooperative, arastar, greedy, beam, landmarks, \
+    pruning, path_database, contraction, registry
+from src import maze_generator, maze_loader, maze_ingest, async_search, checkpoint, paths, chunked_maze, profiling, \
+    memory_profiling
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher, SearchStats, NodeData, PriorityQueue, TIE_BREAK_LIFO, TIE_BREAKS, \
+    SPARSE_NODE_THRESHOLD
+
+# Number of generated mazes and their width and height in the corpus bulk ingest is benchmarked on, and the number of
+# broken files mixed in to check they're reported without stopping the ingest
+INGEST_MAZE_COUNT = 2000
+INGEST_MAZE_SIZE = 51
+INGEST_BROKEN_COUNT = 20
+
+# Numbers of worker processes the corpus is ingested with, counts above the number of CPUs are skipped
+INGEST_WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+# Number of functions listed for each algorithm when profiling all of them
+PROFILE_HOTSPOT_COUNT = 8
+
+# Number of times each algorithm is run when benchmarking, the reported time is the average
+NUM_BENCHMARK_RUNS = 50
+
+# Heuristic weights weighted A* is benchmarked with
+WEIGHTED_EPSILONS = [1.5, 2.0, 3.0]
+
+# Most nodes IDA* expands in the benchmarks before giving up, it's run three times on every maze so this keeps BENCHMARK
+# ALL from blocking the GUI for long on mazes it can't search efficiently
+IDASTAR_EXPANSION_BUDGET = 20000
+
+# Numbers of agents planned together when measuring multi-agent throughput, counts that would fill more than an eighth
+# of the maze's floor are skipped
+MULTI_AGENT_COUNTS = [1, 5, 10, 25, 50, 100, 200]
+
+# Numbers of landmarks A* with landmark heuristics is benchmarked with
+LANDMARK_COUNTS = [1, 2, 4, 8]
+
+# Number of random start and goal pairs the path database and A* are timed on
+PATH_DATABASE_QUERIES = 100
+
+# Sizes of the generated mazes contraction hierarchies are benchmarked on, and the number of random queries timed on each
+CONTRACTION_MAZE_SIZES = [101, 201, 401]
+CONTRACTION_QUERIES = 10
+
+# Numbers of searches run together on one event loop when benchmarking the asyncio API
+ASYNC_SEARCH_COUNTS = [10, 100, 1000]
+
+# Width and height of the generated world the chunked grid is benchmarked on, and the chance of each chunk having
+# obstacles, high enough that searches have to read many mixed chunks
+WORLD_SIZE = 20000
+WORLD_OBSTACLE_CHANCE = 0.5
+
+# Searches run on the world as (name, algorithm, how far across the world the goal is), A* heads straight for the goal
+# while BFS floods the area around the start, reading every chunk in it over and over
+WORLD_SEARCHES = [("A*", astar.run, 2000), ("BFS", bfs.run, 400)]
+
+# Numbers of chunks the cache holds in each run, too few for BFS's flood and enough for it
+WORLD_CACHE_SIZES = [4, chunked_maze.DEFAULT_MAX_CACHED_CHUNKS]
+
+
+def run_benchmarks(searcher: Searcher, tie_break: str = TIE_BREAK_LIFO):
+    """
+    Runs all the different algorithms on the searcher's maze, printing the results to the console. Dijkstra's and A*
+    break ties between nodes of equal cost with the given tie break
+    """
+    print("\n\n==== RUNNING BENCHMARKS USING ALL SEARCH ALGORITHMS ====")
+    print(f"Maze: {searcher.maze.file_name}")
+    print(f"Start: {searcher.maze.start}")
+    print(f"Goals: {searcher.maze.goals}")
+    print(f"Tie Break: {tie_break}")
+    run_benchmark(searcher, dfs.run, "Depth-First Search")
+    run_benchmark(searcher, bfs.run, "Breadth-First Search")
+    run_benchmark(searcher, functools.partial(dijkstra.run, tie_break=tie_break), "Dijkstra's")
+    # Imported here as importing scipy takes longer than everything else put together
+    from src.search import csgraph
+    if csgraph.is_available():
+        run_benchmark(searcher, csgraph.run, "Dijkstra's (scipy.sparse.csgraph)")
+    run_benchmark(searcher, functools.partial(astar.run, tie_break=tie_break), "A*")
+    run_benchmark(searcher, greedy.run, "Greedy Best-First")
+    run_benchmark(searcher, beam.run, f"Beam Search (width {beam.DEFAULT_BEAM_WIDTH})")
+    compare_tie_breaks({searcher.maze.file_name: searcher.maze})
+    run_reset_benchmark(searcher)
+    run_path_benchmark(searcher)
+    run_landmark_benchmark(searcher)
+    run_pruning_benchmark(searcher)
+    run_path_database_benchmark(searcher)
+    run_checkpoint_benchmark(searcher)
+    run_anytime_benchmark(searcher)
+    compare_memory_bounded(searcher)
+    run_multi_agent_benchmark(searcher.maze)
+
+
+def run_benchmark(searcher: Searcher, algorithm, algorithm_name: str, num_runs: int = NUM_BENCHMARK_RUNS) -> SearchStats:
+    """
+    Runs the algorithm num_runs times and prints the results and statistics of the last run
+    """
+    timer = time.perf_counter()
+
+    for x in range(num_runs):
+        stats = searcher.run_search(algorithm)
+
+    average_time = (time.perf_counter() - timer) * 1000 / num_runs
+
+    path_length = len(searcher.path)
+    print(f"\n== {algorithm_name} ==")
+    print(f"Nodes Explored: {searcher.nodes_explored}")
+    print(f"Path Length: {str(path_length - 1) if path_length != 0 else 'NO PATH FOUND'}")
+    print(f"Path Cost: {str(searcher.path_cost) if path_length != 0 else 'NO PATH FOUND'}")
+    print(f"Operate time (average over {num_runs} runs): {average_time:0.3F} ms")
+    print(stats)
+
+    return stats
+
+
+def run_reset_benchmark(searcher: Searcher, num_runs: int = NUM_BENCHMARK_RUNS):
+    """
+    Times resetting a searcher for a new search by starting a new generation against rebuilding the node grid and
+    queues from scratch as it used to, printing the average time of each. Both are timed on a new searcher of the maze,
+    so the searcher passed in keeps its grid and the results of its last search
+    """
+    maze = searcher.maze
+    node_count = maze.dimensions.x * maze.dimensions.y
+    reset_searcher = Searcher(maze)
+
+    print(f"\n== Search State Reset ({node_count} nodes) ==")
+
+    # Mazes this big only keep node data for the nodes a search reaches, so there is no full grid to rebuild
+    rebuild_time = None
+    if node_count <= SPARSE_NODE_THRESHOLD:
+        timer = time.perf_counter()
+        for run in range(num_runs):
+            reset_searcher.nodes = [[NodeData(reset_searcher.generation) for x in range(maze.dimensions.x)]
+                                    for y in range(maze.dimensions.y)]
+            reset_searcher.deque = deque()
+            reset_searcher.priority_queue = PriorityQueue()
+        rebuild_time = (time.perf_counter() - timer) * 1000 / num_runs
+        print(f"Rebuilding the node grid (average over {num_runs} runs): {rebuild_time:0.4F} ms")
+
+    timer = time.perf_counter()
+    for run in range(num_runs):
+        reset_searcher.initialise()
+    reset_time = (time.perf_counter() - timer) * 1000 / num_runs
+
+    if rebuild_time is None:
+        print(f"New generation (average over {num_runs} runs): {reset_time:0.4F} ms")
+    else:
+        print(f"New generation (average over {num_runs} runs): {reset_time:0.4F} ms, "
+              f"{rebuild_time / reset_time if reset_time > 0 else 0.0:0.1F}x faster")
+
+
+def run_path_benchmark(searcher: Searcher, num_runs: int = NUM_BENCHMARK_RUNS):
+    """
+    Compares the A* path of the maze stored as a Path against a list of its tiles, printing the memory each takes, the
+    size of each when sent to another process, and how long serialising and reading back a Path takes
+    """
+    searcher.run_search(astar.run)
+    path = searcher.path
+    positions = list(path)
+    list_bytes = sys.getsizeof(positions) + sum(sys.getsizeof(pos) + sys.getsizeof(pos.__dict__) for pos in positions)
+    list_sent = len(pickle.dumps([(pos.x, pos.y) for pos in positions]))
+
+    timer = time.perf_counter()
+    for run in range(num_runs):
+        paths.from_bytes(path.to_bytes())
+    round_trip_time = (time.perf_counter() - timer) * 1000 / num_runs
+
+    print(f"\n== Path Storage ({len(path)} tiles, {len(path.get_runs())} runs) ==")
+    print(f"{'Stored as':<18}{'Memory (bytes)':>16}{'Sent (bytes)':>14}")
+    print(f"{'List of tiles':<18}{list_bytes:>16}{list_sent:>14}")
+    print(f"{'Path':<18}{path.memory_bytes():>16}{len(path.to_bytes()):>14}")
+    print(f"Serialise and read back (average over {num_runs} runs): {round_trip_time:0.4F} ms")
+
+
+def run_landmark_benchmark(searcher: Searcher, counts: list[int] = LANDMARK_COUNTS):
+    """
+    Compares A* using the manhattan distance with A* using landmark heuristics, printing for each number of landmarks
+    the time and memory the preprocessing took, the nodes A* explored, and how many fewer that was per kilobyte of
+    distance tables
+    """
+    searcher.run_search(astar.run)
+    manhattan_explored = searcher.nodes_explored
+
+    print(f"\n== A* With Landmark Heuristics (manhattan distance explores {manhattan_explored} nodes) ==")
+    print(f"{'Landmarks':<10}{'Build (ms)':>12}{'Tables (bytes)':>16}{'Explored':>10}{'Path Cost':>11}"
+          f"{'Reduction':>11}{'Saved per KB':>14}")
+    for count in counts:
+        maze_landmarks = landmarks.Landmarks(searcher.maze, count)
+        searcher.run_search(functools.partial(astar.run, heuristic=maze_landmarks.calculate_goals_heuristic))
+        path_cost = searcher.path_cost if len(searcher.path) != 0 else None
+        saved = manhattan_explored - searcher.nodes_explored
+        memory = maze_landmarks.memory_bytes()
+        reduction = saved * 100 / manhattan_explored if manhattan_explored > 0 else 0.0
+        print(f"{len(maze_landmarks.positions):<10}{maze_landmarks.build_time * 1000:>12.3F}{memory:>16}"
+              f"{searcher.nodes_explored:>10}{str(path_cost):>11}{f'{reduction:0.1F}%':>11}"
+              f"{saved * 1024 / memory if memory > 0 else 0.0:>14.2F}")
+
+
+def run_pruning_benchmark(searcher: Searcher, num_runs: int = NUM_BENCHMARK_RUNS):
+    """
+    Runs the algorithms on the maze as it is and on its reduced graph, with dead ends filled in and corridors collapsed,
+    printing the nodes explored and average time of each. The reduced maze is built once and its build time is shown
+    separately, as it only needs building once per maze
+    """
+    reduced = pruning.ReducedMaze(searcher.maze)
+    print(f"\n== Dead End and Corridor Pruning ==")
+    print(reduced.reduction())
+    print(f"{'Algorithm':<22}{'Explored':>10}{'Pruned':>10}{'Time (ms)':>12}{'Pruned (ms)':>13}{'Path Cost':>11}"
+          f"{'Pruned Cost':>13}")
+    for algorithm, algorithm_name in [(bfs.run, "Breadth-First Search"), (dijkstra.run, "Dijkstra's"),
+                                      (astar.run, "A*"), (greedy.run, "Greedy Best-First")]:
+        results = []
+        for run in [algorithm, functools.partial(pruning.run, algorithm=algorithm, reduced=reduced)]:
+            timer = time.perf_counter()
+            for x in range(num_runs):
+                searcher.run_search(run)
+            average_time = (time.perf_counter() - timer) * 1000 / num_runs
+            path_cost = searcher.path_cost if len(searcher.path) != 0 else None
+            results.append((searcher.nodes_explored, average_time, path_cost))
+        print(f"{algorithm_name:<22}{results[0][0]:>10}{results[1][0]:>10}{results[0][1]:>12.3F}{results[1][1]:>13.3F}"
+              f"{str(results[0][2]):>11}{str(results[1][2]):>13}")
+
+
+def run_path_database_benchmark(searcher: Searcher, num_queries: int = PATH_DATABASE_QUERIES):
+    """
+    Builds the maze's path database and saves it next to the maze, then times looking up paths between random pairs of
+    floor tiles against finding them with A*, printing the build time, the size of the file against storing every first
+    move in a byte, and the average time per query of each
+    """
+    maze = searcher.maze
+    database = path_database.PathDatabase(maze)
+    database.save()
+    file_size = os.path.getsize(path_database.get_database_path(maze))
+    uncompressed_size = len(database.cells) * len(database.cells)
+
+    print(f"\n== Compressed Path Database ==")
+    print(f"Build Time: {database.build_time * 1000:0.3F} ms")
+    print(f"Runs: {database.run_count()} for {uncompressed_size} source and target pairs")
+    print(f"File Size: {file_size} bytes, {file_size * 100 / max(uncompressed_size, 1):0.1F}% of one byte per pair")
+
+    # The same random pairs are used for both, reproducible between runs
+    rng = random.Random(0)
+    pairs = [(rng.choice(database.cells), rng.choice(database.cells)) for i in range(num_queries)]
+
+    timer = time.perf_counter()
+    database_costs = []
+    for start, goal in pairs:
+        path = database.find_path(start, goal)
+        database_costs.append(sum(maze.get_edge_cost_to(pos) for pos in path[1:]) if len(path) != 0 else None)
+    database_time = (time.perf_counter() - timer) * 1000 / num_queries
+
+    astar_time = 0.0
+    astar_costs = []
+    for start, goal in pairs:
+        pair_searcher = Searcher(Maze(maze.file_name, maze.dimensions, maze.nodes, start, [goal]))
+        astar_time += pair_searcher.run_search(astar.run).wall_time
+        if start == goal:
+            astar_costs.append(0)
+        else:
+            astar_costs.append(pair_searcher.path_cost if len(pair_searcher.path) != 0 else None)
+    astar_time = astar_time * 1000 / num_queries
+
+    matching = sum(1 for database_cost, astar_cost in zip(database_costs, astar_costs) if database_cost == astar_cost)
+    print(f"Query Time (average over {num_queries} random pairs): {database_time:0.4F} ms, "
+          f"A* {astar_time:0.4F} ms, {astar_time / database_time if database_time > 0 else 0.0:0.1F}x faster")
+    print(f"Path costs matching A*: {matching}/{num_queries}")
+
+
+def run_checkpoint_benchmark(searcher: Searcher):
+    """
+    Stops each checkpointable algorithm halfway through, saves a checkpoint, and resumes it from the file, checking the
+    resumed search finds the same path with the same number of nodes explored as running it without stopping. Prints
+    the size of the checkpoint, how long saving and resuming took, and how much of the search time checkpointing at
+    the default interval would cost
+    """
+    maze = searcher.maze
+    print(f"\n== Checkpoint and Resume ==")
+    print(f"{'Algorithm':<22}{'Size (bytes)':>14}{'Save (ms)':>11}{'Load (ms)':>11}{'Overhead':>10}{'Identical':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "search.checkpoint")
+        for algorithm_name in checkpoint.CHECKPOINT_ALGORITHM_NAMES:
+            algorithm = checkpoint.get_algorithm(algorithm_name, checkpoint.get_epsilon(algorithm_name))
+            full_searcher = Searcher(maze)
+            full_stats = full_searcher.run_search(algorithm)
+
+            # Run until half the nodes have been explored, then save where the search is up to
+            checkpointer = checkpoint.Checkpointer(file_path, algorithm_name)
+            stopped_searcher = Searcher(maze)
+            iterator = iter(algorithm(stopped_searcher))
+            for result in iterator:
+                if result[0] or stopped_searcher.nodes_explored >= full_searcher.nodes_explored // 2:
+                    break
+            # Steps on to the next expansion, as a checkpoint can only be saved between expansions
+            stopped_searcher.checkpointer = checkpointer
+            checkpointer.next_save = 0.0
+            for result in iterator:
+                if result[0] or checkpointer.saves > 0:
+                    break
+            iterator.close()
+            if checkpointer.saves == 0:
+                print(f"{algorithm_name:<22}{'finished before a checkpoint':>57}")
+                continue
+
+            timer = time.perf_counter()
+            resumed_searcher, resumed_algorithm, name = checkpoint.load(file_path, maze)
+            load_time = time.perf_counter() - timer
+            resumed_searcher.run_search(resumed_algorithm)
+
+            identical = resumed_searcher.path == full_searcher.path and \
+                resumed_searcher.path_cost == full_searcher.path_cost and \
+                resumed_searcher.nodes_explored == full_searcher.nodes_explored and \
+                resumed_searcher.stats.pushes == full_stats.pushes and resumed_searcher.stats.pops == full_stats.pops
+            overhead = checkpointer.save_time / checkpoint.DEFAULT_CHECKPOINT_INTERVAL * 100
+            print(f"{algorithm_name:<22}{os.path.getsize(file_path):>14}{checkpointer.save_time * 1000:>11.3F}"
+                  f"{load_time * 1000:>11.3F}{overhead:>9.3F}%{str(identical):>11}")
+
+
+def run_contraction_benchmark(sizes: list[int] = CONTRACTION_MAZE_SIZES, num_queries: int = CONTRACTION_QUERIES):
+    """
+    Generates a large maze of each size and builds its contraction hierarchy, then times queries between random pairs of
+    floor tiles against Dijkstra's, printing the preprocessing time and shortcuts added, the average query time of each
+    and the speedup. Every query's cost is checked against Dijkstra's
+    """
+    print(f"\n==== CONTRACTION HIERARCHIES ON GENERATED MAZES ({num_queries} random queries each) ====")
+    print(f"{'Maze':<12}{'Floor':>8}{'Build (s)':>11}{'Shortcuts':>11}{'Settled':>9}{'Query (ms)':>12}"
+          f"{'Dijkstra (ms)':>15}{'Speedup':>10}{'Costs Match':>13}")
+    for size in sizes:
+        maze = maze_generator.generate(size, size)
+        hierarchy = contraction.ContractionHierarchy(maze)
+
+        rng = random.Random(0)
+        query_time = 0.0
+        dijkstra_time = 0.0
+        settled = []
+        matching = 0
+        for i in range(num_queries):
+            start = rng.choice(hierarchy.cells)
+            goal = rng.choice(hierarchy.cells)
+
+            timer = time.perf_counter()
+            path, cost = hierarchy.query(start, goal, settled)
+            query_time += time.perf_counter() - timer
+
+            pair_searcher = Searcher(Maze(maze.file_name, maze.dimensions, maze.nodes, start, [goal]))
+            dijkstra_time += pair_searcher.run_search(dijkstra.run).wall_time
+            dijkstra_cost = pair_searcher.path_cost if len(pair_searcher.path) != 0 else None
+            if cost == dijkstra_cost or start == goal:
+                matching += 1
+
+        print(f"{f'{size}x{size}':<12}{len(hierarchy.cells):>8}{hierarchy.build_time:>11.2F}"
+              f"{hierarchy.shortcut_count():>11}{len(settled) // num_queries:>9}{query_time * 1000 / num_queries:>12.3F}"
+              f"{dijkstra_time * 1000 / num_queries:>15.3F}{dijkstra_time / query_time:>9.0F}x"
+              f"{f'{matching}/{num_queries}':>13}")
+
+
+def run_world_benchmark(size: int = WORLD_SIZE, cache_sizes: list[int] = WORLD_CACHE_SIZES):
+    """
+    Generates a world of size x size tiles into a chunked world file, then runs each of the world searches with the
+    chunk cache at each size, printing the size of the file, the memory the grid and search took against holding the
+    world as nested lists, and the chunk hits, misses and evictions
+    """
+    print(f"\n==== CHUNKED WORLD OF {size}x{size} TILES ====")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, f"{size}x{size}.world")
+        timer = time.perf_counter()
+        chunked_maze.generate(size, size, file_path, obstacle_chance=WORLD_OBSTACLE_CHANCE)
+        print(f"Generate Time: {time.perf_counter() - timer:0.3F} s")
+        print(f"File Size: {os.path.getsize(file_path) / 1024:0.1F} KiB")
+
+        # Nested lists hold a reference per tile, the (wall, rough) tuples themselves are shared
+        print(f"Nested Lists: {size * size * 8 / 1024 / 1024:0.1F} MiB")
+
+        print(f"{'Search':<8}{'Cache':>7}{'Time (s)':>10}{'Explored':>10}{'Cost':>8}{'Hits':>10}{'Misses':>8}"
+              f"{'Evictions':>11}{'Grid (KiB)':>12}{'Search (KiB)':>14}")
+        for name, algorithm, goal_distance in WORLD_SEARCHES:
+            for cache_size in cache_sizes:
+                world = chunked_maze.load(file_path, cache_size)
+                maze = chunked_maze.ChunkedMaze(world.file_name, world.grid, world.start,
+                                                [int2(goal_distance, goal_distance)])
+                searcher = Searcher(maze)
+                stats = searcher.run_search(algorithm)
+                grid = world.grid
+                print(f"{name:<8}{cache_size:>7}{stats.wall_time:>10.3F}{searcher.nodes_explored:>10}"
+                      f"{str(searcher.path_cost):>8}{grid.hits:>10}{grid.misses:>8}{grid.evictions:>11}"
+                      f"{grid.memory_bytes() / 1024:>12.1F}{stats.state_bytes / 1024:>14.1F}")
+                grid.close()
+        print(f"Chunks: {grid.chunks_x * grid.chunks_y} of {grid.chunk_size}x{grid.chunk_size} tiles, "
+              f"{grid.mixed_chunk_count()} mixed")
+
+
+def run_ingest_benchmark(count: int = INGEST_MAZE_COUNT, size: int = INGEST_MAZE_SIZE,
+                         broken_count: int = INGEST_BROKEN_COUNT, worker_counts: list[int] = INGEST_WORKER_COUNTS):
+    """
+    Writes a corpus of generated mazes with some broken files among them, then ingests it with each number of worker
+    processes up to the number of CPUs, printing the time each took and the speed up over loading the files one at a
+    time, and checks every run found the same mazes and errors
+    """
+    print(f"\n==== BULK INGEST OF {count} {size}x{size} MAZES ====")
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(count):
+            maze_loader.save(maze_generator.generate(size, size, seed=i), os.path.join(directory, f"Maze {i:05}.txt"))
+        # Each kind of broken file the loader rejects, in turn
+        for i in range(broken_count):
+            with open(os.path.join(directory, f"Broken {i:05}.txt"), "w") as file:
+                file.write(["", "S.G\n..\n", "S..\n...\n", "S.G\n.x.\n", "S.S\n..G\n"][i % 5])
+
+        timer = time.perf_counter()
+        for file_path in maze_ingest.find_maze_files(directory):
+            try:
+                maze_loader.parse_file(file_path)
+            except Exception:
+                pass
+        sequential_time = time.perf_counter() - timer
+        print(f"CPUs: {os.cpu_count()}")
+        print(f"One at a time: {sequential_time * 1000:0.3F} ms")
+
+        print(f"{'Workers':<9}{'Time (ms)':>11}{'Speed Up':>10}{'Valid':>8}{'Errors':>8}{'Matches':>9}")
+        first_summaries = None
+        for workers in worker_counts:
+            if workers > (os.cpu_count() or 1) and workers != 1:
+                continue
+            timer = time.perf_counter()
+            summaries, mazes = maze_ingest.ingest(directory, workers)
+            ingest_time = time.perf_counter() - timer
+            rows = [(summary.name, summary.open_cells, summary.rough_cells, summary.error) for summary in summaries]
+            if first_summaries is None:
+                first_summaries = rows
+            errors = sum(1 for summary in summaries if summary.error is not None)
+            print(f"{workers:<9}{ingest_time * 1000:>11.3F}{sequential_time / ingest_time:>9.2F}x"
+                  f"{len(summaries) - errors:>8}{errors:>8}{str(rows == first_summaries):>9}")
+
+
+def run_async_benchmark(maze: Maze, counts: list[int] = ASYNC_SEARCH_COUNTS,
+                        expansions_per_yield: int = async_search.DEFAULT_EXPANSIONS_PER_YIELD):
+    """
+    Runs many A* searches of the maze at once on one event loop, printing how long they took altogether against running
+    them one after another, when the searches finished, and the longest any search held the event loop. Searches
+    sharing the loop fairly all finish close together near the end, rather than one at a time. Also checks that a
+    search can be cancelled and stopped by a deadline
+    """
+    searcher = Searcher(maze)
+    sequential_time = searcher.run_search(astar.run).wall_time
+    path_cost = searcher.path_cost
+
+    async def run_searches(count: int) -> tuple[list[float], list[async_search.AsyncSearch]]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        finish_times = []
+        searches = [async_search.AsyncSearch(Searcher(maze), astar.run, expansions_per_yield) for i in range(count)]
+
+        async def run_one(search: async_search.AsyncSearch):
+            await search.run()
+            finish_times.append(loop.time() - start)
+
+        await asyncio.gather(*[run_one(search) for search in searches])
+        return finish_times, searches
+
+    print(f"\n== Concurrent Searches on One Event Loop (A*, yielding every {expansions_per_yield} expansions) ==")
+    print(f"{'Searches':<10}{'Total (ms)':>12}{'Sequential (ms)':>17}{'First Done (ms)':>17}{'Median Done (ms)':>18}"
+          f"{'Longest Slice (ms)':>20}{'Paths Match':>13}")
+    for count in counts:
+        finish_times, searches = asyncio.run(run_searches(count))
+        finish_times.sort()
+        longest_slice = max(search.longest_slice for search in searches)
+        matching = sum(1 for search in searches if search.searcher.path_cost == path_cost)
+        print(f"{count:<10}{finish_times[-1] * 1000:>12.3F}{sequential_time * count * 1000:>17.3F}"
+              f"{finish_times[0] * 1000:>17.3F}{finish_times[len(finish_times) // 2] * 1000:>18.3F}"
+              f"{longest_slice * 1000:>20.3F}{f'{matching}/{count}':>13}")
+
+    async def check_stopping() -> tuple[bool, bool]:
+        task = async_search.start_search(Searcher(maze), astar.run, 1)
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+            cancelled = False
+        except asyncio.CancelledError:
+            cancelled = True
+
+        try:
+            await async_search.search(Searcher(maze), astar.run, 1, timeout=0)
+            timed_out = False
+        except TimeoutError:
+            timed_out = True
+        return cancelled, timed_out
+
+    cancelled, timed_out = asyncio.run(check_stopping())
+    print(f"Cancelling a search: {'stopped' if cancelled else 'FAILED'}, passing a deadline: "
+          f"{'stopped' if timed_out else 'FAILED'}")
+
+
+def compare_memory_bounded(searcher: Searcher, node_budget: int = smastar.DEFAULT_NODE_BUDGET,
+                           expansion_budget: int = IDASTAR_EXPANSION_BUDGET):
+    """
+    Runs A* and the memory-bounded IDA* and SMA* once each and prints their peak memory use and time side by side. IDA*
+    can expand the same nodes many times over, so it is only run once rather than averaged over many runs, and gives up
+    with no path after expansion_budget expansions
+    """
+    print(f"\n== Memory-Bounded Search (SMA* node budget {node_budget}, IDA* expansion budget {expansion_budget}) ==")
+    print(f"{'Algorithm':<10}{'Time (ms)':>12}{'Explored':>10}{'Path Cost':>11}{'Peak Memory':>13}{'Nodes Touched':>15}"
+          f"{'Node Data':>11}")
+    print(f"{'':<10}{'':>12}{'':>10}{'':>11}{'(bytes)':>13}{'':>15}{'(bytes)':>11}")
+    run_memory_benchmark(searcher, astar.run, "A*")
+    run_memory_benchmark(searcher, functools.partial(idastar.run, expansion_budget=expansion_budget), "IDA*")
+    run_memory_benchmark(searcher, functools.partial(smastar.run, node_budget=node_budget), "SMA*")
+
+
+def run_memory_benchmark(searcher: Searcher, algorithm, algorithm_name: str):
+    """
+    Runs the algorithm once to time it, then again with tracemalloc to find the peak memory the search allocates. The
+    node data grid is kept between searches, so it isn't counted in the peak. Instead, the node data the search used
+    is counted from the nodes stamped with its generation, which are the only ones it read or wrote
+    """
+    stats = searcher.run_search(algorithm)
+
+    # The grid was allocated before tracing started and each search only starts a new generation of it, so the peak is
+    # the memory of the queue, paths and anything else the search makes
+    tracemalloc.start()
+    searcher.run_search(algorithm)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Every NodeData has the same attributes, so measure one and multiply
+    sample = NodeData()
+    node_bytes = sys.getsizeof(sample) + sys.getsizeof(sample.__dict__)
+    touched = sum(1 for x, y, node_data in searcher.get_stored_node_data()
+                  if node_data.generation == searcher.generation)
+
+    path_cost = str(searcher.path_cost) if len(searcher.path) != 0 else "NO PATH"
+    print(f"{algorithm_name:<10}{stats.wall_time * 1000:>12.3F}{searcher.nodes_explored:>10}{path_cost:>11}"
+          f"{peak_bytes:>13}{touched:>15}{touched * node_bytes:>11}")
+
+
+def run_multi_agent_benchmark(maze: Maze, window: int = cooperative.DEFAULT_WINDOW):
+    """
+    Plans increasing numbers of agents with random starts and goals through the maze together, printing how many agents
+    are planned per second along with the expansions, time steps until the last agent arrives, agents that couldn't
+    reach their goal, and collisions, which should always be 0
+    """
+    floor_count = sum(1 for row in maze.nodes for node in row if not node[0])
+    print(f"\n== Cooperative Multi-Agent Planning (window {window}) ==")
+    print(f"{'Agents':>6}{'Time (ms)':>12}{'Agents/sec':>12}{'Expansions':>12}{'Makespan':>10}{'Failed':>8}"
+          f"{'Collisions':>12}")
+
+    # Every plan on the maze shares the distances to goals it has already seen
+    distances = cooperative.GoalDistances(maze)
+    for count in MULTI_AGENT_COUNTS:
+        if count * 8 > floor_count:
+            break
+        starts, goals = cooperative.random_agents(maze, count)
+        plan = cooperative.plan(maze, starts, goals, window, distances=distances)
+        collisions = len(cooperative.find_conflicts(plan.paths))
+        print(f"{len(starts):>6}{plan.plan_time * 1000:>12.3F}{len(starts) / plan.plan_time:>12.1F}{plan.expansions:>12}"
+              f"{plan.makespan():>10}{len(plan.failed):>8}{collisions:>12}")
+
+
+def run_anytime_benchmark(searcher: Searcher):
+    """
+    Runs weighted A* with each of the WEIGHTED_EPSILONS and ARA*, printing the cost of each path against the bound on
+    how far from optimal it can be, and how many fewer nodes were explored than A* needed for the optimal path
+    """
+    searcher.run_search(astar.run)
+    optimal_cost = searcher.path_cost if len(searcher.path) != 0 else None
+    astar_explored = searcher.nodes_explored
+
+    print("\n== Weighted and Anytime A* ==")
+    print(f"A* found cost {optimal_cost if optimal_cost is not None else 'NO PATH FOUND'} "
+          f"exploring {astar_explored} nodes")
+    print(f"{'Algorithm':<22}{'Path Cost':>10}{'Bound':>8}{'Explored':>10}{'Saved':>8}")
+
+    for epsilon in WEIGHTED_EPSILONS:
+        searcher.run_search(functools.partial(astar.run, epsilon=epsilon))
+        path_cost = str(searcher.path_cost) if len(searcher.path) != 0 else "NO PATH"
+        print(f"{f'Weighted A* e={epsilon}':<22}{path_cost:>10}{epsilon:>8.2F}{searcher.nodes_explored:>10}"
+              f"{astar_explored - searcher.nodes_explored:>8}")
+
+    # Each path ARA* publishes counts every node explored up to that point
+    searcher.run_search(arastar.run)
+    for result in searcher.results:
+        print(f"{f'ARA* e={result.epsilon}':<22}{result.path_cost:>10}{result.bound:>8.2F}{result.expansions:>10}"
+              f"{astar_explored - result.expansions:>8}")
+
+
+def compare_tie_breaks(mazes: dict[str, Maze], tie_breaks: list[str] = TIE_BREAKS):
+    """
+    Runs Dijkstra's and A* with each tie break on every maze, printing the nodes each explored and how that compares to
+    breaking ties LIFO, negative when fewer nodes were explored. Every tie break finds an optimal path, so the path costs are checked to all match
+    """
+    print("\n==== TIE BREAKS OF DIJKSTRA'S AND A* ====")
+    print(f"{'Maze':<26}{'Algorithm':<12}" + "".join(f"{tie_break:>22}" for tie_break in tie_breaks)
+          + f"{'Costs Match':>13}")
+    for name, maze in sorted(mazes.items()):
+        searcher = Searcher(maze)
+        for algorithm_name, algorithm in [("Dijkstra's", dijkstra.run), ("A*", astar.run)]:
+            row = f"{name[:25]:<26}{algorithm_name:<12}"
+            lifo_explored = None
+            costs = set()
+            for tie_break in tie_breaks:
+                searcher.run_search(functools.partial(algorithm, tie_break=tie_break))
+                costs.add(searcher.path_cost)
+                explored = searcher.nodes_explored
+                if lifo_explored is None:
+                    lifo_explored = explored
+                change = (explored - lifo_explored) / lifo_explored * 100 if lifo_explored != 0 else 0
+                row += f"{f'{explored} ({change:+0.1F}%)' if tie_break != TIE_BREAK_LIFO else str(explored):>22}"
+            print(row + f"{str(len(costs) == 1):>13}")
+
+
+def compare_quick_searches(mazes: dict[str, Maze]):
+    """
+    Runs A*, greedy best-first and beam search on every maze, printing the nodes each explored and how much more the
+    paths of the quick searches cost than the optimal path A* found
+    """
+    print("\n==== QUICK SEARCHES COMPARED TO A* ====")
+    print(f"{'Maze':<26}{'A* Explored':>12}{'A* Cost':>9}{'Greedy Explored':>17}{'Greedy Gap':>12}"
+          f"{'Beam Explored':>15}{'Beam Gap':>10}")
+    for name, maze in sorted(mazes.items()):
+        searcher = Searcher(maze)
+        searcher.run_search(astar.run)
+        optimal_cost = searcher.path_cost if len(searcher.path) != 0 else None
+        row = f"{name:<26}{searcher.nodes_explored:>12}{str(optimal_cost) if optimal_cost is not None else '-':>9}"
+
+        # Each algorithm with the widths of its explored and gap columns
+        for algorithm, explored_width, gap_width in [(greedy.run, 17, 12), (beam.run, 15, 10)]:
+            searcher.run_search(algorithm)
+            row += f"{searcher.nodes_explored:>{explored_width}}"
+            if len(searcher.path) == 0:
+                row += f"{'NO PATH':>{gap_width}}"
+            elif optimal_cost is not None:
+                row += f"{f'+{(searcher.path_cost - optimal_cost) / optimal_cost * 100:0.1F}%':>{gap_width}}"
+        print(row)
+
+
+def run_profiles(searcher: Searcher, algorithm_names: list[str] = None, directory: str = profiling.PROFILE_DIRECTORY):
+    """
+    Runs each algorithm once under the profiler, defaulting to every algorithm in the registry, saving its .pstats and
+    collapsed stacks and printing its hotspots, then prints the share of each one's time every part of the search took
+    """
+    maze = searcher.maze
+    if algorithm_names is None:
+        algorithm_names = registry.get_algorithm_names()
+    print("\n\n==== PROFILING SEARCH ALGORITHMS ====")
+    print(f"Maze: {maze.file_name}")
+    preprocessing = registry.MazePreprocessing(maze)
+    profiles = []
+    for name in algorithm_names:
+        algorithm = registry.get_algorithm(name, preprocessing)
+        for message in preprocessing.pop_build_messages():
+            print(message)
+        profile = profiling.profile_search(searcher, algorithm, name, directory)
+        profile.print_summary(PROFILE_HOTSPOT_COUNT if len(algorithm_names) > 1 else profiling.HOTSPOT_COUNT)
+        profiles.append(profile)
+
+    groups = [group for group, group_file, names in profiling.PROFILE_GROUPS]
+    groups = list(dict.fromkeys(groups)) + [profiling.ALGORITHM_GROUP]
+    print("\n== Share of each search's time ==")
+    print(f"{'Algorithm':<34}{'Time (ms)':>11}" + "".join(f"{group:>{len(group) + 2}}" for group in groups))
+    for profile in profiles:
+        times = profile.get_group_times()
+        total = max(profile.total_time, 1e-9)
+        print(f"{profile.algorithm_name[:33]:<34}{profile.total_time * 1000:>11.3F}"
+              + "".join(f"{f'{times.get(group, 0.0) * 100 / total:0.1F}%':>{len(group) + 2}}" for group in groups))
+
+
+def run_allocation_benchmark(file_path: str, algorithm_names: list[str] = None):
+    """
+    Measures with tracemalloc the memory parsing the maze file and making a searcher of it take, then each algorithm,
+    defaulting to every algorithm in the registry, printing the peak and retained memory of each per tile of the maze
+    and, for the searches, per node expanded. Lines allocating the most memory are listed for the construction and,
+    when only one algorithm is measured, for the search
+    """
+    maze, maze_memory = memory_profiling.measure_maze(file_path)
+    searcher, searcher_memory = memory_profiling.measure_searcher(maze)
+    cells = maze.dimensions.x * maze.dimensions.y
+    if algorithm_names is None:
+        algorithm_names = registry.get_algorithm_names()
+
+    print(f"\n==== MEMORY OF {maze.file_name} ({cells} tiles) ====")
+    preprocessing = registry.MazePreprocessing(maze)
+    measurements = [("Maze construction", maze_memory, None), ("Searcher construction", searcher_memory, None)]
+    for name in algorithm_names:
+        search_searcher, search_memory = memory_profiling.measure_search(maze, registry.get_algorithm(name, preprocessing))
+        measurements.append((name, search_memory, search_searcher.nodes_explored))
+    for message in preprocessing.pop_build_messages():
+        print(message)
+
+    print(f"{'Measured':<34}{'Peak (KiB)':>12}{'Retained (KiB)':>16}{'Peak/Tile':>11}{'Retained/Tile':>15}"
+          f"{'Explored':>10}{'Peak/Node':>11}")
+    for name, memory, explored in measurements:
+        row = (f"{name[:33]:<34}{memory.peak_bytes / 1024:>12.1F}{memory.retained_bytes / 1024:>16.1F}"
+               f"{memory.peak_bytes / cells:>11.1F}{memory.retained_bytes / cells:>15.1F}")
+        if explored is not None:
+            row += f"{explored:>10}{memory.peak_bytes / explored if explored != 0 else 0:>11.1F}"
+        print(row)
+
+    for name, memory, explored in measurements[:2] if len(algorithm_names) > 1 else measurements:
+        print(f"\nRetained by {name}:")
+        for site, size, count in memory.top_sites:
+            print(f"  {site:<32}{size / 1024:>10.1F} KiB{count:>9} blocks")
@@ -0,0 +1,291 @@
+import functools
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import deque
+
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher, PriorityQueue, TIE_BREAK_LIFO, TIE_BREAKS
+from src.search import dfs, bfs, dijkstra, astar, path_database
+
+# Identifies a checkpoint file and the version of its format
+CHECKPOINT_MAGIC = b"SCK2"
+
+# Header of a checkpoint, the magic, the algorithm's number in CHECKPOINT_ALGORITHM_NAMES, the number of the queue's
+# tie break in TIE_BREAKS, the heuristic weight, the maze dimensions, a checksum of the maze's tiles, start and goals,
+# and the length of the maze's name that follows
+CHECKPOINT_HEADER = struct.Struct("<4sBBdIIIH")
+
+# Counters of the search after the maze name, the nodes explored, the search statistics, the priority queue's sort
+# order number, the number of nodes with data, the number of queue entries, and whether the queue costs are floats
+CHECKPOINT_COUNTERS = struct.Struct("<qqqqqqqqqB")
+
+# Algorithms that can be checkpointed and resumed, they all expand one node per pass of a loop over a queue, so their
+# whole state is the node data, the queue and the counters between one expansion and the next
+CHECKPOINT_ALGORITHM_NAMES = ["Depth-First Search", "Breadth-First Search", "Dijkstra's", "A*", "Weighted A*"]
+
+# Seconds between checkpoints when none is given, saving takes around a tenth of a second halfway through searching a
+# 401x401 maze so this keeps the cost of checkpointing under 1% of the search time
+DEFAULT_CHECKPOINT_INTERVAL = 10.0
+
+# Compression level of the node data and queue, the fastest as checkpoints are written during the search
+CHECKPOINT_COMPRESSION_LEVEL = 1
+
+
+def calculate_checksum(maze: Maze) -> int:
+    """
+    Returns a checksum of the maze's tiles, start and goals, a checkpoint is only resumed on a maze with the same checksum
+    """
+    positions = [maze.start] + list(maze.goals)
+    data = b"".join(struct.pack("<II", pos.x, pos.y) for pos in positions)
+    return zlib.crc32(data, path_database.calculate_checksum(maze))
+
+
+def get_epsilon(algorithm_name: str) -> float:
+    """
+    Returns the heuristic weight the algorithm is run with
+    """
+    if algorithm_name == "Weighted A*":
+        return astar.DEFAULT_WEIGHTED_EPSILON
+    return 1
+
+
+def get_algorithm(algorithm_name: str, epsilon: float = 1, resume: bool = False, tie_break: str = TIE_BREAK_LIFO):
+    """
+    Returns the run function of a checkpointable algorithm, set to carry on from the searcher's state when resuming.
+    The tie break is used by Dijkstra's and the A* searches, DFS and BFS don't use the priority queue
+    """
+    if algorithm_name == "Depth-First Search":
+        return functools.partial(dfs.run, resume=resume)
+    elif algorithm_name == "Breadth-First Search":
+        return functools.partial(bfs.run, resume=resume)
+    elif algorithm_name == "Dijkstra's":
+        return functools.partial(dijkstra.run, resume=resume, tie_break=tie_break)
+    elif algorithm_name == "A*":
+        return functools.partial(astar.run, resume=resume, tie_break=tie_break)
+    elif algorithm_name == "Weighted A*":
+        return functools.partial(astar.run, epsilon=epsilon, resume=resume, tie_break=tie_break)
+    raise Exception(f"Algorithm '{algorithm_name}' can't be checkpointed")
+
+
+def save(searcher: Searcher, file_path: str, algorithm_name: str, epsilon: float = 1):
+    """
+    Writes the searcher's state to a checkpoint file. Must be called between expansions, which is where the algorithms
+    call Searcher.checkpoint_if_due. Only the nodes the search has reached are written, as their position and their
+    parent, cost, depth, queue count and visited flag, followed by the queue in its exact order and the tie break its
+    sort orders were made with, so the resumed search pops the same nodes in the same order. The file is replaced in one go so a crash while saving keeps the last one
+    """
+    if algorithm_name not in CHECKPOINT_ALGORITHM_NAMES:
+        raise Exception(f"Algorithm '{algorithm_name}' can't be checkpointed")
+    maze = searcher.maze
+    width = maze.dimensions.x
+
+    # Node data of every node the search has reached, the others are still the defaults
+    indices = array("i")
+    parents = array("i")
+    path_costs = array("i")
+    depths = array("i")
+    queue_counts = array("i")
+    visited = bytearray()
+    generation = searcher.generation
+    for x, y, node_data in searcher.get_stored_node_data():
+        # Data from an earlier generation is left over from an earlier search and reads as the defaults
+        if node_data.generation == generation and node_data.path_cost is not None:
+            indices.append(y * width + x)
+            parent = node_data.parent
+            parents.append(-1 if parent is None else parent.y * width + parent.x)
+            path_costs.append(node_data.path_cost)
+            depths.append(node_data.depth)
+            queue_counts.append(node_data.in_queue_count)
+            visited.append(node_data.visited)
+
+    # The deque in order, or the priority queue's heap as (cost, sort order, pos) in the order of its list
+    heap = searcher.priority_queue.q.queue
+    float_costs = any(isinstance(entry[0], float) for entry in heap)
+    queue_positions = array("i", [pos.y * width + pos.x for pos in searcher.deque])
+    queue_positions.extend(entry[2].y * width + entry[2].x for entry in heap)
+    queue_costs = array("d" if float_costs else "q", [entry[0] for entry in heap])
+    queue_orders = array("q", [entry[1] for entry in heap])
+
+    arrays = [indices, parents, path_costs, depths, queue_counts, queue_positions, queue_costs, queue_orders]
+    if sys.byteorder == "big":
+        for values in arrays:
+            values.byteswap()
+    body = b"".join(values.tobytes() for values in arrays) + bytes(visited)
+
+    name = maze.file_name.encode("utf-8")
+    stats = searcher.stats
+    header = CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_ALGORITHM_NAMES.index(algorithm_name),
+                                    TIE_BREAKS.index(searcher.priority_queue.tie_break), epsilon, maze.dimensions.x, maze.dimensions.y, calculate_checksum(maze), len(name))
+    counters = CHECKPOINT_COUNTERS.pack(searcher.nodes_explored, stats.pushes, stats.pops, stats.stale_pops,
+                                        stats.peak_frontier, stats.reopened, searcher.priority_queue.sort_order_number,
+                                        len(indices), len(searcher.deque) + len(heap), float_costs)
+
+    temporary_path = file_path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header)
+        file.write(name)
+        file.write(counters)
+        file.write(zlib.compress(body, CHECKPOINT_COMPRESSION_LEVEL))
+    os.replace(temporary_path, file_path)
+
+
+def read_maze_name(file_path: str) -> str:
+    """
+    Returns the name of the maze a checkpoint was saved from, so it can be found before resuming
+    """
+    with open(file_path, "rb") as file:
+        header = file.read(CHECKPOINT_HEADER.size)
+        magic, algorithm_number, tie_break_number, epsilon, width, height, checksum, name_length = \
+            CHECKPOINT_HEADER.unpack(header)
+        if magic != CHECKPOINT_MAGIC:
+            raise Exception(f"File '{file_path}' is not a search checkpoint")
+        return file.read(name_length).decode("utf-8")
+
+
+def load(file_path: str, maze: Maze) -> tuple[Searcher, object, str]:
+    """
+    Reads a checkpoint of a search of the maze, returning (searcher, algorithm, algorithm name). The searcher holds the
+    state the search was in, and running the algorithm on it carries on from there to the same result the search would
+    have reached without stopping. The search time only counts the time since resuming
+    """
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    magic, algorithm_number, tie_break_number, epsilon, width, height, checksum, name_length = \
+        CHECKPOINT_HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC:
+        raise Exception(f"File '{file_path}' is not a search checkpoint")
+    if int2(width, height) != maze.dimensions or checksum != calculate_checksum(maze):
+        raise Exception(f"Checkpoint '{file_path}' was saved from a different maze than '{maze.file_name}'")
+    offset = CHECKPOINT_HEADER.size + name_length
+    (nodes_explored, pushes, pops, stale_pops, peak_frontier, reopened, sort_order_number, node_count, queue_count,
+     float_costs) = CHECKPOINT_COUNTERS.unpack_from(data, offset)
+    body = zlib.decompress(data[offset + CHECKPOINT_COUNTERS.size:])
+    algorithm_name = CHECKPOINT_ALGORITHM_NAMES[algorithm_number]
+    tie_break = TIE_BREAKS[tie_break_number]
+    uses_deque = algorithm_name == "Depth-First Search" or algorithm_name == "Breadth-First Search"
+
+    # Reads the arrays back in the order they were written
+    body_offset = 0
+
+    def read_array(type_code: str, count: int) -> array:
+        nonlocal body_offset
+        values = array(type_code)
+        values.frombytes(body[body_offset:body_offset + count * values.itemsize])
+        if sys.byteorder == "big":
+            values.byteswap()
+        body_offset += count * values.itemsize
+        return values
+
+    indices = read_array("i", node_count)
+    parents = read_array("i", node_count)
+    path_costs = read_array("i", node_count)
+    depths = read_array("i", node_count)
+    queue_counts = read_array("i", node_count)
+    queue_positions = read_array("i", queue_count)
+    queue_costs = read_array("d" if float_costs else "q", 0 if uses_deque else queue_count)
+    queue_orders = read_array("q", 0 if uses_deque else queue_count)
+    visited = body[body_offset:body_offset + node_count]
+
+    searcher = Searcher(maze)
+    for i in range(node_count):
+        index = indices[i]
+        node_data = searcher.get_node_data(int2(index % width, index // width))
+        parent = parents[i]
+        node_data.parent = None if parent == -1 else int2(parent % width, parent // width)
+        node_data.path_cost = path_costs[i]
+        node_data.depth = depths[i]
+        node_data.in_queue_count = queue_counts[i]
+        node_data.visited = visited[i] != 0
+
+    positions = [int2(index % width, index // width) for index in queue_positions]
+    if uses_deque:
+        searcher.deque = deque(positions)
+    else:
+        # The entries are put back as the same heap list, so ties come off in the same order as before
+        # The sort orders were made with the checkpoint's tie break, so it's set before the entries are put back
+        searcher.priority_queue = PriorityQueue()
+        searcher.set_tie_break(tie_break)
+        searcher.priority_queue.q.queue = [(queue_costs[i], queue_orders[i], positions[i]) for i in range(queue_count)]
+    searcher.priority_queue.sort_order_number = sort_order_number
+
+    searcher.nodes_explored = nodes_explored
+    searcher.stats.pushes = pushes
+    searcher.stats.pops = pops
+    searcher.stats.stale_pops = stale_pops
+    searcher.stats.peak_frontier = peak_frontier
+    searcher.stats.reopened = reopened
+
+    return searcher, get_algorithm(algorithm_name, epsilon, resume=True, tie_break=tie_break), algorithm_name
+
+
+class Checkpointer:
+    """
+    Saves a checkpoint of a search every few seconds while it runs. Set as the searcher's checkpointer, the algorithm
+    asks it whether a checkpoint is due once per expansion, which only costs reading the clock
+    """
+    # File the checkpoints are written to, each replacing the last
+    file_path: str
+
+    # Name of the algorithm being run, one of CHECKPOINT_ALGORITHM_NAMES
+    algorithm_name: str
+
+    # Heuristic weight the algorithm is run with
+    epsilon: float
+
+    # How the algorithm breaks ties between nodes of equal cost, one of TIE_BREAKS
+    tie_break: str
+
+    # Seconds between checkpoints
+    interval: float
+
+    # Clock time the next checkpoint is due at
+    next_save: float
+
+    # Number of checkpoints saved
+    saves: int
+
+    # Total time in seconds spent saving checkpoints
+    save_time: float
+
+    def __init__(self, file_path: str, algorithm_name: str, interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 tie_break: str = TIE_BREAK_LIFO):
+        if algorithm_name not in CHECKPOINT_ALGORITHM_NAMES:
+            raise Exception(f"Algorithm '{algorithm_name}' can't be checkpointed")
+        self.file_path = file_path
+        self.algorithm_name = algorithm_name
+        self.epsilon = get_epsilon(algorithm_name)
+        self.tie_break = tie_break
+        self.interval = interval
+        self.next_save = time.perf_counter() + interval
+        self.saves = 0
+        self.save_time = 0.0
+
+    def save_if_due(self, searcher: Searcher):
+        """
+        Saves a checkpoint if the interval has passed since the last one
+        """
+        if time.perf_counter() >= self.next_save:
+            self.save(searcher)
+
+    def save(self, searcher: Searcher):
+        """
+        Saves a checkpoint of the searcher now
+        """
+        timer = time.perf_counter()
+        save(searcher, self.file_path, self.algorithm_name, self.epsilon)
+        finished = time.perf_counter()
+        self.saves += 1
+        self.save_time += finished - timer
+        self.next_save = finished + self.interval
+
+    def get_algorithm(self):
+        """
+        Returns the algorithm to run from the start with checkpoints being saved
+        """
+        return get_algorithm(self.algorithm_name, self.epsilon, tie_break=self.tie_break)
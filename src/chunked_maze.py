@@ -0,0 +1,419 @@
+import os
+import random
+import struct
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+
+from src.int2 import int2
+from src.maze import Maze
+
+# Tiles are stored as a byte each, 2 for a wall plus 1 for rough terrain, the same as the path database checksum
+TILE_FLOOR = 0
+TILE_ROUGH = 1
+TILE_WALL = 2
+
+# Width and height in tiles of every chunk, a chunk of floor is 4 KiB when it isn't uniform
+DEFAULT_CHUNK_SIZE = 64
+
+# Chunks that aren't uniform kept in memory at once, the least recently used is dropped when another is loaded
+DEFAULT_MAX_CACHED_CHUNKS = 256
+
+# Uniform value of a chunk that has more than one kind of tile, and has to be loaded to read its tiles
+MIXED_CHUNK = -1
+
+# Identifies a world file and the version of its format
+WORLD_MAGIC = b"WLD1"
+
+# Header of a world file, the magic, the dimensions, the chunk size, the start, the number of goals, and where the chunk
+# index is in the file. The goals follow as (x, y), then the compressed chunks, then the index
+WORLD_HEADER = struct.Struct("<4sIIIiiIQ")
+
+# Position of a goal in a world file
+WORLD_GOAL = struct.Struct("<ii")
+
+# Chance of each chunk of a generated world having obstacles, the rest are open floor
+DEFAULT_OBSTACLE_CHANCE = 0.1
+
+
+class ChunkedGrid:
+    """
+    Grid of tiles split into square chunks of a fixed size. A chunk that is all the same tile, as most of a big open
+    world is, is stored as that one value. The other chunks are either kept in memory or read from a world file when
+    they're first needed, keeping only the most recently used in memory. Can be indexed as grid[y][x] to get the
+    (wall, rough) tuple of a tile like the nested lists of a Maze, but reading tiles with get_tile is much faster
+    """
+    # Width and height of the grid in tiles
+    dimensions: int2
+
+    # Width and height of every chunk in tiles
+    chunk_size: int
+
+    # Number of chunks across and down the grid
+    chunks_x: int
+    chunks_y: int
+
+    # Tile every tile of each chunk is, by chunk index, or MIXED_CHUNK if its tiles differ
+    uniform: array
+
+    # Tiles of each mixed chunk by chunk index, row by row, when the grid is held in memory, None for a world file
+    chunks: dict[int, bytes]
+
+    # World file mixed chunks are read from, None when the grid is held in memory
+    file: object
+
+    # Where each chunk's compressed tiles start in the world file, and how many bytes they take
+    offsets: array
+    lengths: array
+
+    # Mixed chunks read from the world file, the most recently used last
+    cache: OrderedDict
+
+    # Most mixed chunks kept in the cache
+    max_cached_chunks: int
+
+    # Number of tile reads of a uniform chunk, which don't need the chunk
+    uniform_reads: int
+
+    # Number of tile reads of a mixed chunk that was in memory
+    hits: int
+
+    # Number of tile reads of a mixed chunk that had to be read from the world file
+    misses: int
+
+    # Number of chunks dropped from the cache to make room for another
+    evictions: int
+
+    def __init__(self, dimensions: int2, chunk_size: int, uniform: array, chunks: dict[int, bytes] = None,
+                 file=None, offsets: array = None, lengths: array = None,
+                 max_cached_chunks: int = DEFAULT_MAX_CACHED_CHUNKS):
+        if max_cached_chunks < 1:
+            raise Exception("At least one chunk has to fit in the cache")
+        self.dimensions = dimensions
+        self.chunk_size = chunk_size
+        self.chunks_x = (dimensions.x + chunk_size - 1) // chunk_size
+        self.chunks_y = (dimensions.y + chunk_size - 1) // chunk_size
+        self.uniform = uniform
+        self.chunks = chunks
+        self.file = file
+        self.offsets = offsets
+        self.lengths = lengths
+        self.cache = OrderedDict()
+        self.max_cached_chunks = max_cached_chunks
+        self.reset_counts()
+
+    def reset_counts(self):
+        """
+        Resets the counts of chunk reads, hits, misses and evictions
+        """
+        self.uniform_reads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_tile(self, x: int, y: int) -> int:
+        """
+        Returns the tile at (x, y) as TILE_FLOOR, TILE_ROUGH or TILE_WALL, the position must be inside the grid
+        """
+        chunk_size = self.chunk_size
+        index = (y // chunk_size) * self.chunks_x + x // chunk_size
+        value = self.uniform[index]
+        if value != MIXED_CHUNK:
+            self.uniform_reads += 1
+            return value
+        return self.get_chunk(index)[(y % chunk_size) * chunk_size + x % chunk_size]
+
+    def get_chunk(self, index: int) -> bytes:
+        """
+        Returns the tiles of a mixed chunk, reading it from the world file if it isn't in memory
+        """
+        if self.chunks is not None:
+            self.hits += 1
+            return self.chunks[index]
+
+        chunk = self.cache.get(index)
+        if chunk is not None:
+            self.hits += 1
+            self.cache.move_to_end(index)
+            return chunk
+
+        self.misses += 1
+        self.file.seek(self.offsets[index])
+        chunk = zlib.decompress(self.file.read(self.lengths[index]))
+        self.cache[index] = chunk
+        if len(self.cache) > self.max_cached_chunks:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return chunk
+
+    def get_chunk_tiles(self, index: int) -> bytes:
+        """
+        Returns every tile of a chunk, making the tiles of a uniform chunk
+        """
+        value = self.uniform[index]
+        if value != MIXED_CHUNK:
+            return bytes([value]) * (self.chunk_size * self.chunk_size)
+        return self.get_chunk(index)
+
+    def mixed_chunk_count(self) -> int:
+        """
+        Returns the number of chunks that aren't uniform
+        """
+        return sum(1 for value in self.uniform if value == MIXED_CHUNK)
+
+    def memory_bytes(self) -> int:
+        """
+        Returns the number of bytes the grid takes in memory, the chunk index and the mixed chunks held in memory
+        """
+        total = self.uniform.itemsize * len(self.uniform)
+        for index_array in (self.offsets, self.lengths):
+            if index_array is not None:
+                total += index_array.itemsize * len(index_array)
+        held = self.chunks.values() if self.chunks is not None else self.cache.values()
+        return total + sum(sys.getsizeof(chunk) for chunk in held)
+
+    def close(self):
+        """
+        Closes the world file, if the grid was read from one
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __len__(self) -> int:
+        return self.dimensions.y
+
+    def __getitem__(self, y: int):
+        return GridRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.dimensions.y):
+            yield GridRow(self, y)
+
+    def __str__(self):
+        return (f"Chunks: {self.chunks_x * self.chunks_y} of {self.chunk_size}x{self.chunk_size} tiles, "
+                f"{self.mixed_chunk_count()} mixed\n"
+                f"Uniform Reads: {self.uniform_reads}\n"
+                f"Chunk Hits: {self.hits}\n"
+                f"Chunk Misses: {self.misses}\n"
+                f"Chunk Evictions: {self.evictions}\n"
+                f"Grid Memory: {self.memory_bytes() / 1024:0.1F} KiB")
+
+
+class GridRow:
+    """
+    Row of a chunked grid, indexed by x to get the (wall, rough) tuple of a tile the same as a row of a Maze's nodes
+    """
+    # Grid the row is from
+    grid: ChunkedGrid
+
+    # y coordinate of the row
+    y: int
+
+    def __init__(self, grid: ChunkedGrid, y: int):
+        self.grid = grid
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.grid.dimensions.x
+
+    def __getitem__(self, x: int) -> tuple[bool, bool]:
+        if x < 0:
+            x += self.grid.dimensions.x
+        tile = self.grid.get_tile(x, self.y)
+        return tile & TILE_WALL != 0, tile & TILE_ROUGH != 0
+
+    def __iter__(self):
+        for x in range(self.grid.dimensions.x):
+            yield self[x]
+
+
+class ChunkedMaze(Maze):
+    """
+    Maze whose tiles are stored in a chunked grid, for worlds too big to hold as nested lists. Its nodes are the chunked
+    grid, and the tile checks read the grid directly, so every search runs on it unchanged
+    """
+    # Chunked grid of tiles, the same object as nodes
+    grid: ChunkedGrid
+
+    def __init__(self, file_name: str, grid: ChunkedGrid, start: int2, goals: list[int2]):
+        super().__init__(file_name, grid.dimensions, grid, start, goals)
+        self.grid = grid
+
+    def is_wall(self, pos: int2) -> bool:
+        return self.grid.get_tile(pos.x, pos.y) & TILE_WALL != 0
+
+    def is_rough(self, pos: int2) -> bool:
+        return self.grid.get_tile(pos.x, pos.y) & TILE_ROUGH != 0
+
+    def get_edge_cost_to(self, pos: int2) -> int:
+        if pos.x < 0 or pos.x >= self.dimensions.x or pos.y < 0 or pos.y >= self.dimensions.y:
+            return None
+        tile = self.grid.get_tile(pos.x, pos.y)
+        if tile & TILE_WALL:
+            return None
+        if tile & TILE_ROUGH:
+            return 5
+        return 1
+
+
+def from_maze(maze: Maze, chunk_size: int = DEFAULT_CHUNK_SIZE) -> ChunkedMaze:
+    """
+    Makes a chunked copy of a maze held in memory, tiles past the edge of the maze in the last chunks are floor
+    """
+    grid = ChunkedGrid(maze.dimensions, chunk_size, array("b"), {})
+    for chunk_y in range(grid.chunks_y):
+        for chunk_x in range(grid.chunks_x):
+            tiles = bytearray(chunk_size * chunk_size)
+            for y in range(chunk_y * chunk_size, min((chunk_y + 1) * chunk_size, maze.dimensions.y)):
+                for x in range(chunk_x * chunk_size, min((chunk_x + 1) * chunk_size, maze.dimensions.x)):
+                    wall, rough = maze.nodes[y][x]
+                    tiles[(y % chunk_size) * chunk_size + x % chunk_size] = \
+                        (TILE_WALL if wall else 0) + (TILE_ROUGH if rough else 0)
+            add_chunk(grid, bytes(tiles))
+    return ChunkedMaze(maze.file_name, grid, maze.start, list(maze.goals))
+
+
+def add_chunk(grid: ChunkedGrid, tiles: bytes):
+    """
+    Adds the next chunk of a grid held in memory, storing it as one value if its tiles are all the same
+    """
+    index = len(grid.uniform)
+    if tiles.count(tiles[0]) == len(tiles):
+        grid.uniform.append(tiles[0])
+    else:
+        grid.uniform.append(MIXED_CHUNK)
+        grid.chunks[index] = tiles
+
+
+def write_world(file_path: str, dimensions: int2, chunk_size: int, start: int2, goals: list[int2], chunks):
+    """
+    Writes a world file from chunks given one at a time in order, row by row, as the tiles of each chunk. Only one chunk
+    is held in memory at a time, so worlds far bigger than memory can be written. The file is replaced in one go
+    """
+    chunk_count = ((dimensions.x + chunk_size - 1) // chunk_size) * ((dimensions.y + chunk_size - 1) // chunk_size)
+    uniform = array("b")
+    offsets = array("Q")
+    lengths = array("I")
+
+    temporary_path = file_path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        # The header is written again at the end when the index offset is known
+        file.write(WORLD_HEADER.pack(WORLD_MAGIC, dimensions.x, dimensions.y, chunk_size, start.x, start.y, len(goals), 0))
+        for goal in goals:
+            file.write(WORLD_GOAL.pack(goal.x, goal.y))
+
+        for tiles in chunks:
+            if tiles.count(tiles[0]) == len(tiles):
+                uniform.append(tiles[0])
+                offsets.append(0)
+                lengths.append(0)
+                continue
+            compressed = zlib.compress(tiles)
+            uniform.append(MIXED_CHUNK)
+            offsets.append(file.tell())
+            lengths.append(len(compressed))
+            file.write(compressed)
+        if len(uniform) != chunk_count:
+            raise Exception(f"World of {dimensions} needs {chunk_count} chunks, not {len(uniform)}")
+
+        index_offset = file.tell()
+        if sys.byteorder == "big":
+            offsets.byteswap()
+            lengths.byteswap()
+        file.write(uniform.tobytes())
+        file.write(offsets.tobytes())
+        file.write(lengths.tobytes())
+        file.seek(0)
+        file.write(WORLD_HEADER.pack(WORLD_MAGIC, dimensions.x, dimensions.y, chunk_size, start.x, start.y, len(goals),
+                                     index_offset))
+    os.replace(temporary_path, file_path)
+
+
+def save(maze: ChunkedMaze, file_path: str):
+    """
+    Writes a chunked maze to a world file
+    """
+    grid = maze.grid
+    write_world(file_path, maze.dimensions, grid.chunk_size, maze.start, maze.goals,
+                (grid.get_chunk_tiles(index) for index in range(len(grid.uniform))))
+
+
+def load(file_path: str, max_cached_chunks: int = DEFAULT_MAX_CACHED_CHUNKS) -> ChunkedMaze:
+    """
+    Opens a world file as a chunked maze. Only the chunk index is read now, each mixed chunk is read when a tile in it
+    is first needed, and at most max_cached_chunks are kept in memory
+    """
+    file = open(file_path, "rb")
+    magic, width, height, chunk_size, start_x, start_y, goal_count, index_offset = \
+        WORLD_HEADER.unpack(file.read(WORLD_HEADER.size))
+    if magic != WORLD_MAGIC:
+        file.close()
+        raise Exception(f"File '{file_path}' is not a world file")
+    goals = [int2(*WORLD_GOAL.unpack(file.read(WORLD_GOAL.size))) for i in range(goal_count)]
+
+    dimensions = int2(width, height)
+    chunk_count = ((width + chunk_size - 1) // chunk_size) * ((height + chunk_size - 1) // chunk_size)
+    file.seek(index_offset)
+    uniform = array("b")
+    uniform.frombytes(file.read(chunk_count))
+    offsets = array("Q")
+    offsets.frombytes(file.read(chunk_count * offsets.itemsize))
+    lengths = array("I")
+    lengths.frombytes(file.read(chunk_count * lengths.itemsize))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        lengths.byteswap()
+
+    grid = ChunkedGrid(dimensions, chunk_size, uniform, None, file, offsets, lengths, max_cached_chunks)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return ChunkedMaze(name, grid, int2(start_x, start_y), goals)
+
+
+def generate(width: int, height: int, file_path: str, seed: int = 0,
+             obstacle_chance: float = DEFAULT_OBSTACLE_CHANCE, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Generates a mostly open world straight into a world file, one chunk at a time so it never has to fit in memory.
+    Most chunks are open floor, the rest have a few straight walls and patches of rough terrain. Walls are single
+    segments so they rarely close anything off. The start is the top left and the goal the bottom right, the same seed
+    always gives the same world
+    """
+    rng = random.Random(seed)
+    start = int2(0, 0)
+    goal = int2(width - 1, height - 1)
+    chunks_x = (width + chunk_size - 1) // chunk_size
+    chunks_y = (height + chunk_size - 1) // chunk_size
+
+    def make_chunks():
+        for chunk_y in range(chunks_y):
+            for chunk_x in range(chunks_x):
+                tiles = bytearray(chunk_size * chunk_size)
+                if rng.random() < obstacle_chance:
+                    for i in range(rng.randint(1, 4)):
+                        # A rough patch, written a row at a time
+                        x = rng.randrange(chunk_size)
+                        y = rng.randrange(chunk_size)
+                        size = rng.randint(2, chunk_size // 4)
+                        for row in range(y, min(y + size, chunk_size)):
+                            end = min(x + size, chunk_size)
+                            tiles[row * chunk_size + x:row * chunk_size + end] = bytes([TILE_ROUGH]) * (end - x)
+                    for i in range(rng.randint(1, 3)):
+                        # A wall segment, either across or down the chunk
+                        x = rng.randrange(chunk_size)
+                        y = rng.randrange(chunk_size)
+                        length = rng.randint(chunk_size // 4, chunk_size // 2)
+                        if rng.random() < 0.5:
+                            end = min(x + length, chunk_size)
+                            tiles[y * chunk_size + x:y * chunk_size + end] = bytes([TILE_WALL]) * (end - x)
+                        else:
+                            for row in range(y, min(y + length, chunk_size)):
+                                tiles[row * chunk_size + x] = TILE_WALL
+
+                # The start and goal are always plain floor
+                for pos in (start, goal):
+                    if pos.x // chunk_size == chunk_x and pos.y // chunk_size == chunk_y:
+                        tiles[(pos.y % chunk_size) * chunk_size + pos.x % chunk_size] = TILE_FLOOR
+                yield bytes(tiles)
+
+    write_world(file_path, int2(width, height), chunk_size, start, [goal], make_chunks())
@@ -14,11 +14,15 @@ VISITED_MARKER_COLOUR = (170, 170, 170)
 ADDING_TO_QUEUE_MARKER_COLOUR = (124, 252, 0)
 VISITING_NEIGHBOUR_MARKER_COLOUR = (0, 255, 255)
 PATH_MARKER_COLOUR = (255, 128, 128)
+OVERLAY_TEXT_COLOUR = (0, 255, 0)
 
 # Dimensions
 WINDOW_SIZE = [800, 600]
 MAZE_SIZE = [600, 600]
 
+# Left edge of the UI panel on the right of the window, the maze viewport stops here so the panel keeps the mouse
+UI_PANEL_X = 570
+
 # Percentage of the tile the agent circle should cover
 AGENT_RADIUS_PCT = 0.8
 
@@ -40,3 +44,24 @@ START_END_BUFFER_PCT = 0.3
 # Agent movement speed
 AGENT_ANIMATION_SPEED = 9
 
+
+# Smallest tile size in pixels that is drawn tile by tile, below this a downsampled overview of the maze is drawn
+OVERVIEW_TILE_SIZE = 5
+
+# Maximum width/height in pixels of the downsampled overview of the maze
+OVERVIEW_MAX_SIZE = 600
+
+# Largest tile size in pixels the camera can zoom in to
+MAX_TILE_SIZE = 80
+
+# Multiplier applied to the tile size for each step of the mouse wheel
+ZOOM_STEP = 1.25
+
+# Number of pixels the camera moves when an arrow key is pressed
+PAN_STEP_PIXELS = 60
+
+# Font size of the frame timing overlay
+OVERLAY_FONT_SIZE = 12
+
+# Number of frames between updates of the frame timing overlay text
+OVERLAY_REFRESH_FRAMES = 15
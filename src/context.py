@@ -1,6 +1,7 @@
 from pygame import Surface, SurfaceType
 from pygame_gui import UIManager
 
+from src.frame_timer import FrameTimer
 from src.maze import Maze
 
 
@@ -33,7 +34,14 @@ class Context:
     # App will exit loop if quit is set to True
     quit: bool
 
-    def __init__(self, surface: Surface, manager: UIManager, select_screen, maze_screen, mazes: dict[str, Maze]):
+    # Times each phase of the main loop
+    frame_timer: FrameTimer
+
+    # Draws the frame timings on screen, screens pass it their events so it can be toggled
+    frame_timer_overlay: object
+
+    def __init__(self, surface: Surface, manager: UIManager, select_screen, maze_screen, mazes: dict[str, Maze],
+                 frame_timer: FrameTimer, frame_timer_overlay):
         """
         Initialises a new Context class instance that will be passed to each screen
         """
@@ -45,6 +53,8 @@ class Context:
         self.maze_screen = maze_screen
         self.time_delta = 0
         self.active_maze = None
+        self.frame_timer = frame_timer
+        self.frame_timer_overlay = frame_timer_overlay
 
     def set_screen_to(self, screen):
         """
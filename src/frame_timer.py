@@ -0,0 +1,130 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Number of recent frames used to calculate the rolling frame time percentiles
+ROLLING_WINDOW_FRAMES = 600
+
+
+class FrameTimer:
+    """
+    Times each phase of the main loop every frame, keeps rolling statistics and optionally logs every frame to file
+    """
+    # Names of the phases that are timed, in the order they run
+    phases: list[str]
+
+    # Time in seconds spent in each phase during the current frame
+    current: dict[str, float]
+
+    # Time in seconds spent in each phase during the last completed frame
+    last: dict[str, float]
+
+    # Total time in seconds of each of the recent frames
+    frame_times: deque[float]
+
+    # Time in seconds of each phase for each of the recent frames
+    phase_times: dict[str, deque[float]]
+
+    # Number of the current frame
+    frame_number: int
+
+    # perf_counter value when the current frame began
+    frame_start: float
+
+    # Open log file, or None if not logging
+    log_file: object
+
+    # Writer used when logging as CSV, None when logging as JSONL
+    csv_writer: object
+
+    def __init__(self, phases: list[str], log_path: str = None):
+        """
+        Creates a new FrameTimer for the given phases. If log_path is given per-frame timings are written to it, as
+        JSON lines if the file name ends with .jsonl, otherwise as CSV
+        """
+        self.phases = list(phases)
+        self.current = {}
+        self.last = {}
+        self.frame_times = deque(maxlen=ROLLING_WINDOW_FRAMES)
+        self.phase_times = {name: deque(maxlen=ROLLING_WINDOW_FRAMES) for name in self.phases}
+        self.frame_number = 0
+        self.frame_start = time.perf_counter()
+        self.log_file = None
+        self.csv_writer = None
+
+        if log_path is not None:
+            self.log_file = open(log_path, "w", newline="")
+            if not log_path.endswith(".jsonl"):
+                self.csv_writer = csv.writer(self.log_file)
+                self.csv_writer.writerow(["frame", "total_ms"] + self.phases)
+
+    def begin_frame(self):
+        """
+        Starts timing a new frame
+        """
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager that adds the time spent inside it to the named phase of the current frame
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0.0) + time.perf_counter() - start
+
+    def end_frame(self):
+        """
+        Finishes timing the current frame, updating the rolling statistics and writing to the log
+        """
+        total = time.perf_counter() - self.frame_start
+
+        # A phase that didn't run this frame counts as taking no time
+        for name in self.phases:
+            self.phase_times[name].append(self.current.get(name, 0.0))
+
+        self.frame_times.append(total)
+        self.last = self.current
+
+        if self.log_file is not None:
+            self.write_frame(total)
+
+        self.frame_number += 1
+
+    def write_frame(self, total: float):
+        """
+        Writes the timings of the current frame to the log, in milliseconds
+        """
+        if self.csv_writer is None:
+            record = {"frame": self.frame_number, "total_ms": total * 1000}
+            for name in self.phases:
+                record[name] = self.current.get(name, 0.0) * 1000
+            self.log_file.write(json.dumps(record) + "\n")
+            return
+
+        self.csv_writer.writerow([self.frame_number, f"{total * 1000:0.4F}"] +
+                                 [f"{self.current.get(name, 0.0) * 1000:0.4F}" for name in self.phases])
+
+    def percentile(self, pct: float, phase: str = None) -> float:
+        """
+        Returns the given percentile, in milliseconds, of the recent frame times, or of a single phase if given
+        """
+        values = self.frame_times if phase is None else self.phase_times.get(phase, ())
+        if len(values) == 0:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)] * 1000
+
+    def close(self):
+        """
+        Closes the log file if one is open
+        """
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
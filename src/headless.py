@@ -0,0 +1,266 @@
+import argparse
+import os
+import subprocess
+import sys
+
+from src import maze_loader
+from src.searcher import Searcher, TIE_BREAK_LIFO, TIE_BREAKS
+from src.search import registry
+
+# Number of fresh interpreters each import is timed in, the fastest is reported as the others include disk cache misses
+IMPORT_TIME_RUNS = 5
+
+# Modules timed when comparing the import cost of the headless entry point against the GUI
+IMPORT_TIME_MODULES = ["src.headless", "src.app"]
+
+
+def measure_import_time(module: str, runs: int = IMPORT_TIME_RUNS) -> tuple[float, bool]:
+    """
+    Imports the module in a fresh interpreter the given number of times, returning the fastest import time in seconds,
+    and whether importing it also imported pygame
+    """
+    code = (f"import sys, time\n"
+            f"timer = time.perf_counter()\n"
+            f"import {module}\n"
+            f"print(time.perf_counter() - timer, 'pygame' in sys.modules)")
+    best = None
+    loads_pygame = False
+    for i in range(runs):
+        # pygame prints a banner when imported, the timing is always the last line
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                check=True).stdout.splitlines()[-1].split()
+        best = float(output[0]) if best is None else min(best, float(output[0]))
+        loads_pygame = output[1] == "True"
+    return best, loads_pygame
+
+
+def print_import_times(runs: int = IMPORT_TIME_RUNS):
+    """
+    Prints how long the headless entry point and the GUI each take to import, and whether they load pygame
+    """
+    print(f"\n==== IMPORT TIMES (fastest of {runs} fresh interpreters) ====")
+    print(f"{'Module':<16}{'Import (ms)':>13}{'Loads pygame':>14}")
+    for module in IMPORT_TIME_MODULES:
+        try:
+            import_time, loads_pygame = measure_import_time(module, runs)
+        except subprocess.CalledProcessError:
+            print(f"{module:<16}{'FAILED':>13}")
+            continue
+        print(f"{module:<16}{import_time * 1000:>13.3F}{str(loads_pygame):>14}")
+
+
+def main(argv: list[str] = None):
+    """
+    Runs searches and benchmarks from the command line without opening a window. Only the maze, the searcher and the
+    search algorithms are imported, pygame is never loaded, and the benchmarks are only imported when asked for
+    """
+    parser = argparse.ArgumentParser(description="SIT215 Assignment 1 - Agent Search, without the GUI")
+    parser.add_argument("--maze", action="append",
+                        help="name of a maze in ./mazes/ to search, can be given more than once, defaults to all")
+    parser.add_argument("--algorithm", default="A*", choices=registry.get_algorithm_names(),
+                        help="search algorithm to run, defaults to A*")
+    parser.add_argument("--tie-break", choices=TIE_BREAKS,
+                        help="how Dijkstra's and A* order nodes of equal cost, defaults to LIFO, a resumed search "
+                             "uses the one saved in its checkpoint")
+    parser.add_argument("--tie-break-benchmark", action="store_true",
+                        help="compare the nodes Dijkstra's and A* explore with each tie break on each maze")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="benchmark every algorithm on each maze instead of running one")
+    parser.add_argument("--profile", action="store_true",
+                        help="run the algorithm on each maze under cProfile, saving .pstats and collapsed stacks to "
+                             "./profiles/ and printing the hotspots, every algorithm with --benchmark")
+    parser.add_argument("--memory", action="store_true",
+                        help="measure with tracemalloc the memory of loading each maze, making its searcher and "
+                             "running the algorithm, every algorithm with --benchmark")
+    parser.add_argument("--async-benchmark", action="store_true",
+                        help="run many searches of each maze at once on one asyncio event loop")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the search service over HTTP on localhost until interrupted")
+    parser.add_argument("--port", type=int, default=None, help="port the search service listens on")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes of the search service or --ingest, defaults to one per CPU")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help="save a checkpoint of the search to FILE every few seconds, so it can be resumed")
+    parser.add_argument("--checkpoint-interval", type=float, default=None,
+                        help="seconds between checkpoints, defaults to 10")
+    parser.add_argument("--resume", metavar="FILE", help="carry on the search saved in a checkpoint FILE")
+    parser.add_argument("--world", metavar="FILE",
+                        help="search a chunked world FILE instead of the mazes, reading its chunks as they're needed")
+    parser.add_argument("--generate-world", type=int, metavar="SIZE",
+                        help="generate a mostly open world of SIZE x SIZE tiles into the --world FILE first")
+    parser.add_argument("--world-benchmark", action="store_true",
+                        help="search a large generated world with different chunk cache sizes, then exit")
+    parser.add_argument("--ingest", metavar="DIRECTORY",
+                        help="parse and validate every maze file in DIRECTORY across --workers processes, reporting "
+                             "the broken ones and writing a summary index, then exit")
+    parser.add_argument("--index", metavar="FILE", help="file --ingest writes the index to, defaults to index.csv in "
+                                                        "the directory")
+    parser.add_argument("--ingest-benchmark", action="store_true",
+                        help="ingest a generated corpus of mazes with different numbers of workers, then exit")
+    parser.add_argument("--import-times", action="store_true",
+                        help="measure how long this entry point and the GUI take to import, then exit")
+    parser.add_argument("--compare-quick-searches", action="store_true",
+                        help="compare greedy best-first and beam search against A* on every maze, then exit")
+    parser.add_argument("--portfolio", choices=["any", "optimal"],
+                        help="race the search engines in separate processes on every maze, printing which engine "
+                             "finished first with a path of the given quality, then exit")
+    parser.add_argument("--check-csgraph", action="store_true",
+                        help="cross-check the scipy.sparse.csgraph backend against Dijkstra's on every maze, then exit")
+    parser.add_argument("--contraction-benchmark", action="store_true",
+                        help="time contraction hierarchy queries against Dijkstra's on large generated mazes, then exit")
+    args = parser.parse_args(argv)
+
+    # A resumed search has to carry on with the tie break its queue was ordered by, which is saved in the checkpoint
+    if args.resume is not None and args.tie_break is not None:
+        parser.error("--tie-break can't be used with --resume, the search keeps the tie break it was checkpointed with")
+    if args.tie_break is None:
+        args.tie_break = TIE_BREAK_LIFO
+
+    if args.import_times:
+        print_import_times()
+        return
+
+    if args.compare_quick_searches:
+        from src import benchmark
+        benchmark.compare_quick_searches(maze_loader.load())
+        return
+
+    if args.check_csgraph:
+        from src.search import csgraph
+        if not csgraph.is_available():
+            print("scipy is not installed. Please install it using the following command:")
+            print("pip install scipy")
+            return
+        csgraph.cross_check(maze_loader.load())
+        return
+
+    if args.contraction_benchmark:
+        from src import benchmark
+        benchmark.run_contraction_benchmark()
+        return
+
+    if args.portfolio is not None:
+        from src import portfolio
+        portfolio.win_statistics(maze_loader.load(), quality=args.portfolio)
+        return
+
+    if args.serve:
+        from src import service
+        service.serve(port=args.port if args.port is not None else service.DEFAULT_PORT,
+                      service=service.SearchService(workers=args.workers))
+        return
+
+    if args.ingest is not None:
+        from src import maze_ingest
+        maze_ingest.run(args.ingest, args.workers, args.index)
+        return
+
+    if args.ingest_benchmark:
+        from src import benchmark
+        benchmark.run_ingest_benchmark()
+        return
+
+    if args.world_benchmark:
+        from src import benchmark
+        benchmark.run_world_benchmark()
+        return
+
+    if args.world is not None:
+        search_world(args.world, args.algorithm, args.generate_world)
+        return
+
+    mazes = maze_loader.load()
+
+    if args.resume is not None:
+        resume_search(args.resume, mazes)
+        return
+
+    names = args.maze if args.maze is not None else sorted(mazes.keys())
+    for name in names:
+        if name not in mazes:
+            raise Exception(f"No maze named '{name}' in ./mazes/")
+
+    if args.tie_break_benchmark:
+        from src import benchmark
+        benchmark.compare_tie_breaks({name: mazes[name] for name in names})
+        return
+
+    for name in names:
+        searcher = Searcher(mazes[name])
+        if args.memory:
+            from src import benchmark
+            benchmark.run_allocation_benchmark(os.path.join(maze_loader.MAZE_DIRECTORY, f"{name}.txt"),
+                                               None if args.benchmark else [args.algorithm])
+            continue
+        if args.profile:
+            from src import benchmark
+            benchmark.run_profiles(searcher, None if args.benchmark else [args.algorithm])
+            continue
+        if args.benchmark:
+            from src import benchmark
+            benchmark.run_benchmarks(searcher, args.tie_break)
+            continue
+        if args.async_benchmark:
+            from src import benchmark
+            print(f"\nMaze: {name}")
+            benchmark.run_async_benchmark(mazes[name])
+            continue
+
+        if args.checkpoint is not None:
+            from src import checkpoint
+            interval = args.checkpoint_interval if args.checkpoint_interval is not None \
+                else checkpoint.DEFAULT_CHECKPOINT_INTERVAL
+            searcher.checkpointer = checkpoint.Checkpointer(args.checkpoint, args.algorithm, interval,
+                                                            args.tie_break)
+            searcher.run_search(searcher.checkpointer.get_algorithm())
+            searcher.print_results(args.algorithm)
+            print(f"Saved {searcher.checkpointer.saves} checkpoints to '{args.checkpoint}' in "
+                  f"{searcher.checkpointer.save_time * 1000:0.3F} ms")
+            continue
+
+        preprocessing = registry.MazePreprocessing(mazes[name])
+        algorithm = registry.get_algorithm(args.algorithm, preprocessing, args.tie_break)
+        for message in preprocessing.pop_build_messages():
+            print(message)
+        searcher.run_search(algorithm)
+        searcher.print_results(args.algorithm)
+
+
+def search_world(file_path: str, algorithm_name: str, generate_size: int = None):
+    """
+    Runs the algorithm on a chunked world file, generating it first if a size is given, and prints the results with
+    how the chunk cache did
+    """
+    from src import chunked_maze
+    if generate_size is not None:
+        print(f"Generating a {generate_size}x{generate_size} world into '{file_path}'")
+        chunked_maze.generate(generate_size, generate_size, file_path)
+    world = chunked_maze.load(file_path)
+    searcher = Searcher(world)
+    preprocessing = registry.MazePreprocessing(world)
+    algorithm = registry.get_algorithm(algorithm_name, preprocessing)
+    for message in preprocessing.pop_build_messages():
+        print(message)
+    searcher.run_search(algorithm)
+    searcher.print_results(algorithm_name)
+    print(world.grid)
+    world.grid.close()
+
+
+def resume_search(file_path: str, mazes: dict):
+    """
+    Carries on the search saved in the checkpoint file on the maze it was saved from, printing its results
+    """
+    from src import checkpoint
+    maze_name = checkpoint.read_maze_name(file_path)
+    if maze_name not in mazes:
+        raise Exception(f"Checkpoint '{file_path}' is of the maze '{maze_name}', which isn't in ./mazes/")
+    searcher, algorithm, algorithm_name = checkpoint.load(file_path, mazes[maze_name])
+    print(f"Resuming {algorithm_name} on '{maze_name}' after {searcher.nodes_explored} nodes explored, breaking ties "
+          f"{searcher.priority_queue.tie_break}")
+    searcher.run_search(algorithm)
+    searcher.print_results(algorithm_name)
+
+
+if __name__ == "__main__":
+    main()
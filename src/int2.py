@@ -10,6 +10,9 @@ class int2:
     def __str__(self):
         return f"({self.x},{self.y})"
 
+    def __repr__(self):
+        return str(self)
+
     def __add__(self, other):
         return int2(self.x + other.x, self.y + other.y)
 
@@ -30,3 +33,6 @@ class int2:
 
     def __ne__(self, other):
         return self.x != other.x or self.y != other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
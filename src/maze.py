@@ -3,7 +3,8 @@ from src.int2 import int2
 
 class Maze:
     """
-    Class structure to define the maze, including dimensions, start and goal positions, and a 2D grid of walls
+    Class structure to define the maze, including dimensions, start and goal positions, and a 2D grid of walls.
+    A maze can have several goals, reaching any one of them completes the search
     """
     # Maze name
     file_name: str
@@ -20,15 +21,20 @@ class Maze:
     # Start position (x, y)
     start: int2
 
-    # Goal position (x, y)
-    goal: int2
+    # Goal positions (x, y), in the order they appear in the maze file
+    goals: list[int2]
 
-    def __init__(self, file_name: str, dimensions: int2, nodes: list[list[tuple[bool, bool]]], start: int2, goal: int2):
+    # Set of the goal positions for fast lookups
+    goal_set: set[int2]
+
+    def __init__(self, file_name: str, dimensions: int2, nodes: list[list[tuple[bool, bool]]], start: int2,
+                 goals: list[int2]):
         self.file_name = file_name
         self.dimensions = dimensions
         self.nodes = nodes
         self.start = start
-        self.goal = goal
+        self.goals = goals
+        self.goal_set = set(goals)
         self.neighbour_offsets = [int2(-1, 0), int2(0, 1), int2(1, 0), int2(0, -1)]
 
     # Returns true if the node is a wall
@@ -39,8 +45,9 @@ class Maze:
     def is_rough(self, pos: int2) -> bool:
         return self.nodes[pos.y][pos.x][1]
 
+    # Returns true if the node is any of the goals
     def is_goal(self, pos: int2) -> bool:
-        return self.goal == pos
+        return pos in self.goal_set
 
     # Returns the cost of traversing an edge to the given xy position, returns None if no edge exists
     def get_edge_cost_to(self, pos: int2) -> int:
@@ -0,0 +1,59 @@
+import random
+
+from src.int2 import int2
+from src.maze import Maze
+
+# Chance of knocking out each remaining wall between two rooms, adding loops so there's more than one way through
+DEFAULT_LOOP_CHANCE = 0.05
+
+# Chance of each floor tile being rough terrain
+DEFAULT_ROUGH_CHANCE = 0.1
+
+
+def generate(width: int, height: int, seed: int = 0, loop_chance: float = DEFAULT_LOOP_CHANCE,
+             rough_chance: float = DEFAULT_ROUGH_CHANCE) -> Maze:
+    """
+    Generates a maze the same way the bundled Perfect mazes are laid out, with rooms on the even tiles and walls between
+    them, carved into a single tree with a randomised depth-first search. Some of the walls left are then knocked out to
+    add loops and some floor is made rough. The start is the top left and the goal the bottom right. Width and height
+    have to be odd so the maze ends in rooms, the same seed always gives the same maze
+    """
+    if width % 2 == 0 or height % 2 == 0 or width < 3 or height < 3:
+        raise Exception(f"Generated mazes must have odd dimensions of at least 3, not {width}x{height}")
+
+    rng = random.Random(seed)
+
+    # Start with every tile a wall, (bool, bool) at each position as the maze loader reads them
+    walls = [[True for x in range(width)] for y in range(height)]
+
+    # Carve out the tree, each step opens a room next to the current one and the wall between them
+    walls[0][0] = False
+    stack = [(0, 0)]
+    while len(stack) > 0:
+        x, y = stack[-1]
+        unvisited = [(x + dx, y + dy) for dx, dy in ((-2, 0), (0, 2), (2, 0), (0, -2))
+                     if 0 <= x + dx < width and 0 <= y + dy < height and walls[y + dy][x + dx]]
+        if len(unvisited) == 0:
+            stack.pop()
+            continue
+        next_x, next_y = rng.choice(unvisited)
+        walls[(y + next_y) // 2][(x + next_x) // 2] = False
+        walls[next_y][next_x] = False
+        stack.append((next_x, next_y))
+
+    # Walls between two rooms are on exactly one odd coordinate, knocking some out joins branches of the tree
+    for y in range(height):
+        for x in range(width):
+            if walls[y][x] and (x % 2 == 1) != (y % 2 == 1) and rng.random() < loop_chance:
+                walls[y][x] = False
+
+    start = int2(0, 0)
+    goal = int2(width - 1, height - 1)
+    nodes = [[(walls[y][x], not walls[y][x] and rng.random() < rough_chance) for x in range(width)]
+             for y in range(height)]
+
+    # The start and goal are always plain floor, as they are in the maze files
+    nodes[start.y][start.x] = (False, False)
+    nodes[goal.y][goal.x] = (False, False)
+
+    return Maze(f"{width}x{height} Generated Maze {seed}", int2(width, height), nodes, start, [goal])
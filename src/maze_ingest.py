@@ -0,0 +1,174 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src import maze_loader
+from src.maze import Maze
+
+# File the summary index of an ingested directory is written to, inside the directory
+INDEX_FILE_NAME = "index.csv"
+
+# Number of batches of files each worker is given, more than one so a worker that gets slow files doesn't hold up the
+# others, but few enough that handing the files out doesn't cost more than parsing them
+BATCHES_PER_WORKER = 4
+
+# Columns of the summary index
+INDEX_COLUMNS = ["name", "file", "width", "height", "open_cells", "rough_cells", "rough_ratio", "goals", "error"]
+
+
+class MazeSummary:
+    """
+    What ingesting one maze file found, its size and terrain if it's a valid maze, or why it isn't
+    """
+    # Name of the maze, the file name without the extension
+    name: str
+
+    # Path of the file the maze was read from
+    file_path: str
+
+    # Width and height of the maze, 0 if the file couldn't be read
+    width: int
+    height: int
+
+    # Number of tiles that aren't walls, and how many of those are rough terrain
+    open_cells: int
+    rough_cells: int
+
+    # Number of goals
+    goals: int
+
+    # Why the file isn't a valid maze, None if it is
+    error: str
+
+    def __init__(self, name: str, file_path: str, width: int = 0, height: int = 0, open_cells: int = 0,
+                 rough_cells: int = 0, goals: int = 0, error: str = None):
+        self.name = name
+        self.file_path = file_path
+        self.width = width
+        self.height = height
+        self.open_cells = open_cells
+        self.rough_cells = rough_cells
+        self.goals = goals
+        self.error = error
+
+    def rough_ratio(self) -> float:
+        """
+        Returns the share of the open tiles that are rough terrain
+        """
+        return self.rough_cells / self.open_cells if self.open_cells != 0 else 0.0
+
+
+def summarise(maze: Maze, file_path: str) -> MazeSummary:
+    """
+    Returns the summary of a valid maze
+    """
+    open_cells = 0
+    rough_cells = 0
+    for row in maze.nodes:
+        for wall, rough in row:
+            if not wall:
+                open_cells += 1
+                if rough:
+                    rough_cells += 1
+    return MazeSummary(maze.file_name, file_path, maze.dimensions.x, maze.dimensions.y, open_cells, rough_cells,
+                       len(maze.goals))
+
+
+def ingest_file(file_path: str, keep_maze: bool = False) -> tuple[MazeSummary, Maze]:
+    """
+    Parses and validates one maze file, returning its summary and the maze if it's kept. A file that isn't a valid maze
+    gets a summary holding the error rather than raising, so one bad file doesn't stop the rest being ingested
+    """
+    try:
+        maze = maze_loader.parse_file(file_path)
+    except Exception as error:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        return MazeSummary(name, file_path, error=str(error)), None
+    return summarise(maze, file_path), maze if keep_maze else None
+
+
+def ingest_batch(file_paths: list[str], keep_mazes: bool) -> list[tuple[MazeSummary, Maze]]:
+    """
+    Runs in a worker, ingesting a batch of files in turn
+    """
+    return [ingest_file(file_path, keep_mazes) for file_path in file_paths]
+
+
+def find_maze_files(directory: str) -> list[str]:
+    """
+    Returns the paths of the maze text files in the directory, sorted by name
+    """
+    return sorted(path.path for path in os.scandir(directory) if path.is_file() and path.name.endswith(".txt"))
+
+
+def ingest(directory: str, workers: int = None, keep_mazes: bool = False) -> tuple[list[MazeSummary], dict[str, Maze]]:
+    """
+    Parses and validates every maze file in the directory across a pool of worker processes, one per CPU by default,
+    returning the summaries of every file in name order and the valid mazes if they're kept. Only the summaries are
+    sent back from the workers unless the mazes are kept, which is what lets ingest time scale with the workers, as
+    sending a parsed maze between processes costs nearly as much as parsing it. With one worker the files are parsed
+    in this process
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    file_paths = find_maze_files(directory)
+
+    if workers == 1 or len(file_paths) <= 1:
+        results = ingest_batch(file_paths, keep_mazes)
+    else:
+        # Contiguous batches of the sorted files, so the results come back in name order
+        batch_size = max(1, -(-len(file_paths) // (workers * BATCHES_PER_WORKER)))
+        batches = [file_paths[i:i + batch_size] for i in range(0, len(file_paths), batch_size)]
+        results = []
+        with ProcessPoolExecutor(workers) as executor:
+            for batch_results in executor.map(ingest_batch, batches, [keep_mazes] * len(batches)):
+                results.extend(batch_results)
+
+    summaries = [summary for summary, maze in results]
+    mazes = {maze.file_name: maze for summary, maze in results if maze is not None}
+    return summaries, mazes
+
+
+def write_index(summaries: list[MazeSummary], file_path: str):
+    """
+    Writes the summaries as a CSV index, one row per file with an empty error for the valid mazes
+    """
+    with open(file_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(INDEX_COLUMNS)
+        for summary in summaries:
+            writer.writerow([summary.name, summary.file_path, summary.width, summary.height, summary.open_cells,
+                             summary.rough_cells, f"{summary.rough_ratio():0.4F}", summary.goals,
+                             summary.error if summary.error is not None else ""])
+
+
+def print_summary(summaries: list[MazeSummary], ingest_time: float):
+    """
+    Prints how many files were valid, the errors of the ones that weren't, and the range of sizes of the valid mazes
+    """
+    valid = [summary for summary in summaries if summary.error is None]
+    print(f"\nIngested {len(summaries)} files in {ingest_time * 1000:0.3F} ms, {len(valid)} valid, "
+          f"{len(summaries) - len(valid)} with errors")
+    for summary in summaries:
+        if summary.error is not None:
+            print(f"  {os.path.basename(summary.file_path)}: {summary.error}")
+    if len(valid) != 0:
+        cells = [summary.width * summary.height for summary in valid]
+        open_cells = sum(summary.open_cells for summary in valid)
+        rough_cells = sum(summary.rough_cells for summary in valid)
+        print(f"Tiles per maze: {min(cells)} to {max(cells)}, {open_cells} open in total, "
+              f"{rough_cells / open_cells * 100 if open_cells != 0 else 0:0.1F}% of them rough")
+
+
+def run(directory: str, workers: int = None, index_path: str = None) -> list[MazeSummary]:
+    """
+    Ingests the directory, writes the summary index, to index.csv in the directory by default, and prints the summary
+    """
+    timer = time.perf_counter()
+    summaries, mazes = ingest(directory, workers)
+    ingest_time = time.perf_counter() - timer
+    index_path = index_path if index_path is not None else os.path.join(directory, INDEX_FILE_NAME)
+    write_index(summaries, index_path)
+    print_summary(summaries, ingest_time)
+    print(f"Saved the index to '{index_path}'")
+    return summaries
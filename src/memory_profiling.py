@@ -0,0 +1,88 @@
+import gc
+import os
+import tracemalloc
+
+from src import maze_loader
+from src.maze import Maze
+from src.searcher import Searcher
+
+# Number of lines that allocated the most memory kept for each measurement
+TOP_SITE_COUNT = 5
+
+# Frames of tracemalloc itself, left out of the allocation sites so the snapshots don't count themselves
+TRACEMALLOC_FILTER = tracemalloc.Filter(False, tracemalloc.__file__)
+
+
+class MemoryMeasurement:
+    """
+    Memory allocated while running one part of the program, traced with tracemalloc
+    """
+    # Most memory in bytes that was allocated at once while it ran, over what was allocated before it started
+    peak_bytes: int
+
+    # Memory in bytes still allocated after it finished and garbage was collected, what keeping its result costs
+    retained_bytes: int
+
+    # Lines that allocated the most retained memory, as (file:line, bytes, number of blocks)
+    top_sites: list[tuple[str, int, int]]
+
+    def __init__(self, peak_bytes: int, retained_bytes: int, top_sites: list[tuple[str, int, int]]):
+        self.peak_bytes = peak_bytes
+        self.retained_bytes = retained_bytes
+        self.top_sites = top_sites
+
+
+def measure(function, *args) -> tuple[object, MemoryMeasurement]:
+    """
+    Calls the function with tracemalloc tracing, returning its result and the memory it allocated. Snapshots taken
+    before and after are compared to find the lines the retained memory was allocated on. The before snapshot is still
+    held when the memory is read at the end, so it cancels out of the retained memory
+    """
+    if tracemalloc.is_tracing():
+        raise Exception("Memory can't be measured while tracemalloc is already tracing")
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+
+    result = function(*args)
+
+    peak_bytes = tracemalloc.get_traced_memory()[1] - start_bytes
+    gc.collect()
+    retained_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    differences = after.filter_traces([TRACEMALLOC_FILTER]).compare_to(before.filter_traces([TRACEMALLOC_FILTER]),
+                                                                       "lineno")
+    top_sites = [(f"{os.path.basename(difference.traceback[0].filename)}:{difference.traceback[0].lineno}",
+                  difference.size_diff, difference.count_diff)
+                 for difference in differences[:TOP_SITE_COUNT] if difference.size_diff > 0]
+    return result, MemoryMeasurement(peak_bytes, max(retained_bytes, 0), top_sites)
+
+
+def measure_maze(file_path: str) -> tuple[Maze, MemoryMeasurement]:
+    """
+    Parses the maze file, returning the maze and the memory parsing it took and holding it takes
+    """
+    return measure(maze_loader.parse_file, file_path)
+
+
+def measure_searcher(maze: Maze) -> tuple[Searcher, MemoryMeasurement]:
+    """
+    Makes a searcher of the maze, returning it and the memory it takes before any search, mostly the node data grid
+    """
+    return measure(Searcher, maze)
+
+
+def measure_search(maze: Maze, algorithm) -> tuple[Searcher, MemoryMeasurement]:
+    """
+    Runs the algorithm on a searcher made before tracing starts, so only the memory the search itself allocates is
+    counted, its queue and any node data it adds. It's run once beforehand so anything built the first time an
+    algorithm runs on a maze isn't counted
+    """
+    Searcher(maze).run_search(algorithm)
+    searcher = Searcher(maze)
+    result, measurement = measure(searcher.run_search, algorithm)
+    return searcher, measurement
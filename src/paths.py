@@ -0,0 +1,220 @@
+import struct
+import sys
+
+from src.int2 import int2
+
+# Offsets of the moves a path is made of, numbered in the same order as Maze.neighbour_offsets, W S E N
+MOVE_OFFSETS = [int2(-1, 0), int2(0, 1), int2(1, 0), int2(0, -1)]
+
+# Letters the moves are written as in the text form of a path
+MOVE_LETTERS = "WSEN"
+
+# Number of each move by its (x, y) offset, for turning a step between two tiles into a move
+MOVE_NUMBERS = {(offset.x, offset.y): move for move, offset in enumerate(MOVE_OFFSETS)}
+
+# Number of bits a move takes when packed, four moves fit in a byte
+MOVE_BITS = 2
+
+# Header of a serialised path, the format of the moves that follow, the start, the end, the number of moves and the
+# cost, -1 for no cost
+PATH_HEADER = struct.Struct("<BiiiiIi")
+
+# Moves packed four to a byte, the smallest for paths that turn often
+FORMAT_PACKED = 0
+
+# Moves as runs of the same move, one byte per run holding the move and the run length, the smallest for paths with
+# long straight corridors
+FORMAT_RUNS = 1
+
+# Longest run of one move stored in a single byte of the run format, the move takes the other 2 bits
+MAX_RUN_LENGTH = 64
+
+
+class Path:
+    """
+    Path through a maze stored as its start and the moves taken from it, packed four to a byte, instead of a list of
+    every tile. It costs a byte for every four tiles rather than an int2 per tile, the cost, length, start and end are
+    read straight off it, and the tiles are only made when it's iterated over. Iterates over the tiles from start to end
+    like a list would, and an empty path with no start means no path was found
+    """
+    # First tile of the path, None if there is no path
+    start: int2
+
+    # Last tile of the path, None if there is no path
+    end: int2
+
+    # Moves from the start as numbers into MOVE_OFFSETS, packed four to a byte with the first move in the lowest bits
+    moves: bytes
+
+    # Number of moves, one less than the number of tiles
+    move_count: int
+
+    # Total cost of the path, the cost of entering every tile after the start, None if there is no path
+    cost: int
+
+    def __init__(self, start: int2 = None, end: int2 = None, moves: bytes = b"", move_count: int = 0,
+                 cost: int = None):
+        self.start = start
+        self.end = end
+        self.moves = moves
+        self.move_count = move_count
+        self.cost = cost
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tiles in the path, 0 if there is no path
+        """
+        return 0 if self.start is None else self.move_count + 1
+
+    def __iter__(self):
+        """
+        Iterates over the tiles of the path from start to end, making each one as it's reached
+        """
+        if self.start is None:
+            return
+        x = self.start.x
+        y = self.start.y
+        yield int2(x, y)
+        moves = self.moves
+        for i in range(self.move_count):
+            offset = MOVE_OFFSETS[(moves[i >> 2] >> ((i & 3) * MOVE_BITS)) & 3]
+            x += offset.x
+            y += offset.y
+            yield int2(x, y)
+
+    def __getitem__(self, index: int) -> int2:
+        """
+        Returns the tile at the index, the start and end are read straight off the path and any other tile is found by
+        walking to it
+        """
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("Path index out of range")
+        if index == 0:
+            return self.start
+        if index == length - 1:
+            return self.end
+        for i, pos in enumerate(self):
+            if i == index:
+                return pos
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Path):
+            return False
+        if self.start is None or other.start is None:
+            return self.start is None and other.start is None
+        return self.start == other.start and self.move_count == other.move_count and self.moves == other.moves
+
+    def __hash__(self):
+        return hash((None if self.start is None else (self.start.x, self.start.y), self.move_count, self.moves))
+
+    def __str__(self):
+        if self.start is None:
+            return "No path"
+        return f"{self.start} {self.to_string()} -> {self.end}"
+
+    def __repr__(self):
+        return str(self)
+
+    def get_moves(self):
+        """
+        Iterates over the moves of the path as numbers into MOVE_OFFSETS
+        """
+        moves = self.moves
+        for i in range(self.move_count):
+            yield (moves[i >> 2] >> ((i & 3) * MOVE_BITS)) & 3
+
+    def get_runs(self) -> list[tuple[int, int]]:
+        """
+        Returns the moves of the path as runs of the same move, as (move, run length)
+        """
+        runs = []
+        for move in self.get_moves():
+            if len(runs) != 0 and runs[-1][0] == move:
+                runs[-1] = (move, runs[-1][1] + 1)
+            else:
+                runs.append((move, 1))
+        return runs
+
+    def to_string(self) -> str:
+        """
+        Returns the moves as text, each run of the same move written as its length and the move's letter, e.g. 3E2S1E
+        """
+        return "".join(f"{length}{MOVE_LETTERS[move]}" for move, length in self.get_runs())
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the path, writing the moves packed four to a byte or as runs of the same move, whichever is smaller
+        """
+        if self.start is None:
+            return PATH_HEADER.pack(FORMAT_PACKED, -1, -1, -1, -1, 0, -1)
+
+        runs = bytearray()
+        for move, length in self.get_runs():
+            # Runs longer than fit in a byte are split over several
+            while length > 0:
+                run_length = min(length, MAX_RUN_LENGTH)
+                runs.append((move << 6) | (run_length - 1))
+                length -= run_length
+
+        data_format = FORMAT_RUNS if len(runs) < len(self.moves) else FORMAT_PACKED
+        header = PATH_HEADER.pack(data_format, self.start.x, self.start.y, self.end.x, self.end.y, self.move_count,
+                                  self.cost if self.cost is not None else -1)
+        return header + (bytes(runs) if data_format == FORMAT_RUNS else self.moves)
+
+    def memory_bytes(self) -> int:
+        """
+        Returns the number of bytes the path takes in memory, including its start and end tiles
+        """
+        total = sys.getsizeof(self) + sys.getsizeof(self.__dict__) + sys.getsizeof(self.moves)
+        for pos in (self.start, self.end):
+            if pos is not None:
+                total += sys.getsizeof(pos) + sys.getsizeof(pos.__dict__)
+        return total
+
+
+def pack_moves(moves: list[int]) -> bytes:
+    """
+    Packs moves, numbers into MOVE_OFFSETS, four to a byte with the first move in the lowest bits
+    """
+    packed = bytearray((len(moves) + 3) >> 2)
+    for i, move in enumerate(moves):
+        packed[i >> 2] |= move << ((i & 3) * MOVE_BITS)
+    return bytes(packed)
+
+
+def from_positions(positions: list[int2], cost: int) -> Path:
+    """
+    Makes a path from a list of tiles, each one step from the last, returning an empty path if the list is empty
+    """
+    if len(positions) == 0:
+        return Path()
+    moves = []
+    for i in range(1, len(positions)):
+        step = (positions[i].x - positions[i - 1].x, positions[i].y - positions[i - 1].y)
+        if step not in MOVE_NUMBERS:
+            raise Exception(f"Tiles {positions[i - 1]} and {positions[i]} of the path aren't next to each other")
+        moves.append(MOVE_NUMBERS[step])
+    return Path(positions[0], positions[-1], pack_moves(moves), len(moves), cost)
+
+
+def from_bytes(data: bytes) -> Path:
+    """
+    Reads a path written by Path.to_bytes
+    """
+    data_format, start_x, start_y, end_x, end_y, move_count, cost = PATH_HEADER.unpack_from(data)
+    if start_x == -1:
+        return Path()
+    body = data[PATH_HEADER.size:]
+    if data_format == FORMAT_PACKED:
+        moves = bytes(body)
+    elif data_format == FORMAT_RUNS:
+        expanded = []
+        for run in body:
+            expanded.extend([run >> 6] * ((run & (MAX_RUN_LENGTH - 1)) + 1))
+        moves = pack_moves(expanded)
+    else:
+        raise Exception(f"Unknown path format {data_format}")
+    return Path(int2(start_x, start_y), int2(end_x, end_y), moves, move_count, cost if cost != -1 else None)
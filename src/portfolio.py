@@ -0,0 +1,157 @@
+import multiprocessing
+import queue
+import random
+import time
+
+from src import paths
+from src.maze import Maze
+from src.search import dfs, bfs, dijkstra, astar, greedy, beam
+from src.searcher import Searcher
+
+# Quality levels a portfolio result has to meet, any path at all or the cheapest path
+QUALITY_ANY = "any"
+QUALITY_OPTIMAL = "optimal"
+
+# Engines the portfolio can race by name, with whether each always finds the cheapest path and whether it always finds
+# a path when there is one. Only engines that are both are raced when an optimal path is asked for
+ENGINES: dict[str, tuple[object, bool, bool]] = {
+    "Depth-First Search": (dfs.run, False, True),
+    "Breadth-First Search": (bfs.run, False, True),
+    "Dijkstra's": (dijkstra.run, True, True),
+    "A*": (astar.run, True, True),
+    "Greedy Best-First": (greedy.run, False, True),
+    "Beam Search": (beam.run, False, False),
+}
+
+# Longest time in seconds to wait for an engine to finish before giving up on the race
+DEFAULT_TIMEOUT = 60.0
+
+
+class PortfolioResult:
+    """
+    Result of the engine that won a portfolio race
+    """
+    # Name of the engine that finished first with a result meeting the quality level, None if none did
+    engine: str
+
+    # Path found from start to goal, empty if there is no path
+    path: paths.Path
+
+    # Total cost of the path
+    path_cost: int
+
+    # Nodes the winning engine explored
+    nodes_explored: int
+
+    # Time in seconds from starting the race until the winner's result arrived, including the cost of processes
+    elapsed: float
+
+    # Engines that had finished, in the order their results arrived, including any that didn't meet the quality level
+    finish_order: list[str]
+
+    def __init__(self, engine: str, path: paths.Path, path_cost: int, nodes_explored: int, elapsed: float,
+                 finish_order: list[str]):
+        self.engine = engine
+        self.path = path
+        self.path_cost = path_cost
+        self.nodes_explored = nodes_explored
+        self.elapsed = elapsed
+        self.finish_order = finish_order
+
+
+def run_engine(maze: Maze, engine: str, start_event, results):
+    """
+    Runs in a separate process, waits for every engine to be ready then searches and sends back the result. The path
+    is sent serialised as it's a few bytes rather than a pickled object per tile
+    """
+    searcher = Searcher(maze)
+    start_event.wait()
+    searcher.run_search(ENGINES[engine][0])
+    results.put((engine, searcher.path.to_bytes(), searcher.path_cost, searcher.nodes_explored))
+
+
+def race(maze: Maze, engines: list[str] = None, quality: str = QUALITY_ANY,
+         timeout: float = DEFAULT_TIMEOUT) -> PortfolioResult:
+    """
+    Runs the engines at the same time in separate processes on the maze, returning the first result that meets the
+    quality level and stopping the others. With QUALITY_OPTIMAL only the engines that always find the cheapest path are
+    raced. A result of no path only counts from an engine that always finds a path when there is one
+    """
+    if engines is None:
+        engines = list(ENGINES.keys())
+    if quality == QUALITY_OPTIMAL:
+        engines = [engine for engine in engines if ENGINES[engine][1]]
+    if len(engines) == 0:
+        raise Exception(f"No engines can meet the quality level '{quality}'")
+
+    # Start the processes in a random order so no engine always gets a head start, then release them all at once
+    engines = list(engines)
+    random.shuffle(engines)
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_engine, args=(maze, engine, start_event, results), daemon=True)
+                 for engine in engines]
+    for process in processes:
+        process.start()
+
+    timer = time.perf_counter()
+    start_event.set()
+
+    winner = PortfolioResult(None, paths.Path(), None, 0, 0.0, [])
+    try:
+        while len(winner.finish_order) < len(processes):
+            remaining = timeout - (time.perf_counter() - timer)
+            engine, path_data, path_cost, nodes_explored = results.get(timeout=max(remaining, 0))
+            winner.finish_order.append(engine)
+            path = paths.from_bytes(path_data)
+
+            # An engine that can miss paths saying there isn't one doesn't settle anything
+            if len(path) == 0 and not ENGINES[engine][2]:
+                continue
+
+            winner.engine = engine
+            winner.path = path
+            winner.path_cost = path_cost
+            winner.nodes_explored = nodes_explored
+            winner.elapsed = time.perf_counter() - timer
+            break
+    except queue.Empty:
+        print(f"Portfolio race timed out after {timeout} seconds")
+    finally:
+        # Stop the engines still running, the race is over
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    return winner
+
+
+def win_statistics(mazes: dict[str, Maze], engines: list[str] = None, quality: str = QUALITY_ANY,
+                   races: int = 5) -> dict[str, dict[str, int]]:
+    """
+    Races the engines on every maze the given number of times, printing and returning how many races each engine won on
+    each maze
+    """
+    if engines is None:
+        engines = list(ENGINES.keys())
+    if quality == QUALITY_OPTIMAL:
+        engines = [engine for engine in engines if ENGINES[engine][1]]
+
+    print(f"\n==== PORTFOLIO WINS OVER {races} RACES (quality: {quality}) ====")
+    print(f"{'Maze':<26}" + "".join(f"{engine:>22}" for engine in engines) + f"{'Avg Time (ms)':>15}")
+
+    wins: dict[str, dict[str, int]] = {}
+    for name, maze in sorted(mazes.items()):
+        wins[name] = {engine: 0 for engine in engines}
+        total_elapsed = 0.0
+        for i in range(races):
+            result = race(maze, engines, quality)
+            if result.engine is not None:
+                wins[name][result.engine] += 1
+            total_elapsed += result.elapsed
+        print(f"{name:<26}" + "".join(f"{wins[name][engine]:>22}" for engine in engines) +
+              f"{total_elapsed * 1000 / races:>15.3F}")
+
+    return wins
@@ -0,0 +1,189 @@
+import cProfile
+import os
+import pstats
+import re
+
+from src.maze import Maze
+from src.searcher import Searcher
+
+# Profiles are written here, as <maze> - <algorithm>.pstats and .collapsed
+PROFILE_DIRECTORY = "./profiles/"
+
+# Number of functions listed when printing where a search spends its time
+HOTSPOT_COUNT = 15
+
+# Parts of a search its time is split into, as (group, file the functions are in, names of the functions or None for
+# every function in the file). A function goes in the first group it matches, and anything else is counted as the
+# search algorithm itself. int2's __str__ is only called to put positions in the step messages
+PROFILE_GROUPS = [
+    ("Message formatting", "int2.py", {"__str__", "__repr__"}),
+    ("int2 arithmetic", "int2.py", None),
+    ("get_neighbours", "maze.py", None),
+    ("get_neighbours", "chunked_maze.py", None),
+    ("Queue", "searcher.py", {"push", "pop", "empty", "size", "clear", "frontier_size"}),
+    ("Queue", "queue.py", None),
+    ("Queue", "threading.py", None),
+    ("Queue", "~", {"<built-in method _heapq.heappush>", "<built-in method _heapq.heappop>",
+                    "<method 'acquire' of '_thread.lock' objects>", "<method 'release' of '_thread.lock' objects>",
+                    "<method 'append' of 'collections.deque' objects>", "<method 'pop' of 'collections.deque' objects>",
+                    "<method 'popleft' of 'collections.deque' objects>"}),
+    ("Node data", "searcher.py", {"get_node_data", "update_node_data", "reset", "decrement_queue_count", "in_queue",
+                                  "__missing__"}),
+    ("Statistics", "searcher.py", {"record_push", "record_pop", "record_expansion"}),
+]
+
+# Group of any function not in PROFILE_GROUPS
+ALGORITHM_GROUP = "Search algorithm"
+
+
+def get_function_label(function: tuple[str, int, str]) -> str:
+    """
+    Returns a readable name for a function in the profile, as name (file:line), or just the name for built-ins
+    """
+    file_name, line, name = function
+    if file_name == "~":
+        return name
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+def get_function_group(function: tuple[str, int, str]) -> str:
+    """
+    Returns the PROFILE_GROUPS group the function is in
+    """
+    file_name, line, name = function
+    base_name = os.path.basename(file_name)
+    for group, group_file, names in PROFILE_GROUPS:
+        if base_name == group_file and (names is None or name in names):
+            return group
+    return ALGORITHM_GROUP
+
+
+def get_profile_path(maze: Maze, algorithm_name: str, directory: str = PROFILE_DIRECTORY) -> str:
+    """
+    Returns the path of the profile files of the algorithm on the maze, without the extension
+    """
+    name = re.sub(r"[^A-Za-z0-9]+", "_", f"{maze.file_name} - {algorithm_name}").strip("_")
+    return os.path.join(directory, name)
+
+
+class SearchProfile:
+    """
+    Where a search spent its time, from running it under cProfile
+    """
+    # Name of the maze searched
+    maze_name: str
+
+    # Name of the algorithm run
+    algorithm_name: str
+
+    # Statistics of every function called during the search
+    stats: pstats.Stats
+
+    # Total time in seconds spent in the profiled functions
+    total_time: float
+
+    # Files the profile was written to, the cProfile statistics and the collapsed stacks
+    pstats_path: str
+    collapsed_path: str
+
+    def __init__(self, maze_name: str, algorithm_name: str, stats: pstats.Stats, pstats_path: str,
+                 collapsed_path: str):
+        self.maze_name = maze_name
+        self.algorithm_name = algorithm_name
+        self.stats = stats
+        self.total_time = sum(entry[2] for entry in stats.stats.values())
+        self.pstats_path = pstats_path
+        self.collapsed_path = collapsed_path
+
+    def get_hotspots(self, count: int = HOTSPOT_COUNT) -> list[tuple[str, int, float, float]]:
+        """
+        Returns the functions the most time was spent in, not counting the functions they called, as
+        (function, calls, own time, time including calls)
+        """
+        entries = sorted(self.stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [(get_function_label(function), entry[1], entry[2], entry[3]) for function, entry in entries[:count]]
+
+    def get_group_times(self) -> dict[str, float]:
+        """
+        Returns the time spent in each group of functions, the time of each function not counting the functions it called
+        """
+        times = {}
+        for function, entry in self.stats.stats.items():
+            group = get_function_group(function)
+            times[group] = times.get(group, 0.0) + entry[2]
+        return times
+
+    def print_summary(self, count: int = HOTSPOT_COUNT):
+        """
+        Prints the share of the time each group took and the functions the most time was spent in
+        """
+        total = max(self.total_time, 1e-9)
+        print(f"\n== Profile: {self.algorithm_name} on {self.maze_name} ({self.total_time * 1000:0.3F} ms profiled) ==")
+        for group, group_time in sorted(self.get_group_times().items(), key=lambda item: item[1], reverse=True):
+            print(f"{group:<22}{group_time * 1000:>10.3F} ms{group_time * 100 / total:>7.1F}%")
+        print(f"\n{'Function':<60}{'Calls':>10}{'Own (ms)':>11}{'Total (ms)':>12}{'Own %':>8}")
+        for label, calls, own_time, total_time in self.get_hotspots(count):
+            print(f"{label[:59]:<60}{calls:>10}{own_time * 1000:>11.3F}{total_time * 1000:>12.3F}"
+                  f"{own_time * 100 / total:>7.1F}%")
+        print(f"Saved {self.pstats_path} and {self.collapsed_path}")
+
+
+def write_collapsed_stacks(stats: pstats.Stats, file_path: str):
+    """
+    Writes the profile as collapsed stacks for flame graph tools, one line per call stack of the functions separated by
+    semicolons and the microseconds spent in the last one. cProfile only records which function called which, so the
+    time of a function called from several places is split between them in proportion to the time each call took
+    """
+    entries = stats.stats
+    callees = {}
+    for function, entry in entries.items():
+        for caller, edge in entry[4].items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+
+    folded = {}
+
+    def add_stacks(function, stack: list[str], on_stack: set, share: float):
+        entry = entries[function]
+        stack = stack + [get_function_label(function).replace(";", ",")]
+        own_time = entry[2] * share
+        if own_time > 0:
+            key = ";".join(stack)
+            folded[key] = folded.get(key, 0.0) + own_time
+        on_stack.add(function)
+        for callee, edge_time in callees.get(function, []):
+            callee_time = entries[callee][3]
+            # Skips recursion, which is already counted in the callee's time, and calls too small to show
+            if callee in on_stack or callee_time <= 0 or edge_time * share < 1e-7:
+                continue
+            add_stacks(callee, stack, on_stack, share * edge_time / callee_time)
+        on_stack.discard(function)
+
+    # Starts from the functions nothing in the profile called
+    for function, entry in entries.items():
+        if len(entry[4]) == 0:
+            add_stacks(function, [], set(), 1.0)
+
+    with open(file_path, "w") as file:
+        for stack, stack_time in sorted(folded.items()):
+            microseconds = round(stack_time * 1000000)
+            if microseconds > 0:
+                file.write(f"{stack} {microseconds}\n")
+
+
+def profile_search(searcher: Searcher, algorithm, algorithm_name: str,
+                   directory: str = PROFILE_DIRECTORY) -> SearchProfile:
+    """
+    Runs the algorithm on the searcher under cProfile, saving the statistics as .pstats for pstats or snakeviz and as
+    collapsed stacks for flame graph tools, named after the maze and algorithm. Profiling slows small functions down
+    the most, so the times are for comparing parts of a search, not for benchmarking it
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(searcher.run_search, algorithm)
+
+    os.makedirs(directory, exist_ok=True)
+    base_path = get_profile_path(searcher.maze, algorithm_name, directory)
+    profiler.dump_stats(base_path + ".pstats")
+    stats = pstats.Stats(profiler)
+    write_collapsed_stacks(stats, base_path + ".collapsed")
+    return SearchProfile(searcher.maze.file_name, algorithm_name, stats, base_path + ".pstats",
+                         base_path + ".collapsed")
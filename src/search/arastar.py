@@ -0,0 +1,147 @@
+from src.int2 import int2
+from src.search.astar import calculate_goals_heuristic
+from src.searcher import Searcher, QueueNode
+
+# Heuristic weight of the first search, each search after lowers it by DEFAULT_EPSILON_STEP until it reaches 1
+DEFAULT_START_EPSILON = 3.0
+DEFAULT_EPSILON_STEP = 0.5
+
+
+def run(searcher: Searcher, start_epsilon: float = DEFAULT_START_EPSILON, epsilon_step: float = DEFAULT_EPSILON_STEP):
+    """
+    Performs Anytime Repairing A* search. Runs weighted A* with a high epsilon to find a path quickly and publishes it
+    through the searcher, then lowers epsilon and repairs the search rather than starting again, only expanding nodes
+    whose cost went down since they were last expanded. Each published path comes with a bound on how far from optimal
+    it can be, and the search stops once epsilon reaches 1 and the path is optimal.
+    Yields after each Pop and after processing each neighbour to allow for GUI updates
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    maze = searcher.maze
+    epsilon = start_epsilon
+
+    # Positions in the open list, positions expanded by the current search, and positions whose cost went down after
+    # the current search expanded them, which wait for the next search
+    open_set: set[int2] = set()
+    closed: set[int2] = set()
+    inconsistent: set[int2] = set()
+
+    # Cheapest goal found so far and the cost to reach it
+    goal: int2 = None
+    goal_cost: int = None
+
+    def estimate(pos: int2) -> float:
+        return searcher.get_node_data(pos).path_cost + epsilon * calculate_goals_heuristic(pos, maze.goals)
+
+    # Add the starting position to the queue
+    open_set.add(maze.start)
+    searcher.get_node_data(maze.start).update_node_data(None, 0, 0)
+    searcher.priority_queue.push(QueueNode(maze.start, estimate(maze.start)))
+    searcher.stats.record_push(searcher.priority_queue.size())
+
+    while True:
+        # Expand nodes until none left in the queue could lead to a cheaper path than the one to the goal found so far
+        while not searcher.priority_queue.empty():
+            curr_queue_node = searcher.priority_queue.pop()
+            pos = curr_queue_node.pos
+            curr_node_data = searcher.get_node_data(pos)
+            curr_node_data.decrement_queue_count()
+
+            # The node is stale if it has been expanded since, or added to the queue again with a lower cost
+            stale = pos not in open_set or curr_queue_node.cost != estimate(pos)
+            searcher.stats.record_pop(stale)
+            if stale:
+                continue
+
+            # Nothing left can improve on the goal found so far, put the node back for the next search
+            if goal_cost is not None and goal_cost <= curr_queue_node.cost:
+                searcher.priority_queue.push(curr_queue_node)
+                curr_node_data.in_queue_count += 1
+                break
+
+            open_set.remove(pos)
+            closed.add(pos)
+            searcher.current_pos = pos
+            searcher.stats.record_expansion(curr_node_data.visited)
+
+            # Set current node as visited, and increment node explored
+            curr_node_data.visited = True
+            searcher.nodes_explored += 1
+
+            # Yield execution to allow graphical update of progress
+            yield False, f"Retrieved node {pos} with estimated cost {curr_queue_node.cost} from the queue."
+
+            # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
+            for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+                searcher.current_neighbour_pos = neighbour_pos
+                yield False, f"  Processing neighbour {neighbour_pos}."
+
+                # If we've already found a path at least as short to this node, skip
+                cost = curr_node_data.path_cost + edge_cost
+                neighbour_node_data = searcher.get_node_data(neighbour_pos)
+                if neighbour_node_data.path_cost is not None and neighbour_node_data.path_cost <= cost:
+                    yield False, "    Already found shorter path, skipping..."
+                    continue
+
+                # Update the node data with parent, cost to reach node, and current depth
+                neighbour_node_data.update_node_data(pos, cost, curr_node_data.depth + 1)
+                if maze.is_goal(neighbour_pos) and (goal_cost is None or cost < goal_cost):
+                    goal = neighbour_pos
+                    goal_cost = cost
+
+                # A node this search has already expanded isn't expanded again until the next search
+                if neighbour_pos in closed:
+                    inconsistent.add(neighbour_pos)
+                    neighbour_node_data.decrement_queue_count()
+                    yield False, "    Found shorter path to an expanded node, keeping it for the next search..."
+                    continue
+
+                open_set.add(neighbour_pos)
+                searcher.priority_queue.push(QueueNode(neighbour_pos, estimate(neighbour_pos)))
+                searcher.stats.record_push(searcher.priority_queue.size())
+                searcher.adding_to_queue_pos = neighbour_pos
+                yield False, "    Added to the queue."
+
+            # Clear that any neighbour is being processed
+            searcher.current_neighbour_pos = None
+
+            # Clear that any node is being added to the queue
+            searcher.adding_to_queue_pos = None
+
+        if goal is None:
+            yield True, "Path not found."
+            return
+
+        # The optimal cost is at least the lowest unweighted estimate of the nodes that could still lead somewhere
+        # cheaper, which can prove the path is closer to optimal than epsilon alone does
+        lowest = min([searcher.get_node_data(pos).path_cost + calculate_goals_heuristic(pos, maze.goals)
+                      for pos in open_set | inconsistent] + [goal_cost])
+        bound = max(min(epsilon, goal_cost / lowest if lowest > 0 else epsilon), 1.0)
+
+        # Publish the path so it can be shown while the search carries on improving it
+        searcher.reached_goal = goal
+        result = searcher.publish_result(epsilon, bound)
+        yield False, f"  Published path to goal {goal}. {result}"
+
+        if bound <= 1.0:
+            yield True, f"  Found optimal path to goal node {goal}."
+            return
+
+        # Lower epsilon and start the next search from the open and inconsistent nodes of the last one
+        epsilon = max(epsilon - epsilon_step, 1.0)
+        open_set |= inconsistent
+        inconsistent.clear()
+        closed.clear()
+
+        # The estimates of everything in the queue depend on epsilon, so rebuild it
+        while not searcher.priority_queue.empty():
+            searcher.get_node_data(searcher.priority_queue.pop().pos).decrement_queue_count()
+        searcher.priority_queue.clear()
+        for pos in open_set:
+            searcher.get_node_data(pos).in_queue_count += 1
+            searcher.priority_queue.push(QueueNode(pos, estimate(pos)))
+            searcher.stats.record_push(searcher.priority_queue.size())
+
+        yield False, f"Searching again with epsilon {epsilon}."
@@ -1,23 +1,44 @@
 from src.maze import Maze
 from src.int2 import int2
-from src.searcher import Searcher, QueueNode
+from src.searcher import Searcher, QueueNode, TIE_BREAK_LIFO
 
+# Heuristic weight used by weighted A* when none is given
+DEFAULT_WEIGHTED_EPSILON = 2.0
 
-def run(searcher: Searcher):
+
+def run(searcher: Searcher, epsilon: float = 1, heuristic=None, resume: bool = False,
+        tie_break: str = TIE_BREAK_LIFO):
     """
     Performs A* search. Yields after each Pop and after processing all directions to allow for GUI updates.
-    Returns a str containing information about the step that is currently in process
+    Returns a str containing information about the step that is currently in process.
+    With an epsilon above 1 this is weighted A*, the heuristic is multiplied by epsilon so the search heads for the goal
+    more greedily and expands fewer nodes, finding a path that costs at most epsilon times the optimal.
+    heuristic is called as heuristic(pos, goals) and defaults to calculate_goals_heuristic, any other has to never
+    overestimate the cost to the nearest goal for the path to be optimal
+    With resume the search carries on from the state a checkpoint restored to the searcher instead of starting over
+    tie_break is how nodes of equal cost are ordered in the queue, one of searcher.TIE_BREAKS
     """
 
-    # Initialises the searcher, clearing the queue and resetting the Nodes to default
-    searcher.initialise()
+    if heuristic is None:
+        heuristic = calculate_goals_heuristic
+
+    if not resume:
+        # Initialises the searcher, clearing the queue and resetting the Nodes to default
+        searcher.initialise()
+
+        # Add the starting position to the queue
+        searcher.priority_queue.push(QueueNode(searcher.maze.start, 0))
+        searcher.stats.record_push(searcher.priority_queue.size())
+        searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
 
-    # Add the starting position to the queue
-    searcher.priority_queue.push(QueueNode(searcher.maze.start, 0))
-    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+    # Set after initialising, which goes back to breaking ties LIFO
+    searcher.set_tie_break(tie_break)
 
     # Loop until the queue is empty
     while not searcher.priority_queue.empty():
+        # Between expansions the node data, queue and counters are the whole state, so a checkpoint can be saved
+        searcher.checkpoint_if_due()
+
         # As this is A* search get the QueueNode off the queue with the best estimated cost
         curr_queue_node = searcher.priority_queue.pop()
         pos = curr_queue_node.pos
@@ -25,6 +46,11 @@ def run(searcher: Searcher):
         curr_node_data = searcher.get_node_data(pos)
         curr_node_data.decrement_queue_count()
 
+        # The node is stale if it has been added to the queue again since with a lower cost
+        searcher.stats.record_pop(curr_queue_node.cost >
+                                  curr_node_data.path_cost + epsilon * heuristic(pos, searcher.maze.goals))
+        searcher.stats.record_expansion(curr_node_data.visited)
+
         # Set current node as visited, and increment node explored
         curr_node_data.visited = True
         searcher.nodes_explored += 1
@@ -34,6 +60,7 @@ def run(searcher: Searcher):
 
         # Check if this node is the goal node and break
         if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
             yield True, f"  Found goal node {pos}."
 
         # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
@@ -41,7 +68,8 @@ def run(searcher: Searcher):
             searcher.current_neighbour_pos = neighbour[0]
             yield False, f"  Processing neighbour {neighbour[0]}."
             # Processes the neighbour, yields a string explaining the current processing step
-            yield process_neighbour(searcher, pos, neighbour[0], curr_node_data.path_cost + neighbour[1], curr_node_data.depth + 1)
+            yield process_neighbour(searcher, pos, neighbour[0], curr_node_data.path_cost + neighbour[1], curr_node_data.depth + 1,
+                                    epsilon, heuristic)
 
         # Clear that any neighbour is being processed
         searcher.current_neighbour_pos = None
@@ -52,7 +80,8 @@ def run(searcher: Searcher):
     yield True, "Path not found."
 
 
-def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, depth: int) -> tuple[bool, str]:
+def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, depth: int,
+                      epsilon: float = 1, heuristic=None) -> tuple[bool, str]:
     """
     Tests if a neighbour node is suitable for adding to queue, if so it's added
     """
@@ -64,12 +93,15 @@ def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, de
     if curr_node_data.path_cost is not None and curr_node_data.path_cost <= cost:
         return False, "    Already found shorter path, skipping..."
 
-    # Calculate the heuristic, a best-case estimate on how far away from the goal we are
-    # Add it to the cost to reach the tile to get the best expected total path length
-    dist_estimate = calculate_heuristic(pos, searcher.maze.goal) + cost
+    # Calculate the heuristic, a best-case estimate on how far away from the nearest goal we are
+    # Add it to the cost to reach the tile to get the best expected total path length, weighted A* inflates the estimate
+    if heuristic is None:
+        heuristic = calculate_goals_heuristic
+    dist_estimate = epsilon * heuristic(pos, searcher.maze.goals) + cost
 
     # Add this node to the priority queue
-    searcher.priority_queue.push(QueueNode(pos, dist_estimate))
+    searcher.priority_queue.push(QueueNode(pos, dist_estimate), searcher.get_tie_value(pos, cost))
+    searcher.stats.record_push(searcher.priority_queue.size())
 
     # Update the node data with parent, cost to reach node, and current depth
     curr_node_data.update_node_data(parent, cost, depth)
@@ -85,3 +117,11 @@ def calculate_heuristic(p1: int2, p2: int2) -> int:
     """
     diff = p2 - p1
     return abs(diff.x) + abs(diff.y)
+
+
+def calculate_goals_heuristic(pos: int2, goals: list[int2]) -> int:
+    """
+    Calculates the manhattan distance to the nearest of the goals. As it never overestimates the distance to any goal
+    it never overestimates the distance to the cheapest one, so A* still finds the cheapest goal to reach in one search
+    """
+    return min(calculate_heuristic(pos, goal) for goal in goals)
@@ -0,0 +1,101 @@
+from src.int2 import int2
+from src.search.astar import calculate_goals_heuristic
+from src.searcher import Searcher
+
+# Number of nodes kept at each depth when no beam width is given
+DEFAULT_BEAM_WIDTH = 8
+
+
+def run(searcher: Searcher, beam_width: int = DEFAULT_BEAM_WIDTH):
+    """
+    Performs Beam search. Searches one depth at a time like BFS, but only the beam_width nodes at each depth with the
+    lowest estimated total cost are kept, so the queue never holds more than beam_width nodes. Much cheaper than A* on
+    large mazes, but the path found isn't always the cheapest and a narrow beam can miss the goal altogether.
+    Yields after each popleft and after processing all directions to allow for GUI updates.
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    # Add the starting position to the queue, the queue holds the nodes of the current depth
+    searcher.deque.append(searcher.maze.start)
+    searcher.stats.record_push(len(searcher.deque))
+    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+
+    # Nodes found for the next depth, (estimated total cost, pos) tuples
+    next_depth: list[tuple[int, int2]] = []
+
+    # Loop until a depth has no nodes left
+    while len(searcher.deque) > 0:
+        pos = searcher.deque.popleft()
+        searcher.current_pos = pos
+        curr_node_data = searcher.get_node_data(pos)
+        curr_node_data.decrement_queue_count()
+        searcher.stats.record_pop()
+
+        # Set current node as visited, and increment node explored
+        curr_node_data.visited = True
+        searcher.nodes_explored += 1
+
+        # Yield execution to allow graphical update of progress
+        yield False, f"Dequeued {pos} from the beam."
+
+        # Check if this node is the goal node and break
+        if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
+            yield True, f"  Found goal node {pos}."
+
+        # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
+        for neighbour in searcher.maze.get_neighbours(pos):
+            searcher.current_neighbour_pos = neighbour[0]
+            yield False, f"  Processing neighbour {neighbour[0]}."
+            # Processes the neighbour, yields a string explaining the current processing step
+            yield process_neighbour(searcher, next_depth, pos, neighbour[0], curr_node_data.path_cost + neighbour[1],
+                                    curr_node_data.depth + 1)
+
+        # Clear that any neighbour is being processed
+        searcher.current_neighbour_pos = None
+
+        # Clear that any node is being added to the queue
+        searcher.adding_to_queue_pos = None
+
+        # Once the current depth is done, keep the best of the next depth and drop the rest
+        if len(searcher.deque) == 0 and len(next_depth) > 0:
+            next_depth.sort(key=lambda candidate: candidate[0])
+            for estimate, candidate_pos in next_depth[beam_width:]:
+                searcher.get_node_data(candidate_pos).decrement_queue_count()
+            for estimate, candidate_pos in next_depth[:beam_width]:
+                searcher.deque.append(candidate_pos)
+                searcher.stats.record_push(len(searcher.deque))
+            dropped = max(len(next_depth) - beam_width, 0)
+            next_depth = []
+            yield False, f"Kept the best {len(searcher.deque)} nodes of the next depth, dropped {dropped}."
+
+    yield True, "Path not found."
+
+
+def process_neighbour(searcher: Searcher, next_depth: list[tuple[int, int2]], parent: int2, pos: int2, cost: int,
+                      depth: int) -> tuple[bool, str]:
+    """
+    Tests if a neighbour node is suitable for the next depth, if so it's added as a candidate
+    """
+
+    # Get the node data of this neighbour
+    curr_node_data = searcher.get_node_data(pos)
+
+    # Verify we haven't visited this node yet, and it isn't already a candidate. Nodes dropped from the beam can be
+    # found again later
+    if curr_node_data.visited:
+        return False, "    Already visited, skipping..."
+    if curr_node_data.in_queue():
+        return False, "    Already a candidate for the next depth, skipping..."
+
+    # Add this node to the candidates with its best expected total path length
+    next_depth.append((cost + calculate_goals_heuristic(pos, searcher.maze.goals), pos))
+
+    # Update the node data with parent, cost to reach node, and current depth
+    curr_node_data.update_node_data(parent, cost, depth)
+    # Store that this node is currently being added to the queue for display purposes
+    searcher.adding_to_queue_pos = pos
+
+    return False, "    Added as a candidate for the next depth."
@@ -4,27 +4,34 @@ from src.searcher import Searcher, QueueNode
 from collections import deque
 
 
-def run(searcher: Searcher):
+def run(searcher: Searcher, resume: bool = False):
     """
     Executes Breadth First Search Algorithm (BFS).
     Visits all nodes at the current depth before moving to the next depth.
     Yields after each popleft and after processing all directions to allow for GUI updates.
+    With resume the search carries on from the state a checkpoint restored to the searcher instead of starting over
     """
 
-    # Initialises the searcher and clearing the queue, resetting the Nodes to default
-    searcher.initialise()
+    if not resume:
+        # Initialises the searcher and clearing the queue, resetting the Nodes to default
+        searcher.initialise()
 
-    # Add the starting position to the queue, Deque to enable FIFO behaviour
-    searcher.deque.append(searcher.maze.start)
-    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+        # Add the starting position to the queue, Deque to enable FIFO behaviour
+        searcher.deque.append(searcher.maze.start)
+        searcher.stats.record_push(len(searcher.deque))
+        searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
 
     # while priority queue is not empty
     while len(searcher.deque) > 0:
+        # Between expansions the node data, queue and counters are the whole state, so a checkpoint can be saved
+        searcher.checkpoint_if_due()
+
         # This is BFS search gets source node (first node inserted into queue) off the queue, FIFO using popleft()
         pos = searcher.deque.popleft()
         searcher.current_pos = pos
         curr_node_data = searcher.get_node_data(pos)
         curr_node_data.decrement_queue_count()
+        searcher.stats.record_pop()
 
         # Set current node as visited, and increment node explored
         curr_node_data.visited = True
@@ -35,6 +42,7 @@ def run(searcher: Searcher):
 
         # Check if this node is the goal node and break
         if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
             yield True, f"  Found goal node {pos}."
 
         # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
@@ -71,6 +79,7 @@ def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, de
 
     # Add this node to the queue
     searcher.deque.append(pos)
+    searcher.stats.record_push(len(searcher.deque))
 
     # Update the node data with parent, cost to reach node, and current depth
     curr_node_data.update_node_data(parent, cost, depth)
@@ -0,0 +1,310 @@
+import heapq
+import time
+from array import array
+
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher
+
+# Most nodes a witness search settles before giving up and adding the shortcut anyway. Extra shortcuts never make a
+# query wrong, they only make it slower, so a low limit keeps preprocessing fast
+WITNESS_SETTLE_LIMIT = 64
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a maze for fast repeated point-to-point queries. Floor tiles are contracted one at a time
+    in order of how few shortcuts removing them needs, and for every cheapest path that went through a removed tile a
+    shortcut edge is added between its neighbours, costing the same as the path. As an edge costs whatever the tile it
+    enters costs, shortcuts are directed, and a shortcut's cost counts the 1 or 5 of every tile it passes through.
+    Every cheapest path then goes up the order from the start and down the order to the goal, so a query only searches
+    upwards from both ends, which settles a tiny fraction of the maze
+    """
+    # Maze the hierarchy was built for
+    maze: Maze
+
+    # Floor tiles, numbering the nodes of the hierarchy
+    cells: list[int2]
+
+    # Number of each tile in cells, indexed by y * width + x, -1 for walls
+    cell_numbers: array
+
+    # Order each node was contracted in, queries only search towards higher ranks
+    rank: array
+
+    # For each node, the edges to higher ranked nodes as (node, cost), searched by the forward half of a query
+    upward: list[list[tuple[int, int]]]
+
+    # For each node, the edges from higher ranked nodes as (node, cost), searched backwards by the other half
+    downward: list[list[tuple[int, int]]]
+
+    # The node each shortcut (from, to) was added to skip, used to unpack shortcuts back into the tiles they cover
+    middles: dict[tuple[int, int], int]
+
+    # Time in seconds spent building the hierarchy
+    build_time: float
+
+    def __init__(self, maze: Maze):
+        timer = time.perf_counter()
+        self.maze = maze
+        self.cells = [int2(x, y) for y in range(maze.dimensions.y) for x in range(maze.dimensions.x)
+                      if not maze.is_wall(int2(x, y))]
+        self.cell_numbers = array("i", [-1]) * (maze.dimensions.x * maze.dimensions.y)
+        for number, pos in enumerate(self.cells):
+            self.cell_numbers[pos.y * maze.dimensions.x + pos.x] = number
+
+        node_count = len(self.cells)
+        self.rank = array("i", [0]) * node_count
+        self.upward = [[] for i in range(node_count)]
+        self.downward = [[] for i in range(node_count)]
+        self.middles = {}
+
+        # Edges between the nodes not yet contracted, as {node: cost} going out of and coming into each node
+        self.out_edges: list[dict[int, int]] = [{} for i in range(node_count)]
+        self.in_edges: list[dict[int, int]] = [{} for i in range(node_count)]
+        for number, pos in enumerate(self.cells):
+            for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+                neighbour = self.get_cell_number(neighbour_pos)
+                self.out_edges[number][neighbour] = edge_cost
+                self.in_edges[neighbour][number] = edge_cost
+
+        self.contract_all()
+
+        # The edges of contracted nodes have all been moved into upward and downward
+        del self.out_edges
+        del self.in_edges
+        self.build_time = time.perf_counter() - timer
+
+    def get_cell_number(self, pos: int2) -> int:
+        """
+        Returns the node number of the floor tile, or -1 for a wall
+        """
+        return self.cell_numbers[pos.y * self.maze.dimensions.x + pos.x]
+
+    def contract_all(self):
+        """
+        Contracts every node, cheapest first. A node's priority is the shortcuts it needs less the edges it removes, plus
+        how many of its neighbours are already contracted to spread contraction evenly over the maze. Priorities change
+        as neighbours are contracted, so a node is checked again when it comes off the queue and put back if it's no
+        longer the cheapest
+        """
+        contracted_neighbours = [0] * len(self.cells)
+
+        def priority(node: int) -> int:
+            edges = len(self.in_edges[node]) + len(self.out_edges[node])
+            return len(self.find_shortcuts(node)) - edges + contracted_neighbours[node]
+
+        queue = [(priority(node), node) for node in range(len(self.cells))]
+        heapq.heapify(queue)
+        next_rank = 0
+        while len(queue) > 0:
+            old_priority, node = heapq.heappop(queue)
+            new_priority = priority(node)
+            if len(queue) > 0 and new_priority > queue[0][0]:
+                heapq.heappush(queue, (new_priority, node))
+                continue
+
+            shortcuts = self.find_shortcuts(node)
+            self.rank[node] = next_rank
+            next_rank += 1
+
+            # The remaining neighbours all rank higher than this node, so its edges to and from them are final
+            for neighbour, cost in self.out_edges[node].items():
+                self.upward[node].append((neighbour, cost))
+                del self.in_edges[neighbour][node]
+                contracted_neighbours[neighbour] += 1
+            for neighbour, cost in self.in_edges[node].items():
+                self.downward[node].append((neighbour, cost))
+                del self.out_edges[neighbour][node]
+                contracted_neighbours[neighbour] += 1
+            self.out_edges[node] = {}
+            self.in_edges[node] = {}
+
+            for source, target, cost in shortcuts:
+                existing = self.out_edges[source].get(target)
+                if existing is None or cost < existing:
+                    self.out_edges[source][target] = cost
+                    self.in_edges[target][source] = cost
+                    self.middles[(source, target)] = node
+
+    def find_shortcuts(self, node: int) -> list[tuple[int, int, int]]:
+        """
+        Returns the shortcuts as (from, to, cost) needed to contract the node, one for each pair of neighbours whose
+        cheapest path goes through it. A witness search from each incoming neighbour that avoids the node looks for
+        another path at least as cheap, in which case no shortcut is needed
+        """
+        shortcuts = []
+        out_edges = self.out_edges[node]
+        if len(out_edges) == 0:
+            return shortcuts
+        max_out_cost = max(out_edges.values())
+        for source, in_cost in self.in_edges[node].items():
+            witness_costs = self.witness_search(source, node, in_cost + max_out_cost)
+            for target, out_cost in out_edges.items():
+                if target == source:
+                    continue
+                cost = in_cost + out_cost
+                witness_cost = witness_costs.get(target)
+                if witness_cost is None or witness_cost > cost:
+                    shortcuts.append((source, target, cost))
+        return shortcuts
+
+    def witness_search(self, source: int, avoid: int, max_cost: int) -> dict[int, int]:
+        """
+        Dijkstra's search from the source over the nodes not yet contracted without passing through avoid, stopping at
+        max_cost or after WITNESS_SETTLE_LIMIT nodes. Returns the cost of every node reached
+        """
+        costs = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+        while len(queue) > 0 and settled < WITNESS_SETTLE_LIMIT:
+            cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+            if cost > max_cost:
+                break
+            settled += 1
+            for neighbour, edge_cost in self.out_edges[node].items():
+                if neighbour == avoid:
+                    continue
+                neighbour_cost = cost + edge_cost
+                if neighbour not in costs or neighbour_cost < costs[neighbour]:
+                    costs[neighbour] = neighbour_cost
+                    heapq.heappush(queue, (neighbour_cost, neighbour))
+        return costs
+
+    def shortcut_count(self) -> int:
+        """
+        Returns the number of shortcuts the hierarchy added
+        """
+        return len(self.middles)
+
+    def query(self, start: int2, goal: int2, settled: list[int2] = None) -> tuple[list[int2], int]:
+        """
+        Finds the cheapest path from start to goal, returning (path, cost), or ([], None) if there is no path. Searches
+        upwards from the start and backwards upwards from the goal, alternating between whichever has the cheaper node
+        next, and stops once neither can beat the cheapest meeting point found. The tiles each search settles are added
+        to settled if it's given
+        """
+        source = self.get_cell_number(start)
+        target = self.get_cell_number(goal)
+        if source == -1 or target == -1:
+            return [], None
+
+        # Costs and parents of the forward search from the start and the backward search from the goal
+        costs = ({source: 0}, {target: 0})
+        parents = ({source: None}, {target: None})
+        queues = ([(0, source)], [(0, target)])
+        edges = (self.upward, self.downward)
+        best_cost = None
+        meeting = None
+
+        while True:
+            # Pick the search with the cheaper next node, stopping when neither can lead anywhere cheaper
+            side = None
+            for i in range(2):
+                if len(queues[i]) > 0 and (best_cost is None or queues[i][0][0] < best_cost) and \
+                        (side is None or queues[i][0][0] < queues[side][0][0]):
+                    side = i
+            if side is None:
+                break
+
+            cost, node = heapq.heappop(queues[side])
+            if cost > costs[side][node]:
+                continue
+            if settled is not None:
+                settled.append(self.cells[node])
+
+            other_cost = costs[1 - side].get(node)
+            if other_cost is not None and (best_cost is None or cost + other_cost < best_cost):
+                best_cost = cost + other_cost
+                meeting = node
+
+            for neighbour, edge_cost in edges[side][node]:
+                neighbour_cost = cost + edge_cost
+                if neighbour not in costs[side] or neighbour_cost < costs[side][neighbour]:
+                    costs[side][neighbour] = neighbour_cost
+                    parents[side][neighbour] = node
+                    heapq.heappush(queues[side], (neighbour_cost, neighbour))
+
+        if meeting is None:
+            return [], None
+
+        # Nodes from the start up to the meeting point, then down to the goal
+        nodes = []
+        node = meeting
+        while node is not None:
+            nodes.append(node)
+            node = parents[0][node]
+        nodes.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            nodes.append(node)
+            node = parents[1][node]
+
+        return self.unpack(nodes), best_cost
+
+    def unpack(self, nodes: list[int]) -> list[int2]:
+        """
+        Replaces every shortcut between the nodes with the tiles it covers, returning the full path of tiles
+        """
+        path = [self.cells[nodes[0]]]
+        for i in range(1, len(nodes)):
+            # Unpack the edge depth first, each shortcut splits into the two edges either side of its middle node
+            stack = [(nodes[i - 1], nodes[i])]
+            while len(stack) > 0:
+                source, target = stack.pop()
+                middle = self.middles.get((source, target))
+                if middle is None:
+                    path.append(self.cells[target])
+                else:
+                    stack.append((middle, target))
+                    stack.append((source, middle))
+        return path
+
+
+def run(searcher: Searcher, hierarchy: ContractionHierarchy = None):
+    """
+    Finds the cheapest path to the nearest goal with a contraction hierarchy query to each goal, building the hierarchy
+    first unless one is given. The tiles the queries settle are marked visited to show how little of the maze they
+    searched, it yields once when done
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    # The hierarchy only depends on the tiles, so it can be used for a maze with the same tiles and another start or goal
+    maze = searcher.maze
+    if hierarchy is None or hierarchy.maze.nodes is not maze.nodes:
+        hierarchy = ContractionHierarchy(maze)
+
+    best_path = []
+    best_cost = None
+    settled = []
+    for goal in maze.goals:
+        path, cost = hierarchy.query(maze.start, goal, settled)
+        if len(path) != 0 and (best_cost is None or cost < best_cost):
+            best_path = path
+            best_cost = cost
+
+    for pos in settled:
+        searcher.get_node_data(pos).visited = True
+    searcher.nodes_explored = len(settled)
+
+    if len(best_path) == 0:
+        yield True, "Path not found."
+        return
+
+    # Store the path in the node data so the searcher reconstructs it
+    path_cost = 0
+    for depth, pos in enumerate(best_path):
+        node_data = searcher.get_node_data(pos)
+        if depth > 0:
+            path_cost += maze.get_edge_cost_to(pos)
+            node_data.parent = best_path[depth - 1]
+        node_data.path_cost = path_cost
+        node_data.depth = depth
+
+    searcher.reached_goal = best_path[-1]
+    searcher.current_pos = searcher.reached_goal
+    yield True, f"  Found goal node {searcher.reached_goal}."
@@ -0,0 +1,431 @@
+import heapq
+import random
+import time
+
+from src.int2 import int2
+from src.maze import Maze
+
+# Number of time steps each agent plans ahead when planning in windows, agents move half a window between plans
+DEFAULT_WINDOW = 16
+
+# Number of rounds in a row planning in windows can go without the agents getting any closer to their goals before
+# the agents are considered stuck
+STALLED_ROUNDS = 8
+
+
+class GoalDistances:
+    """
+    Cost of the cheapest path from every position to a goal, found with a backwards Dijkstra's search the first time
+    the goal is asked for and then shared by every agent heading there. Used as the heuristic of the space-time
+    searches, as unlike the manhattan distance it accounts for walls
+    """
+    # Maze the distances are calculated on
+    maze: Maze
+
+    # Grid of distances to each goal by (x, y) goal position, None for positions that can't reach the goal
+    tables: dict[tuple[int, int], list[list[int]]]
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.tables = {}
+
+    def get(self, goal: int2) -> list[list[int]]:
+        """
+        Returns the grid of distances to the goal, calculating it if this is the first agent to ask
+        """
+        table = self.tables.get((goal.x, goal.y))
+        if table is None:
+            table = self.calculate(goal)
+            self.tables[(goal.x, goal.y)] = table
+        return table
+
+    def calculate(self, goal: int2) -> list[list[int]]:
+        """
+        Searches outwards from the goal, the cost of stepping from a neighbour to a position is the cost of the position
+        """
+        maze = self.maze
+        table = [[None for x in range(maze.dimensions.x)] for y in range(maze.dimensions.y)]
+        table[goal.y][goal.x] = 0
+        queue = [(0, goal.x, goal.y)]
+        while len(queue) > 0:
+            distance, x, y = heapq.heappop(queue)
+            if distance > table[y][x]:
+                continue
+            pos = int2(x, y)
+            step_cost = maze.get_edge_cost_to(pos)
+            for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+                neighbour_distance = distance + step_cost
+                current = table[neighbour_pos.y][neighbour_pos.x]
+                if current is None or neighbour_distance < current:
+                    table[neighbour_pos.y][neighbour_pos.x] = neighbour_distance
+                    heapq.heappush(queue, (neighbour_distance, neighbour_pos.x, neighbour_pos.y))
+        return table
+
+
+class ReservationTable:
+    """
+    Shared record of which agent occupies each position at each time step, agents planned later have to avoid the
+    positions reserved by agents planned before them
+    """
+    # Agent occupying each (x, y, time step)
+    cells: dict[tuple[int, int, int], int]
+
+    # Agents that have finished their path and stay at their goal, as (time step they arrive, agent) by (x, y)
+    parked: dict[tuple[int, int], tuple[int, int]]
+
+    # Last time step each (x, y) position is reserved at, an agent can only stop on a position after this
+    last_reserved: dict[tuple[int, int], int]
+
+    def __init__(self):
+        self.cells = {}
+        self.parked = {}
+        self.last_reserved = {}
+
+    def occupant(self, x: int, y: int, t: int) -> int:
+        """
+        Returns the agent occupying the position at the time step, or None if it is free
+        """
+        agent = self.cells.get((x, y, t))
+        if agent is None:
+            parked = self.parked.get((x, y))
+            if parked is not None and t >= parked[0]:
+                agent = parked[1]
+        return agent
+
+    def can_move(self, agent: int, x: int, y: int, to_x: int, to_y: int, t: int) -> bool:
+        """
+        Returns true if the agent can move between the positions from time step t to t + 1 without standing on another
+        agent, or swapping places with one as they would pass through each other
+        """
+        occupant = self.occupant(to_x, to_y, t + 1)
+        if occupant is not None and occupant != agent:
+            return False
+        if to_x == x and to_y == y:
+            return True
+        oncoming = self.occupant(to_x, to_y, t)
+        return oncoming is None or oncoming == agent or self.occupant(x, y, t + 1) != oncoming
+
+    def reserve(self, agent: int, path: list[int2], start_time: int, park: bool):
+        """
+        Reserves the positions of the path for the agent from the start time, if park is true the agent stays on the
+        last position of the path forever after
+        """
+        for i, pos in enumerate(path):
+            self.cells[(pos.x, pos.y, start_time + i)] = agent
+            self.last_reserved[(pos.x, pos.y)] = max(self.last_reserved.get((pos.x, pos.y), -1), start_time + i)
+        if park:
+            end = path[-1]
+            self.parked[(end.x, end.y)] = (start_time + len(path) - 1, agent)
+            self.last_reserved[(end.x, end.y)] = float("inf")
+
+
+class CooperativePlan:
+    """
+    Paths of a group of agents planned together so they never collide
+    """
+    # Position of each agent at each time step, an agent stays at the end of its path once it runs out. An agent that
+    # never enters the maze has an empty path
+    paths: list[list[int2]]
+
+    # Agents that couldn't reach their goal. Planning without a window they never enter the maze and their path is
+    # empty, planning in windows their path ends where the group got stuck
+    failed: list[int]
+
+    # Total number of space-time nodes expanded by all the agent searches
+    expansions: int
+
+    # Time in seconds spent planning, including calculating the goal distances
+    plan_time: float
+
+    def __init__(self, paths: list[list[int2]], failed: list[int], expansions: int, plan_time: float):
+        self.paths = paths
+        self.failed = failed
+        self.expansions = expansions
+        self.plan_time = plan_time
+
+    def makespan(self) -> int:
+        """
+        Returns the number of time steps until the last agent reaches the end of its path
+        """
+        return max((len(path) for path in self.paths), default=1) - 1
+
+    def path_cost(self, maze: Maze, agent: int) -> int:
+        """
+        Returns the cost of an agent's path, waiting in place costs the same as stepping onto floor
+        """
+        path = self.paths[agent]
+        return sum(maze.get_edge_cost_to(path[i]) for i in range(1, len(path)))
+
+
+def plan(maze: Maze, starts: list[int2], goals: list[int2], window: int = DEFAULT_WINDOW, max_time: int = None,
+         distances: GoalDistances = None) -> CooperativePlan:
+    """
+    Plans collision free paths for agents moving from each start to the goal with the same index, one agent at a time
+    in a shared space-time reservation table (Cooperative A*). With a window each agent only plans window steps ahead
+    and everyone replans after moving half of that (Windowed Hierarchical Cooperative A*), which keeps each search small
+    and lets agents move out of the way of each other. With window None each agent plans its whole path once.
+    Agents can wait in place, and stay on their goal once they reach it. Gives up on agents still planning at max_time.
+    The goal distances can be passed in to share them between plans on the same maze
+    """
+    timer = time.perf_counter()
+
+    # Give the agents plenty of time to queue for narrow corridors by default
+    if max_time is None:
+        max_time = maze.dimensions.x * maze.dimensions.y + len(starts)
+
+    if distances is None:
+        distances = GoalDistances(maze)
+    if window is None:
+        paths, failed, expansions = plan_full(maze, distances, starts, goals, max_time)
+    else:
+        paths, failed, expansions = plan_windowed(maze, distances, starts, goals, window, max_time)
+
+    return CooperativePlan(paths, failed, expansions, time.perf_counter() - timer)
+
+
+def plan_full(maze: Maze, distances: GoalDistances, starts: list[int2], goals: list[int2],
+              max_time: int) -> tuple[list[list[int2]], list[int], int]:
+    """
+    Plans each agent's whole path in turn, reserving it and parking the agent on its goal for the agents after it
+    """
+    table = ReservationTable()
+    paths = []
+    failed = []
+    expansions = 0
+
+    for agent, (start, goal) in enumerate(zip(starts, goals)):
+        # Agents parked for good can wall off a goal, which would otherwise be searched for at every time step
+        if not is_reachable(maze, table, start, goal):
+            failed.append(agent)
+            paths.append([])
+            continue
+
+        path, agent_expansions = plan_agent(maze, table, distances.get(goal), agent, start, goal, 0, None, max_time)
+        expansions += agent_expansions
+
+        # An agent with no path never enters the maze, so it has no positions and the agents after it can use its start
+        if path is None:
+            failed.append(agent)
+            paths.append([])
+            continue
+
+        table.reserve(agent, path, 0, True)
+        paths.append(path)
+
+    return paths, failed, expansions
+
+
+def plan_windowed(maze: Maze, distances: GoalDistances, starts: list[int2], goals: list[int2], window: int,
+                  max_time: int) -> tuple[list[list[int2]], list[int], int]:
+    """
+    Plans window steps ahead for every agent in a fresh reservation table, moves everyone half a window along their
+    plans and repeats until every agent is on its goal. Agents not yet planned hold their position for the first step,
+    so the agents before them can't walk straight into them. An agent that still can't find a way through is moved to
+    the front of the order and the round is planned again. Stops early if the agents stop getting closer to their goals
+    """
+    positions = list(starts)
+    paths = [[start] for start in starts]
+    order = list(range(len(starts)))
+    expansions = 0
+    step = max(window // 2, 1)
+    t = 0
+    best_remaining = None
+    stalled_rounds = 0
+
+    while t < max_time:
+        remaining = sum(distances.get(goals[agent])[positions[agent].y][positions[agent].x] for agent in order)
+        if remaining == 0:
+            break
+
+        # Agents going round in circles or waiting on each other never get any closer
+        if best_remaining is None or remaining < best_remaining:
+            best_remaining = remaining
+            stalled_rounds = 0
+        else:
+            stalled_rounds += 1
+            if stalled_rounds >= STALLED_ROUNDS:
+                break
+
+        # Plan the round, retrying with a blocked agent first until everyone fits. Agents that can't be planned even
+        # when they go first are stuck, and stop the whole group
+        for attempt in range(len(order)):
+            table = ReservationTable()
+            for agent in order:
+                table.cells[(positions[agent].x, positions[agent].y, t + 1)] = agent
+            plans = {}
+            blocked = None
+            for agent in order:
+                # Release the hold, the agent's plan decides whether it stays
+                del table.cells[(positions[agent].x, positions[agent].y, t + 1)]
+                path, agent_expansions = plan_agent(maze, table, distances.get(goals[agent]), agent, positions[agent],
+                                                    goals[agent], t, window, t + window)
+                expansions += agent_expansions
+                if path is None:
+                    blocked = agent
+                    break
+                table.reserve(agent, path, t, False)
+                plans[agent] = path
+
+            if blocked is None:
+                break
+            order.remove(blocked)
+            order.insert(0, blocked)
+
+        if blocked is not None:
+            break
+
+        # Move everyone along the first half of their plan
+        for agent in order:
+            paths[agent].extend(plans[agent][1:step + 1])
+            positions[agent] = paths[agent][-1]
+        t += step
+
+    # Agents wait on their goal until everyone has arrived, drop the waiting at the end of each path
+    failed = [agent for agent in range(len(starts)) if positions[agent] != goals[agent]]
+    for agent, path in enumerate(paths):
+        while len(path) > 1 and path[-1] == path[-2]:
+            path.pop()
+
+    return paths, failed, expansions
+
+
+def plan_agent(maze: Maze, table: ReservationTable, distances: list[list[int]], agent: int, start: int2, goal: int2,
+               start_time: int, window: int, max_time: int) -> tuple[list[int2], int]:
+    """
+    Space-time A* search for a single agent, where a node is a position at a time step and waiting in place is a move.
+    Reserved positions are avoided, and the distances to the goal are used as the heuristic. Without a window the
+    search ends on the goal once no other agent needs to pass through it, with a window it ends window steps ahead
+    or on the goal if the agent can stay there until then. Returns the path by time step and the number of expansions,
+    the path is None if there is no way through before max_time
+    """
+    if distances[start.y][start.x] is None:
+        return None, 0
+
+    # Open list of (estimated cost, -cost, sort order, x, y, t, cost), ties go to the node with the highest cost as it is
+    # closest to the goal
+    open_heap = [(distances[start.y][start.x], 0, 0, start.x, start.y, start_time, 0)]
+    best_cost = {(start.x, start.y, start_time): 0}
+    parents = {(start.x, start.y, start_time): None}
+    sort_order_number = 0
+    expansions = 0
+    end_time = None if window is None else start_time + window
+
+    while len(open_heap) > 0:
+        estimate, neg_cost, order, x, y, t, cost = heapq.heappop(open_heap)
+        if cost > best_cost[(x, y, t)]:
+            continue
+        expansions += 1
+
+        # Check if the search can end here
+        at_goal = x == goal.x and y == goal.y and t >= table.last_reserved.get((x, y), -1)
+        if (end_time is not None and t >= end_time) or at_goal:
+            path = reconstruct(parents, (x, y, t))
+            # A windowed plan that reaches the goal early waits there until the end of the window
+            if end_time is not None:
+                path.extend([path[-1]] * (end_time - t))
+            return path, expansions
+
+        if t >= max_time:
+            continue
+
+        # Try waiting in place and moving in each direction
+        pos = int2(x, y)
+        moves = [(pos, 1)] + maze.get_neighbours(pos)
+        for next_pos, edge_cost in moves:
+            if not table.can_move(agent, x, y, next_pos.x, next_pos.y, t):
+                continue
+            distance = distances[next_pos.y][next_pos.x]
+            if distance is None:
+                continue
+            key = (next_pos.x, next_pos.y, t + 1)
+            next_cost = cost + edge_cost
+            if key in best_cost and best_cost[key] <= next_cost:
+                continue
+            best_cost[key] = next_cost
+            parents[key] = (x, y, t)
+            sort_order_number += 1
+            heapq.heappush(open_heap, (next_cost + distance, -next_cost, sort_order_number, next_pos.x, next_pos.y,
+                                       t + 1, next_cost))
+
+    return None, expansions
+
+
+def is_reachable(maze: Maze, table: ReservationTable, start: int2, goal: int2) -> bool:
+    """
+    Flood fills from the start around the parked agents, returns true if the goal is reached
+    """
+    seen = {start}
+    stack = [start]
+    while len(stack) > 0:
+        pos = stack.pop()
+        if pos == goal:
+            return True
+        for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+            if neighbour_pos not in seen and (neighbour_pos.x, neighbour_pos.y) not in table.parked:
+                seen.add(neighbour_pos)
+                stack.append(neighbour_pos)
+    return False
+
+
+def reconstruct(parents: dict[tuple[int, int, int], tuple[int, int, int]], key: tuple[int, int, int]) -> list[int2]:
+    """
+    Follows the parents back from the space-time node, returning the positions in time order
+    """
+    path = []
+    while key is not None:
+        path.append(int2(key[0], key[1]))
+        key = parents[key]
+    path.reverse()
+    return path
+
+
+def find_conflicts(paths: list[list[int2]]) -> list[tuple[int, int, int]]:
+    """
+    Returns every (time step, agent, agent) where two agents stand on the same position or swap places, agents stay at
+    the end of their path once it runs out. Agents with an empty path never enter the maze and aren't checked
+    """
+    conflicts = []
+    end_time = max((len(path) for path in paths), default=0)
+    for t in range(end_time):
+        occupied = {}
+        for agent, path in enumerate(paths):
+            if len(path) == 0:
+                continue
+            pos = path[min(t, len(path) - 1)]
+            other = occupied.get((pos.x, pos.y))
+            if other is not None:
+                conflicts.append((t, other, agent))
+            occupied[(pos.x, pos.y)] = agent
+
+        if t == 0:
+            continue
+        moved_from = {}
+        for agent, path in enumerate(paths):
+            if t < len(path) and path[t] != path[t - 1]:
+                moved_from[(path[t - 1].x, path[t - 1].y, path[t].x, path[t].y)] = agent
+        for (from_x, from_y, to_x, to_y), agent in moved_from.items():
+            other = moved_from.get((to_x, to_y, from_x, from_y))
+            if other is not None and agent < other:
+                conflicts.append((t, agent, other))
+    return conflicts
+
+
+def random_agents(maze: Maze, count: int, seed: int = 0) -> tuple[list[int2], list[int2]]:
+    """
+    Picks distinct start and distinct goal positions for the agents, from the floor reachable from the maze's start so
+    every agent can reach its goal. Returns fewer agents if there isn't enough floor
+    """
+    # Flood fill from the start to find the reachable floor
+    reachable = [maze.start]
+    seen = {maze.start}
+    i = 0
+    while i < len(reachable):
+        for neighbour_pos, edge_cost in maze.get_neighbours(reachable[i]):
+            if neighbour_pos not in seen:
+                seen.add(neighbour_pos)
+                reachable.append(neighbour_pos)
+        i += 1
+
+    rng = random.Random(seed)
+    count = min(count, len(reachable))
+    return rng.sample(reachable, count), rng.sample(reachable, count)
@@ -0,0 +1,187 @@
+import time
+
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher
+
+# scipy is optional, it's only needed to use this backend
+try:
+    import numpy
+    from scipy.sparse import csr_matrix
+    from scipy.sparse import csgraph as scipy_csgraph
+except ImportError:
+    numpy = None
+    csr_matrix = None
+    scipy_csgraph = None
+
+
+def is_available() -> bool:
+    """
+    Returns true if scipy is installed so this backend can be used
+    """
+    return scipy_csgraph is not None
+
+
+class MazeGraph:
+    """
+    A maze exported as a sparse weighted adjacency matrix for scipy.sparse.csgraph. Every tile is a node, numbered row
+    by row, and each edge costs the same as get_edge_cost_to the tile it leads to. Walls have no edges
+    """
+    # Maze the graph was built from
+    maze: Maze
+
+    # Sparse matrix where entry [i, j] is the cost of the edge from node i to node j
+    matrix: object
+
+    def __init__(self, maze: Maze):
+        if not is_available():
+            raise Exception("scipy is not installed. Please install it using the following command:\npip install scipy")
+
+        self.maze = maze
+
+        # Collect the edges from every tile to its neighbours
+        rows = []
+        columns = []
+        costs = []
+        for y in range(maze.dimensions.y):
+            for x in range(maze.dimensions.x):
+                pos = int2(x, y)
+                if maze.is_wall(pos):
+                    continue
+                index = self.index_of(pos)
+                for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+                    rows.append(index)
+                    columns.append(self.index_of(neighbour_pos))
+                    costs.append(edge_cost)
+
+        node_count = maze.dimensions.x * maze.dimensions.y
+        self.matrix = csr_matrix((costs, (rows, columns)), shape=(node_count, node_count))
+
+    def index_of(self, pos: int2) -> int:
+        """
+        Returns the node number of the position
+        """
+        return pos.y * self.maze.dimensions.x + pos.x
+
+    def pos_of(self, index: int) -> int2:
+        """
+        Returns the position of the node number
+        """
+        return int2(index % self.maze.dimensions.x, index // self.maze.dimensions.x)
+
+    def shortest_paths(self, sources: list[int2]) -> tuple[object, object]:
+        """
+        Runs scipy's compiled Dijkstra's from every source at once, returning (costs, predecessors) arrays with a row
+        per source and a column per node. Unreachable nodes cost infinity and have a predecessor of -9999
+        """
+        return scipy_csgraph.dijkstra(self.matrix, directed=True, indices=[self.index_of(pos) for pos in sources],
+                                      return_predecessors=True)
+
+    def path_to(self, predecessors, goal: int2) -> list[int2]:
+        """
+        Follows a row of predecessors back from the goal, returning the path in order from the source, or an empty list
+        if the goal can't be reached
+        """
+        index = self.index_of(goal)
+        if predecessors[index] < 0:
+            return []
+        path = []
+        while index >= 0:
+            path.append(self.pos_of(index))
+            index = predecessors[index]
+        path.reverse()
+        return path
+
+
+def run(searcher: Searcher):
+    """
+    Finds the cheapest path to the nearest goal with scipy.sparse.csgraph's Dijkstra's in a single step, then copies
+    the costs and predecessors into the node data so the searcher reconstructs the path as it would for dijkstra.run.
+    As the whole search happens in compiled code there is no progress to show, it yields once when done
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    maze = searcher.maze
+    graph = MazeGraph(maze)
+    costs, predecessors = graph.shortest_paths([maze.start])
+    costs = costs[0]
+    predecessors = predecessors[0]
+
+    # Copy every reached node into the node data, so the search shows how much of the maze it covered
+    for index in numpy.flatnonzero(numpy.isfinite(costs)):
+        node_data = searcher.get_node_data(graph.pos_of(index))
+        node_data.visited = True
+        node_data.path_cost = int(costs[index])
+        if predecessors[index] >= 0:
+            node_data.parent = graph.pos_of(predecessors[index])
+        searcher.nodes_explored += 1
+
+    # scipy's Dijkstra's decreases the key of a node already in its heap rather than adding it again, so every reached
+    # node was pushed and popped exactly once and none were stale or reopened. How big the heap got isn't exposed
+    searcher.stats.pushes = searcher.nodes_explored
+    searcher.stats.pops = searcher.nodes_explored
+    searcher.stats.peak_frontier = None
+
+    # Pick the cheapest goal to reach
+    reachable_goals = [goal for goal in maze.goals if numpy.isfinite(costs[graph.index_of(goal)])]
+    if len(reachable_goals) == 0:
+        yield True, "Path not found."
+        return
+
+    searcher.reached_goal = min(reachable_goals, key=lambda goal: costs[graph.index_of(goal)])
+    searcher.current_pos = searcher.reached_goal
+
+    # Depths are only needed along the path, for display purposes
+    for depth, pos in enumerate(graph.path_to(predecessors, searcher.reached_goal)):
+        searcher.get_node_data(pos).depth = depth
+
+    yield True, f"  Found goal node {searcher.reached_goal}."
+
+
+def cross_check(mazes: dict[str, Maze]) -> bool:
+    """
+    Compares the paths found by this backend with those found by dijkstra.run on every maze, and checks the costs from
+    every tile found by one many-source query against a separate query per tile. Prints the results and timings,
+    returns true if everything matched
+    """
+    from src.search import dijkstra
+
+    print("\n==== SCIPY CSGRAPH BACKEND CROSS-CHECK ====")
+    print(f"{'Maze':<26}{'Dijkstra Cost':>14}{'csgraph Cost':>14}{'Dijkstra (ms)':>15}{'csgraph (ms)':>14}"
+          f"{'All Sources (ms)':>18}{'Result':>8}")
+
+    all_match = True
+    for name, maze in sorted(mazes.items()):
+        searcher = Searcher(maze)
+        dijkstra_stats = searcher.run_search(dijkstra.run)
+        dijkstra_cost = searcher.path_cost if len(searcher.path) != 0 else None
+        dijkstra_goal = searcher.reached_goal
+
+        csgraph_stats = searcher.run_search(run)
+        csgraph_cost = searcher.path_cost if len(searcher.path) != 0 else None
+        match = dijkstra_cost == csgraph_cost and (dijkstra_cost is None or
+                                                   maze.is_goal(searcher.path[-1]) and searcher.path[0] == maze.start)
+
+        # The goals might tie on cost, otherwise both should reach the same one
+        if match and dijkstra_cost is not None and dijkstra_goal != searcher.reached_goal:
+            match = searcher.get_node_data(dijkstra_goal).path_cost == csgraph_cost
+
+        # Many-source query from every floor tile, spot checking rows against single-source queries
+        graph = MazeGraph(maze)
+        sources = [int2(x, y) for y in range(maze.dimensions.y) for x in range(maze.dimensions.x)
+                   if not maze.is_wall(int2(x, y))]
+        timer = time.perf_counter()
+        all_costs, all_predecessors = graph.shortest_paths(sources)
+        all_sources_time = time.perf_counter() - timer
+        for row in range(0, len(sources), max(len(sources) // 10, 1)):
+            single_costs, single_predecessors = graph.shortest_paths([sources[row]])
+            match = match and numpy.array_equal(single_costs[0], all_costs[row])
+
+        all_match = all_match and match
+        print(f"{name:<26}{str(dijkstra_cost):>14}{str(csgraph_cost):>14}{dijkstra_stats.wall_time * 1000:>15.3F}"
+              f"{csgraph_stats.wall_time * 1000:>14.3F}{all_sources_time * 1000:>18.3F}"
+              f"{'OK' if match else 'FAILED':>8}")
+
+    return all_match
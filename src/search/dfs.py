@@ -2,27 +2,36 @@ from src.int2 import int2
 from src.searcher import Searcher
 
 
-def run(searcher: Searcher):
+def run(searcher: Searcher, resume: bool = False):
     """
     Performs DFS search. Yields after each Pop and after processing all directions to allow for GUI updates.
     Returns a str containing information about the step that is currently in process
+    With resume the search carries on from the state a checkpoint restored to the searcher instead of starting over
     """
 
-    # Initialises the searcher, clearing the queues and resetting the Nodes to default
-    searcher.initialise()
+    if not resume:
+        # Initialises the searcher, clearing the queues and resetting the Nodes to default
+        searcher.initialise()
 
-    # Add the starting position to the queue
-    searcher.deque.append(searcher.maze.start)
-    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+        # Add the starting position to the queue
+        searcher.deque.append(searcher.maze.start)
+        searcher.stats.record_push(len(searcher.deque))
+        searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
 
     # Loop until the queue is empty
     while len(searcher.deque) > 0:
+        # Between expansions the node data, queue and counters are the whole state, so a checkpoint can be saved
+        searcher.checkpoint_if_due()
+
         # As this is DFS search get the most recently added node off the queue, LIFO, using pop()
         pos = searcher.deque.pop()
         searcher.current_pos = pos
         curr_node_data = searcher.get_node_data(pos)
         curr_node_data.decrement_queue_count()
 
+        # Nodes can be in the queue multiple times, any copy popped after the node is visited is a stale duplicate
+        searcher.stats.record_pop(curr_node_data.visited)
+
         # Yield execution to allow graphical update of progress
         yield False, f"Popped {pos} off the top of the queue."
 
@@ -39,6 +48,7 @@ def run(searcher: Searcher):
 
         # Check if this node is the goal node and break
         if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
             yield True, f"  Found goal node {pos}."
 
         # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
@@ -68,6 +78,7 @@ def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, de
 
     # Add this node to the queue
     searcher.deque.append(pos)
+    searcher.stats.record_push(len(searcher.deque))
 
     # Update the node data with parent, cost to reach node, and current depth. Do not overwrite parent if it exists
     curr_node_data.update_node_data(parent, cost, depth, False)
@@ -1,24 +1,34 @@
 from src.int2 import int2
 from src.maze import Maze
-from src.searcher import Searcher, QueueNode
+from src.searcher import Searcher, QueueNode, TIE_BREAK_LIFO
 
 
-def run(searcher: Searcher):
+def run(searcher: Searcher, resume: bool = False, tie_break: str = TIE_BREAK_LIFO):
     """
     Performs Dijkstra search. Finds the smallest distance between two nodes, recording cost
     Yields after each Pop and after processing all directions to allow for GUI updates.
     Returns a str containing information about the step that is currently in process
+    With resume the search carries on from the state a checkpoint restored to the searcher instead of starting over
+    tie_break is how nodes of equal cost are ordered in the queue, one of searcher.TIE_BREAKS
     """
 
-    # Initialises the searcher, clearing the queue and resetting the Nodes to default
-    searcher.initialise()
+    if not resume:
+        # Initialises the searcher, clearing the queue and resetting the Nodes to default
+        searcher.initialise()
 
-    # Add the starting position to the priority queue
-    searcher.priority_queue.push(QueueNode(searcher.maze.start, 0))
-    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+        # Add the starting position to the priority queue
+        searcher.priority_queue.push(QueueNode(searcher.maze.start, 0))
+        searcher.stats.record_push(searcher.priority_queue.size())
+        searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+
+    # Set after initialising, which goes back to breaking ties LIFO
+    searcher.set_tie_break(tie_break)
 
     # Loop until the queue is empty
     while not searcher.priority_queue.empty():
+        # Between expansions the node data, queue and counters are the whole state, so a checkpoint can be saved
+        searcher.checkpoint_if_due()
+
         # Dijkstra search get the QueueNode off the queue with the lowest cost from the starting node
         curr_queue_node = searcher.priority_queue.pop()
         pos = curr_queue_node.pos
@@ -26,6 +36,10 @@ def run(searcher: Searcher):
         curr_node_data = searcher.get_node_data(pos)
         curr_node_data.decrement_queue_count()
 
+        # The node is stale if it has been added to the queue again since with a lower cost
+        searcher.stats.record_pop(curr_queue_node.cost > curr_node_data.path_cost)
+        searcher.stats.record_expansion(curr_node_data.visited)
+
         # Set current node as visited, and increment node explored
         curr_node_data.visited = True
         searcher.nodes_explored += 1
@@ -35,6 +49,7 @@ def run(searcher: Searcher):
 
         # Check if this node is the goal node and break
         if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
             yield True, f"  Found goal node {pos}."
 
         # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
@@ -66,7 +81,8 @@ def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, de
         return False, "    Already found shorter path, skipping..."
 
     # Add it to the priority queue with consideration of cost to this node
-    searcher.priority_queue.push(QueueNode(pos, cost))
+    searcher.priority_queue.push(QueueNode(pos, cost), searcher.get_tie_value(pos, cost))
+    searcher.stats.record_push(searcher.priority_queue.size())
 
     # Update the node data with parent, cost to reach node, and current depth
     curr_node_data.update_node_data(parent, cost, depth)
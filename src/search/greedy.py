@@ -0,0 +1,87 @@
+from src.int2 import int2
+from src.search.astar import calculate_goals_heuristic
+from src.searcher import Searcher, QueueNode
+
+
+def run(searcher: Searcher):
+    """
+    Performs Greedy Best-First search. Always expands the node that looks closest to a goal by the heuristic alone,
+    ignoring the cost to reach it, so it usually explores far fewer nodes than A* but the path found isn't always the
+    cheapest. Yields after each Pop and after processing all directions to allow for GUI updates.
+    Returns a str containing information about the step that is currently in process
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    # Add the starting position to the queue
+    searcher.priority_queue.push(QueueNode(searcher.maze.start, calculate_goals_heuristic(searcher.maze.start,
+                                                                                          searcher.maze.goals)))
+    searcher.stats.record_push(searcher.priority_queue.size())
+    searcher.get_node_data(searcher.maze.start).update_node_data(None, 0, 0)
+
+    # Loop until the queue is empty
+    while not searcher.priority_queue.empty():
+        # As this is greedy search get the QueueNode off the queue that is estimated to be closest to a goal
+        curr_queue_node = searcher.priority_queue.pop()
+        pos = curr_queue_node.pos
+        searcher.current_pos = pos
+        curr_node_data = searcher.get_node_data(pos)
+        curr_node_data.decrement_queue_count()
+
+        # Each node is only added to the queue once, so no pops are stale
+        searcher.stats.record_pop()
+
+        # Set current node as visited, and increment node explored
+        curr_node_data.visited = True
+        searcher.nodes_explored += 1
+
+        # Yield execution to allow graphical update of progress
+        yield False, f"Retrieved node {pos} with estimated distance {curr_queue_node.cost} to a goal from the queue."
+
+        # Check if this node is the goal node and break
+        if searcher.maze.is_goal(pos):
+            searcher.reached_goal = pos
+            yield True, f"  Found goal node {pos}."
+
+        # Process all the valid neighbours of this node, is a list of (pos, edge_cost) tuples
+        for neighbour in searcher.maze.get_neighbours(pos):
+            searcher.current_neighbour_pos = neighbour[0]
+            yield False, f"  Processing neighbour {neighbour[0]}."
+            # Processes the neighbour, yields a string explaining the current processing step
+            yield process_neighbour(searcher, pos, neighbour[0], curr_node_data.path_cost + neighbour[1],
+                                    curr_node_data.depth + 1)
+
+        # Clear that any neighbour is being processed
+        searcher.current_neighbour_pos = None
+
+        # Clear that any node is being added to the queue
+        searcher.adding_to_queue_pos = None
+
+    yield True, "Path not found."
+
+
+def process_neighbour(searcher: Searcher, parent: int2, pos: int2, cost: int, depth: int) -> tuple[bool, str]:
+    """
+    Tests if a neighbour node is suitable for adding to queue, if so it's added
+    """
+
+    # Get the node data of this neighbour
+    curr_node_data = searcher.get_node_data(pos)
+
+    # Verify we haven't visited this node yet, and it hasn't already been added to queue
+    if curr_node_data.visited:
+        return False, "    Already visited, skipping..."
+    if curr_node_data.in_queue():
+        return False, "    Already in queue, skipping..."
+
+    # Add this node to the priority queue, ordered only by the estimated distance to the nearest goal
+    searcher.priority_queue.push(QueueNode(pos, calculate_goals_heuristic(pos, searcher.maze.goals)))
+    searcher.stats.record_push(searcher.priority_queue.size())
+
+    # Update the node data with parent, cost to reach node, and current depth
+    curr_node_data.update_node_data(parent, cost, depth)
+    # Store that this node is currently being added to the queue for display purposes
+    searcher.adding_to_queue_pos = pos
+
+    return False, "    Added to the queue."
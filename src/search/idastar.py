@@ -0,0 +1,136 @@
+from src.int2 import int2
+from src.search.astar import calculate_goals_heuristic
+from src.searcher import Searcher
+
+# Most nodes IDA* expands before giving up when no budget is given. It only remembers the current path, so it expands
+# the same nodes again in every iteration and again for every path to them, which grows exponentially on open mazes
+# or when the goal can't be reached. This is around two seconds of searching
+DEFAULT_EXPANSION_BUDGET = 100000
+
+
+def run(searcher: Searcher, expansion_budget: int = DEFAULT_EXPANSION_BUDGET):
+    """
+    Performs Iterative Deepening A* search. Repeats a depth-first search that never goes past a node whose estimated
+    cost is above a threshold, raising the threshold to the lowest estimate that went past it after each iteration.
+    Only the current path is stored, so memory use grows with the length of the path rather than the size of the maze.
+    Yields after each expansion and after processing each neighbour to allow for GUI updates.
+    Gives up without a path once expansion_budget nodes have been expanded, None to never give up
+    """
+
+    # Initialises the searcher, clearing the queues and resetting the Nodes to default
+    searcher.initialise()
+
+    maze = searcher.maze
+
+    # Start with a threshold of the best-case estimate from the start
+    threshold = calculate_goals_heuristic(maze.start, maze.goals)
+
+    # Loop until there are no nodes past the threshold, then every reachable node has been tried
+    while threshold is not None:
+        searcher.current_pos = maze.start
+        yield False, f"Starting iteration with cost threshold {threshold}."
+
+        # The lowest estimated cost of the nodes that went past the threshold this iteration
+        next_threshold = None
+
+        # The current path from the start, each entry is [pos, cost to reach, neighbours left to try or None if the
+        # node hasn't been expanded yet]
+        path = [[maze.start, 0, None]]
+        on_path = {(maze.start.x, maze.start.y)}
+        searcher.stats.record_push(len(path))
+        update_node_data(searcher, maze.start, 0, 0)
+
+        while len(path) > 0:
+            entry = path[-1]
+            pos = entry[0]
+            searcher.current_pos = pos
+
+            # Expand the node the first time we reach it
+            if entry[2] is None:
+                if expansion_budget is not None and searcher.nodes_explored >= expansion_budget:
+                    yield True, f"Path not found, ran out of the budget of {expansion_budget} expansions."
+                    return
+
+                curr_node_data = searcher.get_node_data(pos)
+
+                # Set current node as visited, and increment node explored
+                searcher.stats.record_expansion(curr_node_data.visited)
+                curr_node_data.visited = True
+                searcher.nodes_explored += 1
+
+                # Yield execution to allow graphical update of progress
+                yield False, f"Expanding node {pos} with cost {entry[1]}."
+
+                # Check if this node is the goal node, if so store the path in the node data and break
+                if maze.is_goal(pos):
+                    searcher.reached_goal = pos
+                    store_path(searcher, path)
+                    yield True, f"  Found goal node {pos}."
+
+                # Try the neighbours with the lowest estimated cost first, skipping any already on the path
+                neighbours = [neighbour for neighbour in maze.get_neighbours(pos)
+                              if (neighbour[0].x, neighbour[0].y) not in on_path]
+                neighbours.sort(reverse=True,
+                                key=lambda neighbour: neighbour[1] + calculate_goals_heuristic(neighbour[0], maze.goals))
+                entry[2] = neighbours
+
+            # Once all neighbours have been tried, backtrack
+            if len(entry[2]) == 0:
+                path.pop()
+                on_path.remove((pos.x, pos.y))
+                searcher.stats.record_pop()
+                searcher.get_node_data(pos).decrement_queue_count()
+                searcher.current_neighbour_pos = None
+                searcher.adding_to_queue_pos = None
+                continue
+
+            # Try the next neighbour
+            neighbour_pos, edge_cost = entry[2].pop()
+            searcher.current_neighbour_pos = neighbour_pos
+            yield False, f"  Processing neighbour {neighbour_pos}."
+
+            cost = entry[1] + edge_cost
+            dist_estimate = cost + calculate_goals_heuristic(neighbour_pos, maze.goals)
+
+            # Don't go past the threshold, but remember the lowest estimate that did for the next iteration
+            if dist_estimate > threshold:
+                if next_threshold is None or dist_estimate < next_threshold:
+                    next_threshold = dist_estimate
+                yield False, f"    Estimated cost {dist_estimate} is over the threshold, skipping..."
+                continue
+
+            # Add the neighbour to the path
+            path.append([neighbour_pos, cost, None])
+            on_path.add((neighbour_pos.x, neighbour_pos.y))
+            searcher.stats.record_push(len(path))
+            update_node_data(searcher, neighbour_pos, cost, len(path) - 1)
+            searcher.adding_to_queue_pos = neighbour_pos
+            yield False, "    Added to the path."
+
+        threshold = next_threshold
+
+    yield True, "Path not found."
+
+
+def update_node_data(searcher: Searcher, pos: int2, cost: int, depth: int):
+    """
+    Updates the node data of a node added to the path for display purposes. The parent is only stored once the goal is
+    found, as the node data of nodes that leave the path is never cleared
+    """
+    node_data = searcher.get_node_data(pos)
+    node_data.in_queue_count += 1
+    node_data.path_cost = cost
+    node_data.depth = depth
+
+
+def store_path(searcher: Searcher, path: list[list]):
+    """
+    Stores the parent, cost and depth of each node on the path, so the searcher can reconstruct it
+    """
+    parent: int2 = None
+    for depth, entry in enumerate(path):
+        node_data = searcher.get_node_data(entry[0])
+        node_data.parent = parent
+        node_data.path_cost = entry[1]
+        node_data.depth = depth
+        parent = entry[0]
@@ -0,0 +1,123 @@
+import heapq
+import time
+from array import array
+
+from src.int2 import int2
+from src.maze import Maze
+
+# Number of landmarks picked when none is given
+DEFAULT_LANDMARK_COUNT = 4
+
+# Stored in the distance tables for tiles that can't reach or be reached from a landmark
+UNREACHABLE = -1
+
+
+class Landmarks:
+    """
+    ALT (A*, Landmarks and Triangle inequality) preprocessing for a maze. Exact costs to and from a few landmark tiles
+    are stored for every tile, and by the triangle inequality the difference between two tiles' costs to a landmark
+    is never more than the cost between the tiles. Unlike the manhattan distance this accounts for walls and rough
+    terrain, so A* expands far fewer nodes on winding mazes. Costs depend on direction as an edge costs whatever
+    the tile it leads to costs, so costs both from and to each landmark are stored
+    """
+    # Maze the landmarks were picked on
+    maze: Maze
+
+    # Landmark positions
+    positions: list[int2]
+
+    # For each landmark, the cost from the landmark to every tile, indexed by y * width + x, as 32 bit ints
+    costs_from: list[array]
+
+    # For each landmark, the cost from every tile to the landmark, indexed by y * width + x, as 32 bit ints
+    costs_to: list[array]
+
+    # Time in seconds spent picking the landmarks and calculating the tables
+    build_time: float
+
+    def __init__(self, maze: Maze, count: int = DEFAULT_LANDMARK_COUNT):
+        """
+        Picks count landmarks spread out over the maze, each as far as possible from those already picked, starting
+        from the tile furthest from the start. Tiles far from everything make the best landmarks as the paths to
+        them pass through most of the maze
+        """
+        timer = time.perf_counter()
+        self.maze = maze
+        self.positions = []
+        self.costs_from = []
+        self.costs_to = []
+
+        # Cost from the nearest picked landmark to every tile, the next landmark is the tile where this is largest
+        nearest = self.calculate_costs(maze.start, False)
+        for i in range(count):
+            best_index = max(range(len(nearest)), key=lambda index: nearest[index])
+            if nearest[best_index] <= 0:
+                break
+            landmark = int2(best_index % maze.dimensions.x, best_index // maze.dimensions.x)
+            self.positions.append(landmark)
+            self.costs_from.append(self.calculate_costs(landmark, False))
+            self.costs_to.append(self.calculate_costs(landmark, True))
+
+            # The first landmark replaces the start as what the others are spread out from
+            if i == 0:
+                nearest = array("i", self.costs_from[0])
+            else:
+                for index, cost in enumerate(self.costs_from[-1]):
+                    if cost != UNREACHABLE and cost < nearest[index]:
+                        nearest[index] = cost
+        self.build_time = time.perf_counter() - timer
+
+    def calculate_costs(self, landmark: int2, to_landmark: bool) -> array:
+        """
+        Dijkstra's search over the whole maze from the landmark, returning the cost from the landmark to every tile, or
+        from every tile to the landmark if to_landmark is true
+        """
+        maze = self.maze
+        width = maze.dimensions.x
+        costs = array("i", [UNREACHABLE]) * (width * maze.dimensions.y)
+        costs[landmark.y * width + landmark.x] = 0
+        queue = [(0, landmark.x, landmark.y)]
+        while len(queue) > 0:
+            cost, x, y = heapq.heappop(queue)
+            if cost > costs[y * width + x]:
+                continue
+            pos = int2(x, y)
+            # Searching backwards, stepping from a neighbour onto this tile costs what this tile costs
+            step_cost = maze.get_edge_cost_to(pos)
+            for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+                neighbour_cost = cost + (step_cost if to_landmark else edge_cost)
+                index = neighbour_pos.y * width + neighbour_pos.x
+                if costs[index] == UNREACHABLE or neighbour_cost < costs[index]:
+                    costs[index] = neighbour_cost
+                    heapq.heappush(queue, (neighbour_cost, neighbour_pos.x, neighbour_pos.y))
+        return costs
+
+    def memory_bytes(self) -> int:
+        """
+        Returns the number of bytes used by the distance tables
+        """
+        return sum(len(table) * table.itemsize for table in self.costs_from + self.costs_to)
+
+    def calculate_heuristic(self, pos: int2, goal: int2) -> int:
+        """
+        Returns the best lower bound on the cost from pos to goal given by any landmark, or the manhattan distance if
+        that is better. For a landmark L, cost(pos, goal) >= cost(L, goal) - cost(L, pos) and
+        cost(pos, goal) >= cost(pos, L) - cost(goal, L)
+        """
+        width = self.maze.dimensions.x
+        pos_index = pos.y * width + pos.x
+        goal_index = goal.y * width + goal.x
+        best = abs(goal.x - pos.x) + abs(goal.y - pos.y)
+        for costs_from, costs_to in zip(self.costs_from, self.costs_to):
+            landmark_to_pos = costs_from[pos_index]
+            landmark_to_goal = costs_from[goal_index]
+            if landmark_to_pos != UNREACHABLE and landmark_to_goal != UNREACHABLE:
+                best = max(best, landmark_to_goal - landmark_to_pos, costs_to[pos_index] - costs_to[goal_index])
+        return best
+
+    def calculate_goals_heuristic(self, pos: int2, goals: list[int2]) -> int:
+        """
+        Returns the lower bound on the cost to the nearest of the goals, can be passed to astar.run as its heuristic
+        """
+        return min(self.calculate_heuristic(pos, goal) for goal in goals)
+
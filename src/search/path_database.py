@@ -0,0 +1,289 @@
+import bisect
+import heapq
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from src import maze_loader
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher
+
+# Databases are stored next to the mazes they were built for in maze_loader.MAZE_DIRECTORY, as <maze name>.cpd
+DATABASE_EXTENSION = ".cpd"
+
+# Identifies a path database file and the version of its format
+DATABASE_MAGIC = b"CPD1"
+
+# Header of a database file, the magic, the maze dimensions, and a checksum of the maze's tiles
+DATABASE_HEADER = struct.Struct("<4sIII")
+
+# First move stored for a target that is the source itself or can't be reached from it
+MOVE_NONE = 4
+
+# Number of bits a move takes in a packed run, the target index of the run takes the rest
+MOVE_BITS = 3
+
+
+def calculate_checksum(maze: Maze) -> int:
+    """
+    Returns a checksum of the maze's dimensions and tiles, a database is only used for a maze with the same checksum
+    """
+    tiles = bytes((2 if wall else 0) + (1 if rough else 0) for row in maze.nodes for wall, rough in row)
+    return zlib.crc32(struct.pack("<II", maze.dimensions.x, maze.dimensions.y) + tiles)
+
+
+def get_database_path(maze: Maze) -> str:
+    """
+    Returns the path of the file the maze's database is stored in
+    """
+    return os.path.join(maze_loader.MAZE_DIRECTORY, maze.file_name + DATABASE_EXTENSION)
+
+
+class PathDatabase:
+    """
+    Compressed path database of a maze, storing for every floor tile the first move of a cheapest path to every other
+    floor tile. A path is found by looking up the first move from the start towards the goal, taking it, and looking up
+    the next move from there, with no searching. Targets are numbered row by row, and neighbouring targets are usually
+    reached by the same first move, so each source's moves are stored as runs of the same move. A run is packed into a
+    32 bit int as the number of the first target it covers followed by the move, and the run covering a target is found
+    by a binary search
+    """
+    # Maze the database was built for
+    maze: Maze
+
+    # Checksum of the maze when the database was built
+    checksum: int
+
+    # Floor tiles in row by row order, numbering the sources and targets
+    cells: list[int2]
+
+    # Number of each tile in cells, indexed by y * width + x, -1 for walls
+    cell_numbers: array
+
+    # For each source, its runs of first moves packed as target number << MOVE_BITS | move, in order of target number
+    runs: list[array]
+
+    # Time in seconds spent building the database, 0 if it was loaded from a file
+    build_time: float
+
+    def __init__(self, maze: Maze, runs: list[array] = None, checksum: int = None):
+        """
+        Numbers the floor tiles of the maze, then builds the runs of first moves unless they're given
+        """
+        timer = time.perf_counter()
+        self.maze = maze
+        self.checksum = checksum if checksum is not None else calculate_checksum(maze)
+        self.cells = [int2(x, y) for y in range(maze.dimensions.y) for x in range(maze.dimensions.x)
+                      if not maze.is_wall(int2(x, y))]
+        self.cell_numbers = array("i", [-1]) * (maze.dimensions.x * maze.dimensions.y)
+        for number, pos in enumerate(self.cells):
+            self.cell_numbers[pos.y * maze.dimensions.x + pos.x] = number
+
+        if runs is not None:
+            self.runs = runs
+            self.build_time = 0.0
+            return
+
+        # Neighbours of every tile as (number, edge cost, move), where the move is the index into neighbour_offsets
+        neighbours = []
+        for pos in self.cells:
+            tile_neighbours = []
+            for move, offset in enumerate(maze.neighbour_offsets):
+                edge_cost = maze.get_edge_cost_to(pos + offset)
+                if edge_cost is not None:
+                    tile_neighbours.append((self.get_cell_number(pos + offset), edge_cost, move))
+            neighbours.append(tile_neighbours)
+
+        self.runs = [self.build_runs(source, neighbours) for source in range(len(self.cells))]
+        self.build_time = time.perf_counter() - timer
+
+    def build_runs(self, source: int, neighbours: list[list[tuple[int, int, int]]]) -> array:
+        """
+        Dijkstra's search over the whole maze from the source, where every tile takes the first move of the tile it
+        was reached from, returning the runs of first moves. Following the first moves from any tile always gives a
+        cheapest path, as the tile one move along a cheapest path has a cheapest path of its own for the rest
+        """
+        costs = [None] * len(self.cells)
+        first_moves = bytearray([MOVE_NONE]) * len(self.cells)
+        costs[source] = 0
+        queue = [(0, source)]
+        while len(queue) > 0:
+            cost, number = heapq.heappop(queue)
+            if cost > costs[number]:
+                continue
+            for neighbour, edge_cost, move in neighbours[number]:
+                neighbour_cost = cost + edge_cost
+                if costs[neighbour] is None or neighbour_cost < costs[neighbour]:
+                    costs[neighbour] = neighbour_cost
+                    first_moves[neighbour] = move if number == source else first_moves[number]
+                    heapq.heappush(queue, (neighbour_cost, neighbour))
+
+        runs = array("I")
+        for target, move in enumerate(first_moves):
+            if target == 0 or move != first_moves[target - 1]:
+                runs.append(target << MOVE_BITS | move)
+        return runs
+
+    def get_cell_number(self, pos: int2) -> int:
+        """
+        Returns the number of the floor tile, or -1 for a wall
+        """
+        return self.cell_numbers[pos.y * self.maze.dimensions.x + pos.x]
+
+    def get_first_move(self, source: int2, target: int2) -> int:
+        """
+        Returns the first move of a cheapest path from source to target as an index into the maze's neighbour_offsets,
+        or MOVE_NONE if they're the same tile or there is no path
+        """
+        runs = self.runs[self.get_cell_number(source)]
+        target_number = self.get_cell_number(target)
+        run = runs[bisect.bisect_right(runs, target_number << MOVE_BITS | (1 << MOVE_BITS) - 1) - 1]
+        return run & (1 << MOVE_BITS) - 1
+
+    def find_path(self, start: int2, goal: int2) -> list[int2]:
+        """
+        Returns a cheapest path from start to goal by following the first moves, or an empty list if there is no path
+        """
+        return self.look_up_path(start, goal)[0]
+
+    def look_up_path(self, start: int2, goal: int2) -> tuple[list[int2], int]:
+        """
+        Returns a cheapest path from start to goal by following the first moves, or an empty list if there is no path,
+        and the number of first moves looked up to find it
+        """
+        if self.maze.is_wall(start) or self.maze.is_wall(goal):
+            return [], 0
+        path = [start]
+        lookups = 0
+        while path[-1] != goal:
+            move = self.get_first_move(path[-1], goal)
+            lookups += 1
+            if move == MOVE_NONE:
+                return [], lookups
+            path.append(path[-1] + self.maze.neighbour_offsets[move])
+        return path, lookups
+
+    def run_count(self) -> int:
+        """
+        Returns the total number of runs stored
+        """
+        return sum(len(runs) for runs in self.runs)
+
+    def save(self, file_path: str = None):
+        """
+        Writes the database to a file, by default next to the maze. After the header each source's runs are stored as
+        the number of runs followed by the runs, all as little endian 32 bit ints
+        """
+        if file_path is None:
+            file_path = get_database_path(self.maze)
+
+        # Written to a temporary file that then replaces the database, so nothing ever reads a half written file
+        temporary_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(DATABASE_HEADER.pack(DATABASE_MAGIC, self.maze.dimensions.x, self.maze.dimensions.y,
+                                            self.checksum))
+            for runs in self.runs:
+                file.write(struct.pack("<I", len(runs)))
+                if sys.byteorder == "big":
+                    runs = array("I", runs)
+                    runs.byteswap()
+                file.write(runs.tobytes())
+        os.replace(temporary_path, file_path)
+
+
+def load(maze: Maze, file_path: str = None) -> PathDatabase:
+    """
+    Reads the maze's database from a file, by default next to the maze. Returns None if there is no file or it was built
+    for a different version of the maze
+    """
+    if file_path is None:
+        file_path = get_database_path(maze)
+    if not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    magic, width, height, checksum = DATABASE_HEADER.unpack_from(data)
+    if magic != DATABASE_MAGIC:
+        raise Exception(f"File '{file_path}' is not a path database")
+    if int2(width, height) != maze.dimensions or checksum != calculate_checksum(maze):
+        return None
+
+    runs = []
+    offset = DATABASE_HEADER.size
+    while offset < len(data):
+        (count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        source_runs = array("I")
+        source_runs.frombytes(data[offset:offset + count * 4])
+        if sys.byteorder == "big":
+            source_runs.byteswap()
+        runs.append(source_runs)
+        offset += count * 4
+    return PathDatabase(maze, runs, checksum)
+
+
+def load_or_build(maze: Maze) -> PathDatabase:
+    """
+    Loads the maze's database from next to the maze, building and saving it first if it doesn't exist or is out of date.
+    Building it searches the whole maze from every floor tile, so this is a preprocessing step to run before searching,
+    the database's build_time is 0 if it was loaded
+    """
+    database = load(maze)
+    if database is None:
+        database = PathDatabase(maze)
+        database.save()
+    return database
+
+
+def run(searcher: Searcher, database: PathDatabase):
+    """
+    Finds the cheapest path to the nearest goal by looking up first moves in the maze's path database, which has to be
+    built beforehand, with load_or_build or MazePreprocessing.get_database. Each goal's path is looked up and the
+    cheapest kept. The nodes explored are the number of first moves looked up, as there's no search there is no
+    progress to show, it yields once when done
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    # The database only depends on the tiles, so it can be used for a maze with the same tiles and another start or goal
+    maze = searcher.maze
+    if database is None or database.maze.nodes is not maze.nodes:
+        raise Exception(f"No path database was built for maze '{maze.file_name}'")
+
+    best_path = []
+    best_cost = None
+    for goal in maze.goals:
+        path, lookups = database.look_up_path(maze.start, goal)
+        searcher.nodes_explored += lookups
+        if len(path) == 0:
+            continue
+        cost = sum(maze.get_edge_cost_to(pos) for pos in path[1:])
+        if best_cost is None or cost < best_cost:
+            best_path = path
+            best_cost = cost
+
+    if len(best_path) == 0:
+        yield True, "Path not found."
+        return
+
+    # Store the path in the node data so the searcher reconstructs it
+    path_cost = 0
+    for depth, pos in enumerate(best_path):
+        node_data = searcher.get_node_data(pos)
+        if depth > 0:
+            path_cost += maze.get_edge_cost_to(pos)
+            node_data.parent = best_path[depth - 1]
+        node_data.path_cost = path_cost
+        node_data.depth = depth
+        node_data.visited = True
+
+    searcher.reached_goal = best_path[-1]
+    searcher.current_pos = searcher.reached_goal
+    yield True, f"  Found goal node {searcher.reached_goal}."
@@ -0,0 +1,221 @@
+import time
+from collections import deque
+
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher
+
+
+class ReducedMaze(Maze):
+    """
+    A maze with everything that can't lie on a path from the start to a goal removed, and corridors collapsed into
+    single weighted edges. Dead ends are found by repeatedly filling in floor tiles with only one open neighbour, along
+    with any floor the start can't reach, and these become walls. The tiles left that aren't the start, a goal, or a
+    corridor tile with exactly two open neighbours are junctions, and get_neighbours goes straight from junction to
+    junction, costing the sum of the tiles along the corridor between them. Any search algorithm can be run on it
+    unchanged, as long as it only uses get_neighbours to move around, and expand_path turns the junctions it finds
+    back into the full path through the original maze
+    """
+    # Maze this was reduced from
+    original: Maze
+
+    # Floor tiles of the original maze that were filled in as dead ends or unreachable
+    dead_ends: set[int2]
+
+    # Tiles the reduced graph is made of
+    junctions: set[int2]
+
+    # For each junction, the junctions at the other end of its corridors and the cost to reach them, in the order W S E N
+    edges: dict[int2, list[tuple[int2, int]]]
+
+    # The tiles passed through going from one junction to another, not including the first but including the last
+    corridors: dict[tuple[int2, int2], list[int2]]
+
+    # Time in seconds spent reducing the maze
+    build_time: float
+
+    def __init__(self, maze: Maze):
+        timer = time.perf_counter()
+        self.original = maze
+        super().__init__(f"{maze.file_name} (pruned)", maze.dimensions, [list(row) for row in maze.nodes], maze.start,
+                         maze.goals)
+
+        self.dead_ends = self.fill_dead_ends()
+        for pos in self.dead_ends:
+            self.nodes[pos.y][pos.x] = (True, False)
+
+        # Junctions are kept as they are, only the tiles strictly inside corridors are collapsed
+        self.junctions = set()
+        for y in range(self.dimensions.y):
+            for x in range(self.dimensions.x):
+                pos = int2(x, y)
+                if not self.is_wall(pos) and (pos == self.start or self.is_goal(pos) or
+                                              len(Maze.get_neighbours(self, pos)) != 2):
+                    self.junctions.add(pos)
+
+        self.edges = {}
+        self.corridors = {}
+        for junction in self.junctions:
+            self.edges[junction] = []
+            for neighbour_pos, edge_cost in Maze.get_neighbours(self, junction):
+                self.follow_corridor(junction, neighbour_pos, edge_cost)
+
+        self.build_time = time.perf_counter() - timer
+
+    def fill_dead_ends(self) -> set[int2]:
+        """
+        Returns the floor tiles that can't be on a path from the start to a goal. These are the tiles the start can't
+        reach, and the tiles left with at most one open neighbour after filling in the others, which is every
+        cul-de-sac and every branch leading only to cul-de-sacs. The start and goals are never filled in
+        """
+        # Find everything reachable from the start
+        reachable = {self.start}
+        frontier = deque([self.start])
+        while len(frontier) > 0:
+            pos = frontier.popleft()
+            for neighbour_pos, edge_cost in Maze.get_neighbours(self, pos):
+                if neighbour_pos not in reachable:
+                    reachable.add(neighbour_pos)
+                    frontier.append(neighbour_pos)
+
+        dead_ends = set()
+        for y in range(self.dimensions.y):
+            for x in range(self.dimensions.x):
+                pos = int2(x, y)
+                if not self.is_wall(pos) and pos not in reachable:
+                    dead_ends.add(pos)
+
+        # Count the open neighbours of every reachable tile, then fill in tiles down to one open neighbour until none
+        # are left, filling in one tile can make a dead end of the tile next to it
+        open_neighbours = {pos: len(Maze.get_neighbours(self, pos)) for pos in reachable}
+        frontier = deque(pos for pos, count in open_neighbours.items() if count <= 1)
+        while len(frontier) > 0:
+            pos = frontier.popleft()
+            if pos in dead_ends or pos == self.start or self.is_goal(pos):
+                continue
+            dead_ends.add(pos)
+            for neighbour_pos, edge_cost in Maze.get_neighbours(self, pos):
+                if neighbour_pos in dead_ends:
+                    continue
+                open_neighbours[neighbour_pos] -= 1
+                if open_neighbours[neighbour_pos] <= 1:
+                    frontier.append(neighbour_pos)
+
+        return dead_ends
+
+    def follow_corridor(self, junction: int2, pos: int2, cost: int):
+        """
+        Walks along the corridor leaving the junction through pos until it reaches another junction, and adds an edge
+        to it. Corridors that lead back to the same junction are left out, and only the cheapest of several corridors
+        between the same junctions is kept
+        """
+        corridor = [pos]
+        previous = junction
+        while pos not in self.junctions:
+            # Corridor tiles have exactly two open neighbours, carry on through the one that isn't behind
+            for neighbour_pos, edge_cost in Maze.get_neighbours(self, pos):
+                if neighbour_pos != previous:
+                    previous = pos
+                    pos = neighbour_pos
+                    cost += edge_cost
+                    break
+            corridor.append(pos)
+
+        if pos == junction:
+            return
+
+        for i, (end, end_cost) in enumerate(self.edges[junction]):
+            if end == pos:
+                if cost < end_cost:
+                    self.edges[junction][i] = (pos, cost)
+                    self.corridors[(junction, pos)] = corridor
+                return
+        self.edges[junction].append((pos, cost))
+        self.corridors[(junction, pos)] = corridor
+
+    def get_neighbours(self, pos: int2) -> list[(int2, int)]:
+        """
+        Returns the junctions at the other ends of the corridors leaving a junction, with the cost of each corridor
+        """
+        return self.edges.get(pos, [])
+
+    def expand_path(self, junction_path: list[int2]) -> list[int2]:
+        """
+        Returns the full path through the original maze passing through the given junctions in order
+        """
+        if len(junction_path) == 0:
+            return []
+        path = [junction_path[0]]
+        for i in range(1, len(junction_path)):
+            path += self.corridors[(junction_path[i - 1], junction_path[i])]
+        return path
+
+    def reduction(self) -> str:
+        """
+        Returns a summary of how much smaller the reduced graph is than the original maze
+        """
+        floor = sum(1 for row in self.original.nodes for node in row if not node[0])
+        edge_count = sum(len(edges) for edges in self.edges.values())
+        return (f"{floor} floor tiles reduced to {len(self.junctions)} junctions and {edge_count} edges, "
+                f"{len(self.dead_ends)} dead end tiles filled in, in {self.build_time * 1000:0.3F} ms")
+
+
+def run(searcher: Searcher, algorithm, reduced: ReducedMaze = None):
+    """
+    Runs the algorithm on the reduced graph of the searcher's maze, then expands the junctions it found back into the
+    full path so the searcher reconstructs it as usual. The reduced maze is built first unless one is given. The inner
+    search keeps its own node grid, the searcher's grid only gets the junctions it expands marked as visited as it goes,
+    so the GUI shows them, and the tiles of the full path filled in at the end.
+    Yields whenever the algorithm does
+    """
+
+    # Initialises the searcher, clearing the queue and resetting the Nodes to default
+    searcher.initialise()
+
+    if reduced is None or reduced.original is not searcher.maze:
+        reduced = ReducedMaze(searcher.maze)
+    searcher.current_pos = searcher.maze.start
+    yield False, f"Reduced the maze: {reduced.reduction()}"
+
+    inner = Searcher(reduced)
+    for done, message in algorithm(inner):
+        # Share the inner search's state so it's drawn and counted as this search's
+        searcher.deque = inner.deque
+        searcher.priority_queue = inner.priority_queue
+        searcher.stats = inner.stats
+        searcher.current_pos = inner.current_pos
+        searcher.current_neighbour_pos = inner.current_neighbour_pos
+        searcher.adding_to_queue_pos = inner.adding_to_queue_pos
+        searcher.nodes_explored = inner.nodes_explored
+        if inner.current_pos is not None and inner.get_node_data(inner.current_pos).visited:
+            searcher.get_node_data(inner.current_pos).visited = True
+
+        if done:
+            break
+        yield done, message
+
+    if inner.reached_goal is None:
+        yield True, "Path not found."
+        return
+
+    # Walk the junctions back from the goal, then point each tile along the full path at the one before it in the
+    # searcher's own grid
+    junction_path = [inner.reached_goal]
+    while junction_path[-1] != reduced.start:
+        junction_path.append(inner.get_node_data(junction_path[-1]).parent)
+    junction_path.reverse()
+
+    path = reduced.expand_path(junction_path)
+    path_cost = 0
+    searcher.get_node_data(path[0]).visited = True
+    for depth in range(1, len(path)):
+        path_cost += searcher.maze.get_edge_cost_to(path[depth])
+        node_data = searcher.get_node_data(path[depth])
+        node_data.parent = path[depth - 1]
+        node_data.path_cost = path_cost
+        node_data.depth = depth
+        node_data.visited = True
+
+    searcher.reached_goal = inner.reached_goal
+    searcher.current_pos = inner.reached_goal
+    yield True, f"  Found goal node {inner.reached_goal} through {len(junction_path)} junctions."
@@ -0,0 +1,158 @@
+import functools
+import importlib.util
+
+from src.maze import Maze
+from src.searcher import TIE_BREAK_LIFO
+from src.search import dfs, bfs, dijkstra, astar, arastar, idastar, smastar, greedy, beam, landmarks, pruning, \
+    path_database, contraction
+
+# Names of the search algorithms that can be picked, in the order they're listed
+ALGORITHM_NAMES = ["Depth-First Search", "Breadth-First Search", "Dijkstra's", "A*", "A* (landmarks)",
+                   "A* (pruned maze)", "Weighted A*", "ARA*", "IDA*", "SMA*", "Greedy Best-First", "Beam Search",
+                   "Path Database", "Contraction Hierarchy"]
+
+# Names of the algorithms that can be given how ties between nodes of equal cost are broken
+TIE_BREAK_ALGORITHM_NAMES = ["Dijkstra's", "A*", "A* (landmarks)", "Weighted A*"]
+
+# Name of the scipy backend, only offered when scipy is installed
+SCIPY_ALGORITHM_NAME = "Dijkstra's (scipy)"
+
+
+def get_algorithm_names() -> list[str]:
+    """
+    Returns the names of the algorithms that can be run. Whether scipy is installed is checked without importing it, as
+    importing scipy takes longer than everything else put together
+    """
+    if importlib.util.find_spec("scipy") is not None:
+        return ALGORITHM_NAMES + [SCIPY_ALGORITHM_NAME]
+    return list(ALGORITHM_NAMES)
+
+
+class MazePreprocessing:
+    """
+    Data some algorithms build from a maze before searching it. It depends only on the maze, so it's built the first
+    time it's needed and kept for later searches of the same maze
+    """
+    # Maze the data is built from
+    maze: Maze
+
+    # Landmarks for A* with landmark heuristics
+    landmarks: landmarks.Landmarks
+
+    # The maze with dead ends filled in and corridors collapsed
+    reduced_maze: pruning.ReducedMaze
+
+    # Contraction hierarchy of the maze
+    hierarchy: contraction.ContractionHierarchy
+
+    # Compressed path database of the maze
+    database: path_database.PathDatabase
+
+    # What was built and how long it took, for the caller to show. Nothing is printed here, as the service builds the
+    # data inside its workers
+    build_messages: list[str]
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.landmarks = None
+        self.reduced_maze = None
+        self.hierarchy = None
+        self.database = None
+        self.build_messages = []
+
+    def pop_build_messages(self) -> list[str]:
+        """
+        Returns the messages about the data built since this was last called, and clears them
+        """
+        messages = self.build_messages
+        self.build_messages = []
+        return messages
+
+    def get_landmarks(self) -> landmarks.Landmarks:
+        """
+        Returns the landmarks, picking them the first time
+        """
+        if self.landmarks is None:
+            self.landmarks = landmarks.Landmarks(self.maze)
+            self.build_messages.append(f"Picked landmarks {self.landmarks.positions} in "
+                                       f"{self.landmarks.build_time * 1000:0.3F} ms, using "
+                                       f"{self.landmarks.memory_bytes()} bytes")
+        return self.landmarks
+
+    def get_reduced_maze(self) -> pruning.ReducedMaze:
+        """
+        Returns the reduced maze, building it the first time
+        """
+        if self.reduced_maze is None:
+            self.reduced_maze = pruning.ReducedMaze(self.maze)
+            self.build_messages.append(self.reduced_maze.reduction())
+        return self.reduced_maze
+
+    def get_hierarchy(self) -> contraction.ContractionHierarchy:
+        """
+        Returns the contraction hierarchy, building it the first time
+        """
+        if self.hierarchy is None:
+            self.hierarchy = contraction.ContractionHierarchy(self.maze)
+            self.build_messages.append(f"Built contraction hierarchy in {self.hierarchy.build_time * 1000:0.3F} ms, "
+                                       f"adding {self.hierarchy.shortcut_count()} shortcuts")
+        return self.hierarchy
+
+    def get_database(self) -> path_database.PathDatabase:
+        """
+        Returns the path database, loading it from next to the maze the first time, or building and saving it there if
+        it doesn't exist or is out of date
+        """
+        if self.database is None:
+            self.database = path_database.load_or_build(self.maze)
+            if self.database.build_time > 0:
+                self.build_messages.append(f"Built path database in {self.database.build_time * 1000:0.3F} ms, "
+                                           f"{self.database.run_count()} runs, saved to "
+                                           f"'{path_database.get_database_path(self.maze)}'")
+            else:
+                self.build_messages.append(f"Loaded path database from "
+                                           f"'{path_database.get_database_path(self.maze)}'")
+        return self.database
+
+
+def get_algorithm(name: str, preprocessing: MazePreprocessing, tie_break: str = TIE_BREAK_LIFO):
+    """
+    Returns the algorithm with the given name, ready to be passed to a searcher of the preprocessed maze, or None if
+    there is no algorithm with that name. The tie break is only used by the algorithms in TIE_BREAK_ALGORITHM_NAMES,
+    the others always break ties the way they were written to
+    """
+    if tie_break != TIE_BREAK_LIFO and name in TIE_BREAK_ALGORITHM_NAMES:
+        return functools.partial(get_algorithm(name, preprocessing), tie_break=tie_break)
+    if name == "Depth-First Search":
+        return dfs.run
+    elif name == "Breadth-First Search":
+        return bfs.run
+    elif name == "Dijkstra's":
+        return dijkstra.run
+    elif name == "A*":
+        return astar.run
+    elif name == "A* (landmarks)":
+        return functools.partial(astar.run, heuristic=preprocessing.get_landmarks().calculate_goals_heuristic)
+    elif name == "A* (pruned maze)":
+        return functools.partial(pruning.run, algorithm=astar.run, reduced=preprocessing.get_reduced_maze())
+    elif name == "Weighted A*":
+        return functools.partial(astar.run, epsilon=astar.DEFAULT_WEIGHTED_EPSILON)
+    elif name == "ARA*":
+        return arastar.run
+    elif name == "IDA*":
+        return idastar.run
+    elif name == "SMA*":
+        return smastar.run
+    elif name == "Greedy Best-First":
+        return greedy.run
+    elif name == "Beam Search":
+        return beam.run
+    elif name == "Path Database":
+        return functools.partial(path_database.run, database=preprocessing.get_database())
+    elif name == "Contraction Hierarchy":
+        return functools.partial(contraction.run, hierarchy=preprocessing.get_hierarchy())
+    elif name == SCIPY_ALGORITHM_NAME:
+        # Only imported when picked, so scipy isn't loaded unless it's used
+        from src.search import csgraph
+        return csgraph.run
+    return None
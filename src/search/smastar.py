@@ -0,0 +1,281 @@
+import heapq
+import math
+
+from src.int2 import int2
+from src.search.astar import calculate_goals_heuristic
+from src.searcher import Searcher
+
+# Default maximum number of nodes SMA* keeps in memory at once
+DEFAULT_NODE_BUDGET = 400
+
+
+class SMANode:
+    """
+    A node of the SMA* search tree that is currently held in memory
+    """
+    __slots__ = ("pos", "cost", "estimate", "depth", "parent", "children", "forgotten", "in_open", "open_estimate",
+                 "version")
+
+    # X,Y position of the node
+    pos: int2
+
+    # Cost to reach this node from the start
+    cost: int
+
+    # Estimated cost of the best path through this node. Once expanded it's backed up from the estimates of its
+    # children, so it rises as more of the maze beneath it is searched, and is infinite for dead ends
+    estimate: float
+
+    # Number of nodes on the path from the start
+    depth: int
+
+    # Node this node was reached from
+    parent: "SMANode"
+
+    # Children of this node that are held in memory, only nodes with none can be pruned
+    children: list["SMANode"]
+
+    # Estimates of children that were removed from memory by (x, y) position. Pruned children are regenerated with
+    # their remembered estimate when this node is expanded again, dead ends are remembered as infinite and never are
+    forgotten: dict[tuple[int, int], float]
+
+    # Whether this node is waiting in the open list to be expanded
+    in_open: bool
+
+    # Estimate the node was last added to the open list with
+    open_estimate: float
+
+    # Increased each time the node is added to the open list, so out of date heap entries can be ignored
+    version: int
+
+    def __init__(self, pos: int2, cost: int, estimate: float, depth: int, parent: "SMANode"):
+        self.pos = pos
+        self.cost = cost
+        self.estimate = estimate
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+        self.forgotten = {}
+        self.in_open = False
+        self.open_estimate = estimate
+        self.version = 0
+
+
+def run(searcher: Searcher, node_budget: int = DEFAULT_NODE_BUDGET):
+    """
+    Performs Simplified Memory-bounded A* search. Behaves like A* until node_budget nodes are held in memory, then
+    prunes the shallowest leaf with the highest estimated cost to make room, backing its estimate up to its parent so
+    the parent is expanded again if that part of the maze turns out to be needed. Finds the optimal path as long as
+    the budget can hold it. Yields after each expansion and after processing each neighbour to allow for GUI updates.
+    """
+
+    # Initialises the searcher, clearing the queues and resetting the Nodes to default
+    searcher.initialise()
+
+    maze = searcher.maze
+
+    # Nodes held in memory by (x, y) position
+    table: dict[tuple[int, int], SMANode] = {}
+
+    # Open list ordered by lowest estimate then deepest node, and prune list ordered by highest estimate then
+    # shallowest node. Entries are (key, key, sort order number, version, node), out of date entries are skipped
+    open_heap = []
+    prune_heap = []
+    open_count = 0
+    sort_order_number = 0
+
+    # Node currently being expanded, its estimate can't be backed up until all of its children have been generated
+    expanding: SMANode = None
+
+    def push_open(node: SMANode, estimate: float):
+        nonlocal open_count, sort_order_number
+        if not node.in_open:
+            node.in_open = True
+            open_count += 1
+            searcher.get_node_data(node.pos).in_queue_count += 1
+        node.open_estimate = estimate
+        node.version += 1
+        sort_order_number += 1
+        heapq.heappush(open_heap, (estimate, -node.depth, sort_order_number, node.version, node))
+        heapq.heappush(prune_heap, (-estimate, node.depth, sort_order_number, node.version, node))
+        searcher.stats.record_push(open_count)
+
+    def remove_open(node: SMANode):
+        nonlocal open_count
+        node.in_open = False
+        open_count -= 1
+        searcher.get_node_data(node.pos).decrement_queue_count()
+
+    def remove_child(parent: SMANode, child: SMANode):
+        parent.children.remove(child)
+        # An open node left without children becomes a leaf, so add it again to make sure it can be pruned
+        if parent.in_open and len(parent.children) == 0:
+            push_open(parent, parent.open_estimate)
+
+    def backup(node: SMANode):
+        # Update the estimates of an expanded node and its ancestors from their children and forgotten children. A node
+        # left with nothing beneath it is a dead end and removed from memory, which may in turn remove its parent
+        while node is not None and not node.in_open and node is not expanding:
+            estimate = best_estimate(node)
+            if math.isinf(estimate) and node.parent is not None:
+                del table[(node.pos.x, node.pos.y)]
+                remove_child(node.parent, node)
+                node.parent.forgotten[(node.pos.x, node.pos.y)] = math.inf
+            elif estimate == node.estimate:
+                return
+            node.estimate = estimate
+            node = node.parent
+
+    def prune() -> bool:
+        # Find the worst leaf in the open list, skipping entries that are out of date or are no longer leaves
+        while len(prune_heap) > 0:
+            entry = heapq.heappop(prune_heap)
+            node = entry[4]
+            if (not node.in_open or entry[3] != node.version or len(node.children) != 0 or node.parent is None or
+                    table.get((node.pos.x, node.pos.y)) is not node):
+                continue
+
+            # Forget the node, remembering its estimate in its parent and putting the parent back in the open list so
+            # it's expanded again once the lowest forgotten estimate is the best in the open list
+            del table[(node.pos.x, node.pos.y)]
+            remove_open(node)
+            parent = node.parent
+            parent.forgotten[(node.pos.x, node.pos.y)] = node.open_estimate
+            remove_child(parent, node)
+            if not math.isinf(node.open_estimate):
+                push_open(parent, min(parent.forgotten.values()))
+            else:
+                backup(parent)
+            return True
+        return False
+
+    # Add the starting position to the open list
+    root = SMANode(maze.start, 0, calculate_goals_heuristic(maze.start, maze.goals), 0, None)
+    table[(maze.start.x, maze.start.y)] = root
+    push_open(root, root.estimate)
+    searcher.get_node_data(maze.start).path_cost = 0
+    searcher.get_node_data(maze.start).depth = 0
+
+    # Loop until the open list is empty
+    while len(open_heap) > 0:
+        # Get the deepest node with the lowest estimate off the open list, skipping out of date entries
+        entry = heapq.heappop(open_heap)
+        node = entry[4]
+        stale = not node.in_open or entry[3] != node.version or table.get((node.pos.x, node.pos.y)) is not node
+        searcher.stats.record_pop(stale)
+        if stale:
+            continue
+        remove_open(node)
+        expanding = node
+
+        pos = node.pos
+        searcher.current_pos = pos
+        curr_node_data = searcher.get_node_data(pos)
+
+        # Set current node as visited, and increment node explored
+        searcher.stats.record_expansion(curr_node_data.visited)
+        curr_node_data.visited = True
+        curr_node_data.path_cost = node.cost
+        curr_node_data.depth = node.depth
+        searcher.nodes_explored += 1
+
+        # Yield execution to allow graphical update of progress
+        yield False, f"Retrieved node {pos} with best estimated cost {entry[0]} from the open list."
+
+        # Check if this node is the goal node, if so store the path in the node data and break
+        if maze.is_goal(pos):
+            searcher.reached_goal = pos
+            store_path(searcher, node)
+            yield True, f"  Found goal node {pos}."
+
+        for neighbour_pos, edge_cost in maze.get_neighbours(pos):
+            searcher.current_neighbour_pos = neighbour_pos
+            yield False, f"  Processing neighbour {neighbour_pos}."
+
+            # Children that were pruned are regenerated with the estimate they had, unless they were dead ends
+            remembered_estimate = node.forgotten.pop((neighbour_pos.x, neighbour_pos.y), 0)
+            if math.isinf(remembered_estimate):
+                node.forgotten[(neighbour_pos.x, neighbour_pos.y)] = remembered_estimate
+                yield False, "    Dead end, skipping..."
+                continue
+
+            cost = node.cost + edge_cost
+            existing = table.get((neighbour_pos.x, neighbour_pos.y))
+
+            # If this node is in memory with a path at least as short, skip
+            if existing is not None and existing.cost <= cost:
+                yield False, "    Already found shorter path, skipping..."
+                continue
+
+            # A path through a child that fills the whole budget can't be extended, so unless it's the goal treat it
+            # as a dead end
+            if node.depth + 2 >= node_budget and not maze.is_goal(neighbour_pos):
+                node.forgotten[(neighbour_pos.x, neighbour_pos.y)] = math.inf
+                yield False, "    Path is too long for the node budget, skipping..."
+                continue
+
+            # A regenerated child keeps what was learned about it before it was pruned
+            estimate = max(cost + calculate_goals_heuristic(neighbour_pos, maze.goals), remembered_estimate)
+            if existing is not None:
+                # Found a shorter path to a node in memory, move it to this parent
+                previous_parent = existing.parent
+                remove_child(previous_parent, existing)
+                existing.parent = node
+                existing.cost = cost
+                existing.estimate = estimate
+                existing.depth = node.depth + 1
+                child = existing
+                backup(previous_parent)
+            else:
+                child = SMANode(neighbour_pos, cost, estimate, node.depth + 1, node)
+                table[(neighbour_pos.x, neighbour_pos.y)] = child
+            node.children.append(child)
+            push_open(child, estimate)
+
+            # Store the cost and depth for display purposes, the parent is only stored once the goal is found
+            neighbour_node_data = searcher.get_node_data(neighbour_pos)
+            neighbour_node_data.path_cost = cost
+            neighbour_node_data.depth = child.depth
+            searcher.adding_to_queue_pos = neighbour_pos
+
+            # Make room if we've gone over the budget
+            while len(table) > node_budget:
+                if not prune():
+                    yield True, f"Node budget of {node_budget} is too small to find a path."
+                    return
+
+            # Every node held in memory counts towards the frontier, so the budget shows in the search statistics
+            searcher.stats.peak_frontier = max(searcher.stats.peak_frontier, len(table))
+
+            yield False, "    Added to the open list."
+
+        # Back the estimates of the children up to this node and its ancestors
+        expanding = None
+        backup(node)
+
+        # Clear that any neighbour is being processed
+        searcher.current_neighbour_pos = None
+
+        # Clear that any node is being added to the queue
+        searcher.adding_to_queue_pos = None
+
+    yield True, "Path not found."
+
+
+def best_estimate(node: SMANode) -> float:
+    """
+    Returns the lowest estimate of the children of the node, whether they are held in memory or forgotten
+    """
+    return min([child.estimate for child in node.children] + list(node.forgotten.values()) + [math.inf])
+
+
+def store_path(searcher: Searcher, node: SMANode):
+    """
+    Stores the parent, cost and depth of each node on the path to the given node, so the searcher can reconstruct it
+    """
+    while node is not None:
+        node_data = searcher.get_node_data(node.pos)
+        node_data.parent = node.parent.pos if node.parent is not None else None
+        node_data.path_cost = node.cost
+        node_data.depth = node.depth
+        node = node.parent
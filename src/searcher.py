@@ -1,9 +1,25 @@
 import queue
+import sys
+import time
 from collections import deque
 from typing import Iterator
 
 from src.maze import Maze
 from src.int2 import int2
+from src.paths import Path, MOVE_NUMBERS, pack_moves
+
+# Ways the priority queue can break ties between nodes of equal cost. LIFO pops the node added last, FIFO the node added
+# first, higher g the node furthest from the start, and cross product the node closest to the straight line from the
+# start to the goal, which on open maps keeps the search to one of the many equally short paths
+TIE_BREAK_LIFO = "LIFO"
+TIE_BREAK_FIFO = "FIFO"
+TIE_BREAK_HIGHER_G = "Higher g"
+TIE_BREAK_CROSS_PRODUCT = "Cross product"
+TIE_BREAKS = [TIE_BREAK_LIFO, TIE_BREAK_FIFO, TIE_BREAK_HIGHER_G, TIE_BREAK_CROSS_PRODUCT]
+
+# Multiplier of the tie value in the sort order of a queue entry, so entries are ordered by their tie value then by when
+# they were added. Keeps the sort order a single int, which checkpoints store as 64 bits
+TIE_ORDER_SCALE = 1 << 32
 
 
 class NodeData:
@@ -26,12 +42,22 @@ class NodeData:
     # How many times this node appears in the queue for rendering purposes
     in_queue_count: int
 
-    def __init__(self):
+    # Generation of the searcher the data was last reset for, data from an earlier generation is from an earlier search
+    generation: int
+
+    def __init__(self, generation: int = 0):
+        self.reset(generation)
+
+    def reset(self, generation: int):
+        """
+        Resets the data to the defaults for a search of the given generation
+        """
         self.parent = None
         self.path_cost = None
         self.depth = None
         self.visited = False
         self.in_queue_count = 0
+        self.generation = generation
 
     def in_queue(self):
         return self.in_queue_count != 0
@@ -43,15 +69,84 @@ class NodeData:
     def update_node_data(self, parent: int2, path_cost: int, depth: int, overwrite_parent=True):
         # Increase the counter for the number of times this node is in the queue for visualisation
         self.in_queue_count += 1
+        # Keep the parent, cost and depth from the first time the node was reached unless overwriting, so the cost and
+        # depth are always those of the path through the parent
+        if not overwrite_parent and self.path_cost is not None:
+            return
         # Set the parent node for tracing the path
-        if overwrite_parent or self.parent is None:
-            self.parent = parent
+        self.parent = parent
         # Set the cost to reach this node
         self.path_cost = path_cost
         # Set the depth of this node
         self.depth = depth
 
 
+class SearchStats:
+    """
+    Statistics about the work done by a search, filled in by the search algorithms as they run
+    """
+    # Number of nodes added to the queue
+    pushes: int
+
+    # Number of nodes taken off the queue
+    pops: int
+
+    # Number of nodes taken off the queue that were duplicates or had since been reached with a lower cost
+    stale_pops: int
+
+    # Largest number of nodes in the queue at once, None for searches that can't see their queue
+    peak_frontier: int
+
+    # Number of times a node that had already been expanded was expanded again
+    reopened: int
+
+    # Time in seconds spent running the search
+    wall_time: float
+
+    # Estimated number of bytes used by the node data and the queue at its largest
+    state_bytes: int
+
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_frontier = 0
+        self.reopened = 0
+        self.wall_time = 0.0
+        self.state_bytes = 0
+
+    def record_push(self, frontier_size: int):
+        """
+        Records a node being added to the queue, frontier_size is the size of the queue after adding it
+        """
+        self.pushes += 1
+        self.peak_frontier = max(self.peak_frontier, frontier_size)
+
+    def record_pop(self, stale: bool = False):
+        """
+        Records a node being taken off the queue
+        """
+        self.pops += 1
+        if stale:
+            self.stale_pops += 1
+
+    def record_expansion(self, reopened: bool):
+        """
+        Records a node being expanded, reopened is True if it had already been expanded before
+        """
+        if reopened:
+            self.reopened += 1
+
+    def __str__(self):
+        return (f"Pushes: {self.pushes}\n"
+                f"Pops: {self.pops}\n"
+                f"Stale Pops: {self.stale_pops}\n"
+                f"Peak Frontier: {self.peak_frontier if self.peak_frontier is not None else 'n/a'}\n"
+                f"Reopened: {self.reopened}\n"
+                f"Search Time: {self.wall_time * 1000:0.3F} ms\n"
+                f"Search State: {self.state_bytes / 1024:0.1F} KiB")
+
+
 class QueueNode:
     """
     Data structure to use in the PriorityQueue to track nodes that need visiting.
@@ -76,15 +171,21 @@ class PriorityQueue:
     # Used in the priority queue, gives a second element to sort by allowing it to behave as LIFO rather than FIFO
     sort_order_number: int
 
+    # How ties between entries of equal cost are broken, one of TIE_BREAKS
+    tie_break: str
+
     def __init__(self):
         self.q = queue.PriorityQueue()
         self.sort_order_number = 0
+        self.tie_break = TIE_BREAK_LIFO
 
-    def push(self, queue_node: QueueNode):
+    def push(self, queue_node: QueueNode, tie_value: int = 0):
         """
-        Pushes a new item to the queue
+        Pushes a new item to the queue. Of the items of equal cost the one with the lowest tie value comes off first,
+        then the one added last, or first when breaking ties FIFO
         """
-        self.q.put((queue_node.cost, self.sort_order_number, queue_node.pos))
+        order = self.sort_order_number if self.tie_break != TIE_BREAK_FIFO else -self.sort_order_number
+        self.q.put((queue_node.cost, tie_value * TIE_ORDER_SCALE + order, queue_node.pos))
         # Decrement the sort order number for next item, when popping items from the queue it will behave as LIFO
         self.sort_order_number -= 1
 
@@ -95,12 +196,83 @@ class PriorityQueue:
         result = self.q.get()
         return QueueNode(result[2], result[0])
 
+    def clear(self):
+        """
+        Removes every item from the queue and restarts the sort order, breaking ties LIFO again, so the queue can be
+        reused for another search
+        """
+        self.q.queue.clear()
+        self.sort_order_number = 0
+        self.tie_break = TIE_BREAK_LIFO
+
     def empty(self) -> bool:
         """
         Checks if the Queue is empty
         """
         return self.q.empty()
 
+    def size(self) -> int:
+        """
+        Returns the number of items in the queue
+        """
+        return self.q.qsize()
+
+
+class AnytimeResult:
+    """
+    A path published by an anytime search before it has finished improving it
+    """
+    # Path from start to goal
+    path: Path
+
+    # Total cost of the path
+    path_cost: int
+
+    # Heuristic weight the path was found with
+    epsilon: float
+
+    # The path costs at most this many times the optimal
+    bound: float
+
+    # Number of nodes the search had expanded when the path was published
+    expansions: int
+
+    def __init__(self, path: Path, path_cost: int, epsilon: float, bound: float, expansions: int):
+        self.path = path
+        self.path_cost = path_cost
+        self.epsilon = epsilon
+        self.bound = bound
+        self.expansions = expansions
+
+    def __str__(self):
+        return (f"Path Cost: {self.path_cost} (at most {self.bound:0.3F} x optimal, epsilon {self.epsilon:0.2F}), "
+                f"Nodes Explored: {self.expansions}")
+
+
+# Mazes with more tiles than this only keep node data for the nodes a search reaches, rather than a grid of every node
+SPARSE_NODE_THRESHOLD = 1000000
+
+
+class SparseNodeRow(dict):
+    """
+    Row of node data that only holds the nodes that have been read, making the data of a node the first time
+    """
+    def __missing__(self, x: int) -> NodeData:
+        node_data = NodeData()
+        self[x] = node_data
+        return node_data
+
+
+class SparseNodeGrid(dict):
+    """
+    Node data for a maze too big to hold a NodeData for every tile, indexed as nodes[y][x] like the full grid. Rows and
+    nodes are only made when first read, so it only grows with the part of the maze a search reaches
+    """
+    def __missing__(self, y: int) -> SparseNodeRow:
+        row = SparseNodeRow()
+        self[y] = row
+        return row
+
 
 class Searcher:
     # Maze to be searched
@@ -122,103 +294,255 @@ class Searcher:
     # Node that is currently being added to the queue
     adding_to_queue_pos: int2
 
-    # Node data for the search, includes path information, costs, visited status and whether in queue
+    # Node data for the search, includes path information, costs, visited status and whether in queue.
+    # Read it with get_node_data, which resets data left over from an earlier search. A SparseNodeGrid for big mazes
     nodes: list[list[NodeData]]
 
+    # Number of the current search, node data stamped with an older generation reads as the defaults
+    generation: int
+
     # A count of the total number of nodes visited
     nodes_explored: int
 
     # Iterator of the search algorithm to run
     iterator: Iterator
 
+    # Goal the search finished at, the cheapest to reach for the optimal algorithms when the maze has several
+    reached_goal: int2
+
     # Reconstructed Path from start to goal
-    path: list[int2]
+    path: Path
 
     # Total cost of the path
     path_cost: int
 
+    # Statistics about the work done by the current or last search
+    stats: SearchStats
+
+    # Paths published by an anytime search so far, each better than the last
+    results: list[AnytimeResult]
+
+    # Saves checkpoints of the search while it runs, a checkpoint.Checkpointer, None to not save any
+    checkpointer: object
+
+    # Goal the cross product tie break aims for, the one nearest the start, found when the tie break is set
+    tie_goal: int2
+
     def __init__(self, maze: Maze):
         self.maze = maze
-        self.path = []
+        self.path = Path()
         self.deque = deque()
         self.priority_queue = PriorityQueue()
-        self.nodes = [[NodeData() for x in range(maze.dimensions.x)] for y in range(maze.dimensions.y)]
+        if maze.dimensions.x * maze.dimensions.y > SPARSE_NODE_THRESHOLD:
+            self.nodes = SparseNodeGrid()
+        else:
+            self.nodes = [[NodeData() for x in range(maze.dimensions.x)] for y in range(maze.dimensions.y)]
+        self.generation = 0
         self.current_pos = None
         self.current_neighbour_pos = None
         self.adding_to_queue_pos = None
         self.nodes_explored = 0
-        self.path = []
+        self.reached_goal = None
+        self.path = Path()
         self.path_cost = None
+        self.stats = SearchStats()
+        self.results = []
+        self.checkpointer = None
+        self.tie_goal = None
 
     def set_algorithm(self, algorithm):
         self.iterator = iter(algorithm(self))
 
     def initialise(self):
-        self.deque = deque()
-        self.priority_queue = PriorityQueue()
-        self.nodes = [[NodeData() for x in range(self.maze.dimensions.x)] for y in range(self.maze.dimensions.y)]
+        """
+        Resets the searcher for a new search. The queues are emptied and the node grid is kept, starting a new generation
+        instead so each node resets itself the first time it's read, which costs the same however big the maze is
+        """
+        self.deque.clear()
+        self.priority_queue.clear()
+        self.generation += 1
         self.current_pos = None
         self.current_neighbour_pos = None
         self.adding_to_queue_pos = None
         self.nodes_explored = 0
-        self.path = []
+        self.reached_goal = None
+        self.path = Path()
         self.path_cost = None
+        self.stats = SearchStats()
+        self.results = []
 
     def step(self) -> tuple[bool, str]:
         """
         Performs a single step through the search algorithm
         :return: A tuple (bool, str) where bool is True when algorithm complete, and str is a message to display
         """
+        timer = time.perf_counter()
         result = next(self.iterator, (True, str))
+        self.stats.wall_time += time.perf_counter() - timer
 
-        # Calculate the path if completed
+        # Calculate the path and the size of the search state if completed
         if result[0]:
             self.calculate_path()
+            self.stats.state_bytes = self.estimate_state_bytes()
 
         return result
 
-    # Run a search from start to finish without yielding
-    def run_search(self, algorithm):
+    # Run a search from start to finish without yielding, returns the statistics of the search
+    def run_search(self, algorithm) -> SearchStats:
+        timer = time.perf_counter()
         iterator = iter(algorithm(self))
         for result in iterator:
             if result[0]:
                 break
+        self.stats.wall_time = time.perf_counter() - timer
         self.calculate_path()
+        self.stats.state_bytes = self.estimate_state_bytes()
+        return self.stats
 
-    def get_node_data(self, pos: int2) -> NodeData:
+    def print_results(self, algorithm_name: str):
         """
-        Returns the NodeData for the provided xy position
+        Prints the results and statistics of the last search to the console
         """
-        return self.nodes[pos.y][pos.x]
+        path_length = len(self.path)
+        print(f"\n==== SEARCH COMPLETE ====")
+        print(f"Maze: {self.maze.file_name}")
+        print(f"Algorithm: {algorithm_name}")
+        print(f"Start: {self.maze.start}")
+        print(f"Goals: {self.maze.goals}")
+        print(f"Goal Reached: {self.reached_goal if path_length != 0 else 'NO PATH FOUND'}")
+        print(f"Nodes Explored: {self.nodes_explored}")
+        print(f"Path Length: {str(path_length - 1) if path_length != 0 else 'NO PATH FOUND'}")
+        print(f"Path Cost: {str(self.path_cost) if path_length != 0 else 'NO PATH FOUND'}")
+        print(f"{self.stats}\n")
+
+    def publish_result(self, epsilon: float, bound: float) -> AnytimeResult:
+        """
+        Reconstructs the path to the reached goal and publishes it while the search carries on improving it, so the
+        current best path is shown early
+        """
+        self.calculate_path()
+        result = AnytimeResult(self.path, self.path_cost, epsilon, bound, self.nodes_explored)
+        self.results.append(result)
+        return result
 
-    def calculate_path(self):
+    def checkpoint_if_due(self):
         """
-        Stores the reconstructed path from Start to Goal if one exists, otherwise stores an empty list
+        Called by the algorithms between expanding one node and the next, where the node data, the queue and the
+        counters are the whole state of the search, to save a checkpoint if one is due
         """
-        self.path = []
+        if self.checkpointer is not None:
+            self.checkpointer.save_if_due(self)
 
-        # Starting at the end point
-        curr_node_data = self.get_node_data(self.maze.goal)
+    def set_tie_break(self, tie_break: str):
+        """
+        Sets how the priority queue breaks ties, and finds the goal the cross product tie break aims for once here
+        rather than for every node pushed
+        """
+        self.priority_queue.tie_break = tie_break
+        start = self.maze.start
+        self.tie_goal = min(self.maze.goals, key=lambda goal: abs(goal.x - start.x) + abs(goal.y - start.y),
+                            default=None)
 
-        # Add end point cost to the path cost
-        self.path_cost = self.maze.get_edge_cost_to(self.maze.goal)
+    def get_tie_value(self, pos: int2, path_cost: int) -> int:
+        """
+        Returns the tie value of a node being pushed to the priority queue with the given cost from the start, for the
+        queue's tie break. Lower values come off the queue first among nodes of equal cost
+        """
+        tie_break = self.priority_queue.tie_break
+        if tie_break == TIE_BREAK_HIGHER_G:
+            return -path_cost
+        elif tie_break == TIE_BREAK_CROSS_PRODUCT and self.tie_goal is not None:
+            # Size of the cross product of the vectors from the goal to the node and from the goal to the start, which
+            # grows with the node's distance from the line between them. The goal nearest the start is aimed for
+            start = self.maze.start
+            goal = self.tie_goal
+            return abs((pos.x - goal.x) * (start.y - goal.y) - (start.x - goal.x) * (pos.y - goal.y))
+        return 0
+
+    def frontier_size(self) -> int:
+        """
+        Returns the number of nodes in whichever queue the algorithm is using
+        """
+        return len(self.deque) + self.priority_queue.size()
 
-        # If we have never visited the goal node and set its came_from attribute then there was no path, exit
-        if curr_node_data.parent is None:
-            return
+    def estimate_state_bytes(self) -> int:
+        """
+        Estimates the memory used by the node data, and by the queue when it held the most nodes
+        """
+        # Every NodeData has the same attributes, so measure one and multiply
+        sample = NodeData()
+        node_bytes = sys.getsizeof(sample) + sys.getsizeof(sample.__dict__)
+        if isinstance(self.nodes, SparseNodeGrid):
+            grid_bytes = sys.getsizeof(self.nodes) + sum(sys.getsizeof(row) for row in self.nodes.values())
+            grid_bytes += node_bytes * sum(len(row) for row in self.nodes.values())
+        else:
+            grid_bytes = sys.getsizeof(self.nodes) + sum(sys.getsizeof(row) for row in self.nodes)
+            grid_bytes += node_bytes * self.maze.dimensions.x * self.maze.dimensions.y
+
+        # A queue entry is a reference to an int2, plus a (cost, sort order, pos) tuple if the priority queue was used
+        pos = self.maze.start
+        entry_bytes = 8 + sys.getsizeof(pos) + sys.getsizeof(pos.__dict__)
+        if self.priority_queue.sort_order_number != 0:
+            entry_bytes += sys.getsizeof((0, 0, pos))
+
+        # A search that can't see its queue kept it outside the node data, so only the node data is counted
+        if self.stats.peak_frontier is None:
+            return grid_bytes
+        return grid_bytes + entry_bytes * self.stats.peak_frontier
+
+    def get_stored_node_data(self):
+        """
+        Iterates over the node data held for the maze as (x, y, node data), every node for the full grid and only the
+        nodes that have been read for a sparse one. Data from an earlier generation is included and reads as defaults
+        """
+        if isinstance(self.nodes, SparseNodeGrid):
+            for y, row in self.nodes.items():
+                for x, node_data in row.items():
+                    yield x, y, node_data
+        else:
+            for y, row in enumerate(self.nodes):
+                for x, node_data in enumerate(row):
+                    yield x, y, node_data
 
-        # Add goal node
-        self.path.append(self.maze.goal)
+    def get_node_data(self, pos: int2) -> NodeData:
+        """
+        Returns the NodeData for the provided xy position, resetting it first if it's left over from an earlier search
+        """
+        node_data = self.nodes[pos.y][pos.x]
+        if node_data.generation != self.generation:
+            node_data.reset(self.generation)
+        return node_data
+
+    def calculate_path(self):
+        """
+        Stores the reconstructed path from Start to the reached goal if one exists, otherwise stores an empty path. The
+        path is stored as the moves made following the parents back from the goal, and its cost is the goal's path cost
+        """
+        self.path = Path()
+        self.path_cost = None
 
-        # Loop over the came_from values until we reach the start node
-        while curr_node_data.parent != self.maze.start:
-            self.path.append(curr_node_data.parent)
-            # Add the cost of traversing this edge
-            self.path_cost += self.maze.get_edge_cost_to(curr_node_data.parent)
-            curr_node_data = self.get_node_data(curr_node_data.parent)
+        # If the search never reached a goal then there was no path, exit
+        if self.reached_goal is None:
+            return
 
-        # Add start node
-        self.path.append(self.maze.start)
+        # Starting at the end point
+        curr_node_data = self.get_node_data(self.reached_goal)
 
-        # Reverse the path so it's in order from Start -> Goal
-        self.path.reverse()
+        # If the goal node never had its came_from attribute set then there was no path, exit
+        if curr_node_data.parent is None:
+            return
+        path_cost = curr_node_data.path_cost
+
+        # Loop over the came_from values until we reach the start node, recording the move into each node
+        moves = []
+        pos = self.reached_goal
+        while pos != self.maze.start:
+            parent = curr_node_data.parent
+            moves.append(MOVE_NUMBERS[(pos.x - parent.x, pos.y - parent.y)])
+            pos = parent
+            curr_node_data = self.get_node_data(pos)
+
+        # Reverse the moves so they're in order from Start -> Goal
+        moves.reverse()
+        self.path = Path(self.maze.start, self.reached_goal, pack_moves(moves), len(moves), path_cost)
+        self.path_cost = path_cost
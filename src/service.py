@@ -0,0 +1,423 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urllib_request
+
+from src import maze_loader
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher
+from src.search import registry
+
+# Address the service listens on, only the local machine can connect
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8215
+
+# Most queries sent to a worker at once, and the longest time in seconds the first query of a batch waits for others
+# to join it. Batching spreads the cost of handing work to a worker process over many queries
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_WINDOW = 0.002
+
+# Number of most recent queries the latency percentiles and recent throughput are calculated over
+LATENCY_WINDOW = 1000
+
+# Mazes and preprocessing of the worker this is running in, set up once per worker so every query after the first on
+# a maze finds everything it needs already built
+worker_mazes: dict[str, Maze] = {}
+worker_preprocessing: dict[str, registry.MazePreprocessing] = {}
+
+# Held while picking an algorithm, so worker threads sharing the preprocessing don't build the same data at once
+worker_preprocessing_lock = threading.Lock()
+
+
+def init_worker(mazes: dict[str, Maze]):
+    """
+    Runs once in each worker process when the pool starts, keeping the mazes parsed by the service. Worker threads
+    share one set, so it's run once by the service before their pool starts
+    """
+    global worker_mazes, worker_preprocessing
+    worker_mazes = mazes
+    worker_preprocessing = {name: registry.MazePreprocessing(maze) for name, maze in mazes.items()}
+
+
+def run_batch(queries: list[dict]) -> list[dict]:
+    """
+    Runs in a worker, answering each query of a batch in turn. A query that fails gets an error rather than failing the
+    whole batch
+    """
+    return [run_query(query) for query in queries]
+
+
+def run_query(query: dict) -> dict:
+    """
+    Searches for a path for one query, which has already been checked by the service. A query can give its own start
+    and goals, in which case it's searched on a copy of the maze sharing its tiles, so the preprocessing that only
+    depends on the tiles is still used
+    """
+    try:
+        maze = worker_mazes[query["maze"]]
+        if "start" in query or "goals" in query:
+            start = int2(*query["start"]) if "start" in query else maze.start
+            goals = [int2(*goal) for goal in query["goals"]] if "goals" in query else maze.goals
+            maze = Maze(maze.file_name, maze.dimensions, maze.nodes, start, goals)
+
+        with worker_preprocessing_lock:
+            algorithm = registry.get_algorithm(query["algorithm"], worker_preprocessing[query["maze"]])
+        searcher = Searcher(maze)
+        stats = searcher.run_search(algorithm)
+        return {
+            "maze": query["maze"],
+            "algorithm": query["algorithm"],
+            "path": [[pos.x, pos.y] for pos in searcher.path],
+            "cost": searcher.path_cost if len(searcher.path) != 0 else None,
+            "nodes_explored": searcher.nodes_explored,
+            "search_ms": stats.wall_time * 1000,
+        }
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+
+
+class ServiceMetrics:
+    """
+    Latency and throughput of the queries a service has answered, updated from several threads at once
+    """
+    # Time the service started
+    start_time: float
+
+    # Number of queries answered, and how many of those were errors
+    completed: int
+    errors: int
+
+    # Number of batches sent to the workers, and the queries in them
+    batches: int
+    batched_queries: int
+
+    # Latency in seconds of the most recent queries, from being received to being answered, with the time each finished
+    latencies: deque[tuple[float, float]]
+
+    # Held while updating or reading the metrics
+    lock: threading.Lock
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.completed = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_queries = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record_batch(self, size: int):
+        with self.lock:
+            self.batches += 1
+            self.batched_queries += size
+
+    def record_query(self, latency: float, error: bool):
+        with self.lock:
+            self.completed += 1
+            if error:
+                self.errors += 1
+            self.latencies.append((latency, time.perf_counter()))
+
+    def snapshot(self) -> dict:
+        """
+        Returns the metrics as a dict ready to be sent as JSON, latencies are in milliseconds
+        """
+        with self.lock:
+            latencies = sorted(latency for latency, finished in self.latencies)
+            elapsed = time.perf_counter() - self.start_time
+            recent_time = self.latencies[-1][1] - self.latencies[0][1] if len(self.latencies) > 1 else 0.0
+
+            def percentile(fraction: float) -> float:
+                if len(latencies) == 0:
+                    return None
+                return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+            return {
+                "uptime_s": elapsed,
+                "completed": self.completed,
+                "errors": self.errors,
+                "batches": self.batches,
+                "average_batch_size": self.batched_queries / self.batches if self.batches > 0 else None,
+                "latency_p50_ms": percentile(0.5),
+                "latency_p95_ms": percentile(0.95),
+                "latency_p99_ms": percentile(0.99),
+                "latency_max_ms": latencies[-1] * 1000 if len(latencies) > 0 else None,
+                "throughput_per_s": self.completed / elapsed if elapsed > 0 else 0.0,
+                "recent_throughput_per_s": (len(self.latencies) - 1) / recent_time if recent_time > 0 else None,
+            }
+
+
+class SearchService:
+    """
+    Answers path queries against mazes kept loaded in memory. Queries can arrive from many threads at once, they're put
+    on a queue and a batching thread gathers them into batches for a pool of workers. Each worker keeps its own copy of
+    the mazes and whatever the algorithms build from them, so only the first query for a maze and algorithm pays for
+    preprocessing. Worker processes avoid the searches sharing one interpreter lock, worker threads start faster and
+    are used when processes is false
+    """
+    # Mazes that can be queried by name
+    mazes: dict[str, Maze]
+
+    # Names of the algorithms that can be used
+    algorithms: list[str]
+
+    # Number of workers, and whether they're processes or threads
+    workers: int
+    processes: bool
+
+    # Most queries in a batch, and the longest the first query of a batch waits for others in seconds
+    batch_size: int
+    batch_window: float
+
+    # Latency and throughput of the queries answered
+    metrics: ServiceMetrics
+
+    # Queries waiting to be batched as (query, future, time received), None tells the batching thread to stop
+    pending: queue.Queue
+
+    # Pool of workers the batches are sent to, and the thread gathering them
+    executor: object
+    batch_thread: threading.Thread
+
+    def __init__(self, mazes: dict[str, Maze] = None, workers: int = None, processes: bool = True,
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_window: float = DEFAULT_BATCH_WINDOW):
+        self.mazes = mazes if mazes is not None else maze_loader.load()
+        self.algorithms = registry.get_algorithm_names()
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.processes = processes
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.metrics = ServiceMetrics()
+        self.pending: queue.Queue = queue.Queue()
+        self.executor = None
+        self.batch_thread = None
+
+    def start(self):
+        """
+        Starts the workers and the batching thread
+        """
+        if self.processes:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.mazes,))
+        else:
+            init_worker(self.mazes)
+            self.executor = ThreadPoolExecutor(self.workers)
+        self.metrics = ServiceMetrics()
+        self.batch_thread = threading.Thread(target=self.batch_queries, daemon=True)
+        self.batch_thread.start()
+
+    def stop(self):
+        """
+        Stops taking queries, waits for the ones already taken to be answered, then stops the workers
+        """
+        self.pending.put(None)
+        self.batch_thread.join()
+        self.executor.shutdown(wait=True)
+
+    def submit(self, query: dict) -> Future:
+        """
+        Checks the query and puts it on the queue, returning a future of the answer. A query is a dict with the name of
+        a maze, and optionally the name of an algorithm defaulting to A*, a start as [x, y] and a list of goals
+        """
+        if not isinstance(query, dict):
+            raise Exception("A query must be a JSON object")
+        if query.get("maze") not in self.mazes:
+            raise Exception(f"No maze named '{query.get('maze')}'")
+        query = dict(query)
+        query.setdefault("algorithm", "A*")
+        if query["algorithm"] not in self.algorithms:
+            raise Exception(f"No algorithm named '{query['algorithm']}'")
+
+        maze = self.mazes[query["maze"]]
+        if "goals" in query and not (isinstance(query["goals"], list) and len(query["goals"]) != 0):
+            raise Exception("A query's goals must be a list of at least one position")
+        positions = ([query["start"]] if "start" in query else []) + query.get("goals", [])
+        for position in positions:
+            # bool is a subclass of int, but true and false aren't coordinates
+            if not (isinstance(position, list) and len(position) == 2 and
+                    all(isinstance(value, int) and not isinstance(value, bool) for value in position)):
+                raise Exception(f"Position {position} is not a pair of whole numbers")
+            if not (0 <= position[0] < maze.dimensions.x and 0 <= position[1] < maze.dimensions.y):
+                raise Exception(f"Position {position} is not inside the maze")
+            if maze.is_wall(int2(*position)):
+                raise Exception(f"Position {position} is a wall")
+
+        future = Future()
+        self.pending.put((query, future, time.perf_counter()))
+        return future
+
+    def query(self, query: dict) -> dict:
+        """
+        Submits the query and waits for the answer
+        """
+        return self.submit(query).result()
+
+    def batch_queries(self):
+        """
+        Runs on the batching thread, taking queries off the queue in batches and sending each batch to the workers.
+        A batch is sent once it's full or the batch window has passed since its first query arrived
+        """
+        stopping = False
+        while not stopping:
+            item = self.pending.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self.pending.get(timeout=max(remaining, 0)) if remaining > 0 else self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self.metrics.record_batch(len(batch))
+            batch_future = self.executor.submit(run_batch, [query for query, future, received in batch])
+            batch_future.add_done_callback(lambda done, batch=batch: self.finish_batch(batch, done))
+
+    def finish_batch(self, batch: list[tuple[dict, Future, float]], batch_future: Future):
+        """
+        Hands each answer of a finished batch back to whoever asked for it
+        """
+        try:
+            answers = batch_future.result()
+        except Exception as error:
+            answers = [{"error": f"{type(error).__name__}: {error}"}] * len(batch)
+
+        finished = time.perf_counter()
+        for (query, future, received), answer in zip(batch, answers):
+            answer = dict(answer)
+            answer["latency_ms"] = (finished - received) * 1000
+            self.metrics.record_query(finished - received, "error" in answer)
+            future.set_result(answer)
+
+
+class LocalClient:
+    """
+    Client calling a service in the same process directly, with no network in between
+    """
+    # Service the queries are sent to
+    service: SearchService
+
+    def __init__(self, service: SearchService):
+        self.service = service
+
+    def find_path(self, maze: str, algorithm: str = "A*", start: list[int] = None, goals: list[list[int]] = None) -> dict:
+        return self.service.query(make_query(maze, algorithm, start, goals))
+
+    def mazes(self) -> list[str]:
+        return sorted(self.service.mazes.keys())
+
+    def metrics(self) -> dict:
+        return self.service.metrics.snapshot()
+
+
+class HttpClient:
+    """
+    Client sending queries to a service over HTTP, with the same methods as LocalClient
+    """
+    # Address of the service
+    url: str
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.url = f"http://{host}:{port}"
+
+    def request(self, path: str, body: dict = None) -> object:
+        data = json.dumps(body).encode() if body is not None else None
+        http_request = urllib_request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        with urllib_request.urlopen(http_request) as response:
+            return json.loads(response.read())
+
+    def find_path(self, maze: str, algorithm: str = "A*", start: list[int] = None, goals: list[list[int]] = None) -> dict:
+        return self.request("/path", make_query(maze, algorithm, start, goals))
+
+    def mazes(self) -> list[str]:
+        return self.request("/mazes")
+
+    def metrics(self) -> dict:
+        return self.request("/metrics")
+
+
+def make_query(maze: str, algorithm: str, start: list[int], goals: list[list[int]]) -> dict:
+    """
+    Returns a query for the service, leaving out the start and goals if they aren't given
+    """
+    query = {"maze": maze, "algorithm": algorithm}
+    if start is not None:
+        query["start"] = start
+    if goals is not None:
+        query["goals"] = goals
+    return query
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the service's HTTP requests, all bodies are JSON. GET /mazes lists the mazes, GET /algorithms lists the
+    algorithms, GET /metrics returns the metrics, and POST /path answers a query
+    """
+    # Service answering the requests, set on the class by serve
+    service: SearchService = None
+
+    def do_GET(self):
+        if self.path == "/mazes":
+            self.send_json(200, sorted(self.service.mazes.keys()))
+        elif self.path == "/algorithms":
+            self.send_json(200, self.service.algorithms)
+        elif self.path == "/metrics":
+            self.send_json(200, self.service.metrics.snapshot())
+        else:
+            self.send_json(404, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        if self.path != "/path":
+            self.send_json(404, {"error": f"Unknown path '{self.path}'"})
+            return
+        try:
+            query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            future = self.service.submit(query)
+        except Exception as error:
+            self.send_json(400, {"error": str(error)})
+            return
+        answer = future.result()
+        self.send_json(500 if "error" in answer else 200, answer)
+
+    def send_json(self, status: int, body: object):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):
+        # Every request being printed would slow the service down, errors are still returned to the client
+        pass
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, service: SearchService = None):
+    """
+    Runs the service over HTTP until interrupted, each request is handled on its own thread
+    """
+    if service is None:
+        service = SearchService()
+    service.start()
+    RequestHandler.service = service
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    print(f"Search service listening on http://{host}:{server.server_address[1]} with {service.workers} "
+          f"{'processes' if service.processes else 'threads'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
@@ -0,0 +1,59 @@
+import pygame
+
+from src.constants import *
+from src.frame_timer import FrameTimer
+
+
+class FrameTimerOverlay:
+    """
+    Draws the rolling frame time statistics of a FrameTimer on top of the window, toggled with F3
+    """
+    # Timer to display the statistics of
+    frame_timer: FrameTimer
+
+    # Whether the overlay is currently shown
+    visible: bool
+
+    # Font used to draw the statistics, created when first shown as pygame.font needs initialising first
+    font: pygame.font.Font
+
+    # Lines of text last drawn and the frame they were calculated on, recalculated every OVERLAY_REFRESH_FRAMES
+    lines: list[pygame.Surface]
+    lines_frame_number: int
+
+    def __init__(self, frame_timer: FrameTimer, visible: bool = False):
+        self.frame_timer = frame_timer
+        self.visible = visible
+        self.font = None
+        self.lines = []
+        self.lines_frame_number = None
+
+    def process_event(self, event: pygame.event.Event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.visible = not self.visible
+
+    def draw(self, surface: pygame.Surface):
+        if not self.visible:
+            return
+
+        if self.font is None:
+            self.font = pygame.font.SysFont("monospace", OVERLAY_FONT_SIZE)
+
+        # Sorting the rolling window every frame is wasteful, so the text is only refreshed every few frames
+        timer = self.frame_timer
+        if self.lines_frame_number is None or timer.frame_number - self.lines_frame_number >= OVERLAY_REFRESH_FRAMES:
+            text = [f"{'frame (ms)':<22} p50 {timer.percentile(50):6.2F}  p99 {timer.percentile(99):6.2F}"]
+            for name in timer.phases:
+                text.append(f"{name:<22} p50 {timer.percentile(50, name):6.2F}  p99 {timer.percentile(99, name):6.2F}")
+            self.lines = [self.font.render(line, True, OVERLAY_TEXT_COLOUR) for line in text]
+            self.lines_frame_number = timer.frame_number
+
+        # Draw the text over a dark background so it is readable over the maze
+        line_height = self.font.get_linesize()
+        width = max(line.get_width() for line in self.lines) + 8
+        background = pygame.Surface((width, line_height * len(self.lines) + 8))
+        background.set_alpha(200)
+        background.fill(BACKGROUND_COLOUR)
+        surface.blit(background, (0, 0))
+        for i, line in enumerate(self.lines):
+            surface.blit(line, (4, 4 + i * line_height))
@@ -1,10 +1,13 @@
+import math
+
 import pygame
-from pygame import Rect
+from pygame import Rect, Surface
 
 from src.constants import *
 from src.context import Context
 from src.int2 import int2
 from src.maze import Maze
+from src.paths import Path
 from src.searcher import Searcher
 
 
@@ -15,14 +18,33 @@ class MazeDrawer:
     # Searcher we are using on the maze
     searcher: Searcher
 
-    # Maze pixel start position
-    draw_start_xy: tuple[int, int]
+    # Pixel area of the window the maze is drawn into, nothing is drawn outside of it. It stops at the UI panel, so
+    # the mouse wheel over the panel scrolls its lists rather than zooming the maze
+    viewport_rect: Rect
+
+    # Position of the camera in grid coordinates, this point of the maze is drawn at the center of the viewport
+    camera_center: tuple[float, float]
+
+    # Tile size that fits the entire maze into the viewport, used as the default zoom level
+    fit_tile_size: float
+
+    # Smallest tile size the camera can zoom out to
+    min_tile_size: float
+
+    # Largest tile size the camera can zoom in to
+    max_tile_size: float
+
+    # True while the maze is being dragged with the mouse
+    dragging: bool
+
+    # Maze pixel start position, the pixel position of the top left corner of the first tile
+    draw_start_xy: tuple[float, float]
 
     # Background/border for the maze
     maze_border_rect: Rect
 
-    # Dimensions for a tile including its border
-    tile_size: int
+    # Dimensions for a tile including its border, can be fractional when zoomed out past OVERVIEW_TILE_SIZE
+    tile_size: float
 
     # Dimensions for a tile excluding its border
     tile_inner_size: int
@@ -42,44 +64,76 @@ class MazeDrawer:
     # Dimensions for the start/end rect
     start_end_dim: int
 
+    # Downsampled image of the maze where each pixel covers overview_stride x overview_stride tiles, built when first
+    # needed
+    overview_surface: Surface
+
+    # Number of tiles in each dimension covered by a single pixel of the overview
+    overview_stride: int
+
+    # The overview scaled to the current camera, and the camera state it was scaled for, so it's only rescaled when
+    # the camera moves
+    overview_cache: tuple[tuple, Surface, tuple[int, int]]
+
+    # Pixel positions the path is drawn at, and the path and camera state they were worked out for, so the path is
+    # only walked again when it changes or the camera moves
+    path_cache: tuple[Path, tuple, list[tuple[int, int]]]
+
     def __init__(self, maze: Maze):
         self.maze = maze
         self.searcher = None
+        self.viewport_rect = Rect((0, 0), (min(MAZE_SIZE[0], UI_PANEL_X), MAZE_SIZE[1]))
+        self.dragging = False
+        self.overview_surface = None
+        self.overview_stride = 1
+        self.overview_cache = None
+        self.path_cache = None
 
         # Calculate the total number of pixels reserved for a buffer around the maze in each dimension
-        buffer_x = int(MAZE_SIZE[0] * BUFFER_PCT)
-        buffer_y = int(MAZE_SIZE[1] * BUFFER_PCT)
+        buffer_x = int(self.viewport_rect.width * BUFFER_PCT)
+        buffer_y = int(self.viewport_rect.height * BUFFER_PCT)
 
         # Calculate the maximum tile width/height so we can display the entire maze at once as large as possible
-        max_tile_width = (MAZE_SIZE[0] - buffer_x) / self.maze.dimensions.x
-        max_tile_height = (MAZE_SIZE[1] - buffer_y) / self.maze.dimensions.y
+        max_tile_width = (self.viewport_rect.width - buffer_x) / self.maze.dimensions.x
+        max_tile_height = (self.viewport_rect.height - buffer_y) / self.maze.dimensions.y
 
-        # Use the smallest value of max_tile_width/height, this becomes the total dimension of a tile including border
-        self.tile_size = int(min(max_tile_height, max_tile_width))
+        # Use the smallest value of max_tile_width/height, this becomes the total dimension of a tile including border.
+        # Tiles drawn individually use whole pixels, very large mazes keep the fractional size and use the overview
+        self.fit_tile_size = min(max_tile_height, max_tile_width)
+        if self.fit_tile_size >= OVERVIEW_TILE_SIZE:
+            self.fit_tile_size = int(self.fit_tile_size)
 
-        # Calculate the border size of the tile as a percentage of the total dimension, minimum 1 pixel
-        self.tile_border_size = max(int(self.tile_size * BORDER_PCT), 1)
+        # Allow zooming out to half the size that fits the maze, and zooming in to MAX_TILE_SIZE
+        self.min_tile_size = self.fit_tile_size / 2
+        self.max_tile_size = max(MAX_TILE_SIZE, self.fit_tile_size)
 
-        # Calculate the dimension of the tile without borders
-        self.tile_inner_size = self.tile_size - self.tile_border_size * 2
+        self.reset_camera()
 
-        # Calculate the offset from the edge of the screen to start drawing the maze
-        self.draw_start_xy = (int(buffer_x / 2), int(buffer_y / 2))
+    def set_searcher(self, searcher: Searcher):
+        self.searcher = searcher
 
-        # Center the maze vertically/horizontally
-        if max_tile_height < max_tile_width:
-            self.draw_start_xy = (
-                int(MAZE_SIZE[0] / 2 - self.tile_size * self.maze.dimensions.x / 2), self.draw_start_xy[1])
-        else:
-            self.draw_start_xy = (
-                self.draw_start_xy[0], int(MAZE_SIZE[1] / 2 - self.tile_size * self.maze.dimensions.y / 2))
+    def reset_camera(self):
+        """
+        Centers the camera on the maze, zoomed so the entire maze is visible
+        """
+        self.camera_center = (self.maze.dimensions.x / 2, self.maze.dimensions.y / 2)
+        self.set_tile_size(self.fit_tile_size)
 
-        # Calculate the start and end pixel positions for the background/border for the maze
-        maze_border_start = (
-            self.draw_start_xy[0] - self.tile_border_size, self.draw_start_xy[1] - self.tile_border_size)
-        maze_border_end = (self.tile_size * self.maze.dimensions.x + self.tile_border_size * 2,
-                           self.tile_size * self.maze.dimensions.y + self.tile_border_size * 2)
-        self.maze_border_rect = Rect(maze_border_start, maze_border_end)
+    def set_tile_size(self, tile_size: float):
+        """
+        Sets the zoom level of the camera, then recalculates all the dimensions that depend on the tile size
+        """
+        self.tile_size = min(max(tile_size, self.min_tile_size), self.max_tile_size)
+
+        # Tiles that are drawn individually are kept to whole pixels so the grid stays even
+        if self.tile_size >= OVERVIEW_TILE_SIZE:
+            self.tile_size = int(self.tile_size)
+
+        # Calculate the border size of the tile as a percentage of the total dimension, minimum 1 pixel
+        self.tile_border_size = max(int(self.tile_size * BORDER_PCT), 1)
+
+        # Calculate the dimension of the tile without borders
+        self.tile_inner_size = max(int(self.tile_size) - self.tile_border_size * 2, 1)
 
         # Calculates the radius for the agent circle
         self.agent_radius = AGENT_RADIUS_PCT * self.tile_inner_size / 2
@@ -93,16 +147,117 @@ class MazeDrawer:
         # Calculate the dimensions for the start/end rect
         self.start_end_dim = int(self.tile_inner_size * (1 - START_END_BUFFER_PCT))
 
-    def set_searcher(self, searcher: Searcher):
-        self.searcher = searcher
+        self.update_camera()
+
+    def update_camera(self):
+        """
+        Recalculates the pixel position of the maze from the camera position and zoom level
+        """
+        # Keep the camera over the maze so it can't be panned away into empty space
+        self.camera_center = (min(max(self.camera_center[0], 0.0), float(self.maze.dimensions.x)),
+                              min(max(self.camera_center[1], 0.0), float(self.maze.dimensions.y)))
+
+        # Calculate the offset from the edge of the screen to start drawing the maze
+        self.draw_start_xy = (self.viewport_rect.centerx - self.camera_center[0] * self.tile_size,
+                              self.viewport_rect.centery - self.camera_center[1] * self.tile_size)
+
+        # Calculate the start and end pixel positions for the background/border for the maze
+        maze_border_start = (int(self.draw_start_xy[0]) - self.tile_border_size,
+                             int(self.draw_start_xy[1]) - self.tile_border_size)
+        maze_border_end = (int(self.tile_size * self.maze.dimensions.x) + self.tile_border_size * 2,
+                           int(self.tile_size * self.maze.dimensions.y) + self.tile_border_size * 2)
+        self.maze_border_rect = Rect(maze_border_start, maze_border_end)
+
+    def zoom_at(self, factor: float, pixel_xy: tuple[int, int]):
+        """
+        Zooms the camera by the given factor, keeping the grid position under pixel_xy in the same place on screen
+        """
+        # Grid position currently under the cursor
+        grid_x = (pixel_xy[0] - self.draw_start_xy[0]) / self.tile_size
+        grid_y = (pixel_xy[1] - self.draw_start_xy[1]) / self.tile_size
+
+        self.set_tile_size(self.tile_size * factor)
+
+        # Move the camera so the same grid position is back under the cursor
+        self.camera_center = (grid_x - (pixel_xy[0] - self.viewport_rect.centerx) / self.tile_size,
+                              grid_y - (pixel_xy[1] - self.viewport_rect.centery) / self.tile_size)
+        self.update_camera()
+
+    def pan(self, dx: float, dy: float):
+        """
+        Moves the maze by the given number of pixels
+        """
+        self.camera_center = (self.camera_center[0] - dx / self.tile_size,
+                              self.camera_center[1] - dy / self.tile_size)
+        self.update_camera()
+
+    def process_event(self, event: pygame.event.Event):
+        """
+        Handles camera controls. Mouse wheel zooms, right or middle mouse drag and the arrow keys pan, Home resets
+        """
+        if event.type == pygame.MOUSEWHEEL:
+            mouse_xy = pygame.mouse.get_pos()
+            if self.viewport_rect.collidepoint(mouse_xy):
+                self.zoom_at(ZOOM_STEP ** event.y, mouse_xy)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self.dragging = self.viewport_rect.collidepoint(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.pan(event.rel[0], event.rel[1])
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_LEFT:
+                self.pan(PAN_STEP_PIXELS, 0)
+            elif event.key == pygame.K_RIGHT:
+                self.pan(-PAN_STEP_PIXELS, 0)
+            elif event.key == pygame.K_UP:
+                self.pan(0, PAN_STEP_PIXELS)
+            elif event.key == pygame.K_DOWN:
+                self.pan(0, -PAN_STEP_PIXELS)
+            elif event.key == pygame.K_HOME:
+                self.reset_camera()
+
+    def visible_tile_range(self) -> tuple[int, int, int, int]:
+        """
+        Returns the range of tiles (x_start, y_start, x_end, y_end) that intersect the viewport, end exclusive
+        """
+        x_start = max(int((self.viewport_rect.left - self.draw_start_xy[0]) // self.tile_size), 0)
+        y_start = max(int((self.viewport_rect.top - self.draw_start_xy[1]) // self.tile_size), 0)
+        x_end = min(int(math.ceil((self.viewport_rect.right - self.draw_start_xy[0]) / self.tile_size)),
+                    self.maze.dimensions.x)
+        y_end = min(int(math.ceil((self.viewport_rect.bottom - self.draw_start_xy[1]) / self.tile_size)),
+                    self.maze.dimensions.y)
+        return x_start, y_start, x_end, y_end
+
+    def is_overview(self) -> bool:
+        """
+        Returns true when zoomed out far enough that the downsampled overview is drawn instead of individual tiles
+        """
+        return self.tile_size < OVERVIEW_TILE_SIZE
 
     def draw_maze(self, ctx: Context):
+        # Only draw inside the viewport, so zoomed in mazes don't spill over the UI
+        ctx.surface.set_clip(self.viewport_rect)
+
         # Draw background behind entire maze, sets border colour
         pygame.draw.rect(ctx.surface, BORDER_COLOUR, self.maze_border_rect)
 
-        # Iterate over the nodes of the maze
-        for y in range(self.maze.dimensions.y):
-            for x in range(self.maze.dimensions.x):
+        if self.is_overview():
+            self.draw_overview(ctx)
+        else:
+            self.draw_tiles(ctx)
+
+        # Skip drawing the current neighbour if there's no searcher attached
+        if self.searcher is not None:
+            self.draw_current_neighbour(ctx)
+
+        ctx.surface.set_clip(None)
+
+    def draw_tiles(self, ctx: Context):
+        # Iterate over the nodes of the maze that are within the viewport
+        x_start, y_start, x_end, y_end = self.visible_tile_range()
+        for y in range(y_start, y_end):
+            for x in range(x_start, x_end):
                 curr = int2(x, y)
                 tile_colour = FLOOR_TILE_COLOUR
 
@@ -111,7 +266,7 @@ class MazeDrawer:
                     tile_colour = WALL_TILE_COLOUR
                 if curr == self.maze.start:
                     tile_colour = START_TILE_COLOUR
-                elif curr == self.maze.goal:
+                elif self.maze.is_goal(curr):
                     tile_colour = GOAL_TILE_COLOUR
                 elif self.searcher is not None and self.searcher.current_pos is not None and curr == self.searcher.current_pos:
                     tile_colour = ACTIVE_TILE_COLOUR
@@ -143,15 +298,82 @@ class MazeDrawer:
                 center_y_pxl = int(y_pxl + self.tile_inner_size / 2)
                 self.draw_circle_with_border(ctx, marker_colour, (center_x_pxl, center_y_pxl), self.marker_radius)
 
-        # Skip drawing the current neighbour if there's no searcher attached
-        if self.searcher is not None:
-            self.draw_current_neighbour(ctx)
+    def build_overview(self):
+        """
+        Builds the downsampled overview image of the maze, sampling one tile for every pixel of the overview
+        """
+        # Number of tiles each overview pixel covers, so the overview is never larger than OVERVIEW_MAX_SIZE
+        self.overview_stride = max(int(math.ceil(max(self.maze.dimensions.x, self.maze.dimensions.y) /
+                                                 OVERVIEW_MAX_SIZE)), 1)
+        width = int(math.ceil(self.maze.dimensions.x / self.overview_stride))
+        height = int(math.ceil(self.maze.dimensions.y / self.overview_stride))
+
+        # Fill an RGB pixel buffer with the colour of the sampled tile
+        pixels = bytearray(width * height * 3)
+        i = 0
+        for y in range(0, self.maze.dimensions.y, self.overview_stride):
+            for x in range(0, self.maze.dimensions.x, self.overview_stride):
+                wall, rough = self.maze.nodes[y][x]
+                if wall:
+                    pixels[i:i + 3] = bytes(WALL_TILE_COLOUR)
+                elif rough:
+                    pixels[i:i + 3] = bytes(ROUGH_TILE_COLOUR)
+                else:
+                    pixels[i:i + 3] = bytes(FLOOR_TILE_COLOUR)
+                i += 3
+
+        self.overview_surface = pygame.image.frombuffer(bytes(pixels), (width, height), "RGB")
+
+        # Always show the start and goals, even if they weren't sampled
+        self.overview_surface.set_at((self.maze.start.x // self.overview_stride,
+                                      self.maze.start.y // self.overview_stride), START_TILE_COLOUR)
+        for goal in self.maze.goals:
+            self.overview_surface.set_at((goal.x // self.overview_stride, goal.y // self.overview_stride),
+                                         GOAL_TILE_COLOUR)
+
+    def draw_overview(self, ctx: Context):
+        if self.overview_surface is None:
+            self.build_overview()
+
+        # Rescale the visible part of the overview only when the camera has moved
+        camera_state = (self.tile_size, self.camera_center)
+        if self.overview_cache is None or self.overview_cache[0] != camera_state:
+            # Overview pixels that cover the visible tiles
+            x_start, y_start, x_end, y_end = self.visible_tile_range()
+            src_x_start = x_start // self.overview_stride
+            src_y_start = y_start // self.overview_stride
+            src_x_end = int(math.ceil(x_end / self.overview_stride))
+            src_y_end = int(math.ceil(y_end / self.overview_stride))
+            if src_x_end <= src_x_start or src_y_end <= src_y_start:
+                return
+
+            # Pixel area of the screen those overview pixels cover
+            dest_x = self.draw_start_xy[0] + src_x_start * self.overview_stride * self.tile_size
+            dest_y = self.draw_start_xy[1] + src_y_start * self.overview_stride * self.tile_size
+            dest_width = max(int((src_x_end - src_x_start) * self.overview_stride * self.tile_size), 1)
+            dest_height = max(int((src_y_end - src_y_start) * self.overview_stride * self.tile_size), 1)
+
+            source = self.overview_surface.subsurface(
+                Rect(src_x_start, src_y_start, src_x_end - src_x_start, src_y_end - src_y_start))
+            self.overview_cache = (camera_state, pygame.transform.scale(source, (dest_width, dest_height)),
+                                   (int(dest_x), int(dest_y)))
+
+        ctx.surface.blit(self.overview_cache[1], self.overview_cache[2])
+
+        # Individual search markers are too small to see, only highlight the tile being visited
+        if self.searcher is not None and self.searcher.current_pos is not None:
+            x_pxl = int(self.draw_start_xy[0] + self.tile_size * self.searcher.current_pos.x)
+            y_pxl = int(self.draw_start_xy[1] + self.tile_size * self.searcher.current_pos.y)
+            pygame.draw.rect(ctx.surface, ACTIVE_TILE_COLOUR, (x_pxl, y_pxl, self.tile_inner_size,
+                                                               self.tile_inner_size))
 
     def draw_agent(self, ctx: Context, xy: tuple[float, float]):
         # Draws the agent given x,y float grid position
         x = self.draw_start_xy[0] + float(self.tile_size) * xy[0] + self.tile_size / 2.0
         y = self.draw_start_xy[1] + float(self.tile_size) * xy[1] + self.tile_size / 2.0
+        ctx.surface.set_clip(self.viewport_rect)
         self.draw_circle_with_border(ctx, AGENT_COLOUR, (x, y), self.agent_radius)
+        ctx.surface.set_clip(None)
 
     def draw_current_neighbour(self, ctx: Context):
         if self.searcher.current_neighbour_pos is None:
@@ -167,9 +389,48 @@ class MazeDrawer:
         pygame.draw.circle(ctx.surface, BORDER_COLOUR, xy, radius + float(self.tile_border_size) * 2.0)
         pygame.draw.circle(ctx.surface, colour, xy, radius)
 
+    def get_path_points(self) -> list[tuple[int, int]]:
+        """
+        Returns the pixel centres of the path tiles to draw, walking the path only when it has changed or the camera has
+        moved. Zoomed out, tiles that land on the same pixel as the one before are dropped, so the line never has more
+        points than the pixels it crosses. Zoomed in, only the tiles inside the viewport are kept
+        """
+        path = self.searcher.path
+        camera_state = (self.tile_size, self.camera_center)
+        if self.path_cache is not None and self.path_cache[0] is path and self.path_cache[1] == camera_state:
+            return self.path_cache[2]
+
+        points = []
+        if self.is_overview():
+            for xy in path:
+                point = (int(self.draw_start_xy[0] + self.tile_size * (xy.x + 0.5)),
+                         int(self.draw_start_xy[1] + self.tile_size * (xy.y + 0.5)))
+                if len(points) == 0 or points[-1] != point:
+                    points.append(point)
+        else:
+            x_start, y_start, x_end, y_end = self.visible_tile_range()
+            for xy in path:
+                if xy.x < x_start or xy.x >= x_end or xy.y < y_start or xy.y >= y_end:
+                    continue
+                points.append((int(self.draw_start_xy[0] + self.tile_size * (xy.x + 0.5)),
+                               int(self.draw_start_xy[1] + self.tile_size * (xy.y + 0.5))))
+
+        self.path_cache = (path, camera_state, points)
+        return points
+
     def draw_path(self, ctx: Context):
-        # Iterates over the path discovered by the search and draws new markers to highlight it
-        for xy in self.searcher.path:
-            x_pxl = int(self.draw_start_xy[0] + self.tile_size * (xy.x + 0.5))
-            y_pxl = int(self.draw_start_xy[1] + self.tile_size * (xy.y + 0.5))
-            self.draw_circle_with_border(ctx, PATH_MARKER_COLOUR, (x_pxl, y_pxl), self.marker_radius)
+        ctx.surface.set_clip(self.viewport_rect)
+        points = self.get_path_points()
+
+        # When zoomed out markers are too small to see, so the path is drawn as a line
+        if self.is_overview():
+            if len(points) > 1:
+                pygame.draw.lines(ctx.surface, PATH_MARKER_COLOUR, False, points, 2)
+            ctx.surface.set_clip(None)
+            return
+
+        # Draws new markers to highlight the path discovered by the search
+        for xy in points:
+            self.draw_circle_with_border(ctx, PATH_MARKER_COLOUR, xy, self.marker_radius)
+
+        ctx.surface.set_clip(None)
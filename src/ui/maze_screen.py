@@ -1,4 +1,3 @@
-import time
 from typing import Iterator
 import pygame
 from enum import Enum
@@ -7,11 +6,12 @@ import pygame_gui
 from pygame.math import clamp
 from pygame_gui.elements import UIButton, UILabel, UISelectionList, UIHorizontalSlider
 
+from src import benchmark
 from src.constants import *
 from src.context import Context
 from src.int2 import int2
-from src.search import dfs, astar, dijkstra, bfs
-from src.searcher import Searcher
+from src.search import dfs, astar, registry
+from src.searcher import Searcher, TIE_BREAK_LIFO, TIE_BREAKS
 from src.ui.maze_drawer import MazeDrawer
 
 
@@ -40,10 +40,24 @@ class MazeScreen:
     # Agents position for animating the agent on the path
     agent_position: tuple[float, float]
 
+    # Number of the paths published by an anytime search that have been shown
+    results_shown: int
+
+    # Nodes A* explores to find the optimal path, published paths report how many fewer nodes they took
+    astar_nodes_explored: int
+
+    # Data built from the maze by the algorithms that need it, kept for later searches of the maze
+    preprocessing: registry.MazePreprocessing
+
+    # How Dijkstra's and A* break ties between nodes of equal cost, one of TIE_BREAKS
+    tie_break: str
+
     # UI elements - storing only those that need referencing later
     start_button: UIButton
     back_button: UIButton
     benchmark_all_button: UIButton
+    profile_button: UIButton
+    tie_break_button: UIButton
     title_label: UILabel
     algo_selection_list: UISelectionList
     speed_slider: UIHorizontalSlider
@@ -69,6 +83,10 @@ class MazeScreen:
         self.maze_drawer.set_searcher(self.searcher)
         self.agent_position = None
         self.time_since_last_update = 0
+        self.results_shown = 0
+        self.astar_nodes_explored = None
+        self.preprocessing = registry.MazePreprocessing(ctx.active_maze)
+        self.tie_break = TIE_BREAK_LIFO
 
         self.title_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((50, 8), (500, 40)),
                                                        text="Press Start", manager=ctx.manager)
@@ -109,20 +127,27 @@ class MazeScreen:
         self.path_cost_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((570, 275), (200, 40)),
                                                            text="??", manager=ctx.manager)
 
-        pygame_gui.elements.UILabel(relative_rect=pygame.Rect((570, 305), (200, 40)),
-                                    text="SELECTED ALGORITHM", manager=ctx.manager)
+        # Cycles through the tie breaks used by Dijkstra's and A*
+        self.tie_break_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((570, 309), (200, 26)),
+                                                             text=f"TIES: {self.tie_break.upper()}",
+                                                             manager=ctx.manager)
+
+        # The scipy backend is only offered when scipy is installed
+        algorithms = registry.get_algorithm_names()
 
         self.algo_selection_list = pygame_gui.elements.UISelectionList(relative_rect=pygame.Rect((570, 337), (200, 86)),
-                                                                       item_list=["Depth-First Search",
-                                                                                  "Breadth-First Search", "Dijkstra's",
-                                                                                  "A*"],
+                                                                       item_list=algorithms,
                                                                        default_selection="Depth-First Search",
                                                                        manager=ctx.manager)
 
-        self.benchmark_all_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((570, 430), (200, 40)),
-                                                                 text="BENCHMARK ALL",
+        self.benchmark_all_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((570, 430), (110, 40)),
+                                                                 text="BENCHMARK",
                                                                  manager=ctx.manager)
 
+        self.profile_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((680, 430), (90, 40)),
+                                                           text="PROFILE",
+                                                           manager=ctx.manager)
+
         pygame_gui.elements.UILabel(relative_rect=pygame.Rect((570, 468), (200, 40)),
                                     text="SPEED", manager=ctx.manager)
 
@@ -140,31 +165,42 @@ class MazeScreen:
 
     def run(self, ctx: Context):
         # Called every frame when the screen is active
-        for event in pygame.event.get():
-            # Process Manager UI Events
-            ctx.manager.process_events(event)
-            # Process other events
-            if event.type == pygame.QUIT:
-                ctx.quit = True
-            elif event.type == pygame_gui.UI_BUTTON_PRESSED:
-                if event.ui_element == self.back_button:
-                    ctx.manager.clear_and_reset()
-                    ctx.set_screen_to(ctx.select_screen)
-                elif event.ui_element == self.start_button:
-                    algorithm = self.algo_selection_list.get_single_selection()
-                    self.set_algorithm_and_start(algorithm)
-                    self.title_label.set_text(f"Searching using {algorithm}...")
-                    print(
-                        f"\nSearching for path between {ctx.active_maze.start} and {ctx.active_maze.goal} using {algorithm}...\n")
-                elif event.ui_element == self.benchmark_all_button:
-                    self.run_benchmarks(ctx)
+        with ctx.frame_timer.phase("events"):
+            for event in pygame.event.get():
+                # Process Manager UI Events
+                ctx.manager.process_events(event)
+                # Process camera controls for panning and zooming the maze
+                self.maze_drawer.process_event(event)
+                # Process toggling of the frame timings overlay
+                ctx.frame_timer_overlay.process_event(event)
+                # Process other events
+                if event.type == pygame.QUIT:
+                    ctx.quit = True
+                elif event.type == pygame_gui.UI_BUTTON_PRESSED:
+                    if event.ui_element == self.back_button:
+                        ctx.manager.clear_and_reset()
+                        ctx.set_screen_to(ctx.select_screen)
+                    elif event.ui_element == self.start_button:
+                        algorithm = self.algo_selection_list.get_single_selection()
+                        self.set_algorithm_and_start(algorithm)
+                        self.title_label.set_text(f"Searching using {algorithm}...")
+                        print(
+                            f"\nSearching for path between {ctx.active_maze.start} and {ctx.active_maze.goals} using {algorithm}...\n")
+                    elif event.ui_element == self.benchmark_all_button:
+                        self.run_benchmarks(ctx)
+                    elif event.ui_element == self.profile_button:
+                        self.run_profile(ctx)
+                    elif event.ui_element == self.tie_break_button:
+                        self.tie_break = TIE_BREAKS[(TIE_BREAKS.index(self.tie_break) + 1) % len(TIE_BREAKS)]
+                        self.tie_break_button.set_text(f"TIES: {self.tie_break.upper()}")
 
         if self.state == MazeScreenState.SEARCHING:
             # Calculate time since last update, if past a threshold defined by the speed slider, update the searcher
             self.time_since_last_update += ctx.time_delta
             if self.time_since_last_update > self.speed_slider.get_current_value() / 300:
                 self.time_since_last_update = 0
-                step_result = self.searcher.step()
+                with ctx.frame_timer.phase("searcher.step"):
+                    step_result = self.searcher.step()
 
                 # Update the UI
                 self.nodes_explored_label.set_text(str(self.searcher.nodes_explored))
@@ -175,15 +211,21 @@ class MazeScreen:
                 # Print the result of the search step to console for debugging purposes
                 # print(step_result[1])
 
+                # Show any path an anytime search has published, it's drawn until a better one is published
+                if len(self.searcher.results) > self.results_shown:
+                    self.on_result_published()
+
                 # Update path length on UI and switch to animating movement if the search returns completed
                 if step_result[0]:
                     self.on_search_complete(ctx)
 
         # Draw the maze including its background and search progress
-        self.maze_drawer.draw_maze(ctx)
+        with ctx.frame_timer.phase("maze_drawer.draw_maze"):
+            self.maze_drawer.draw_maze(ctx)
 
         # Draws path if one exists
-        self.maze_drawer.draw_path(ctx)
+        with ctx.frame_timer.phase("maze_drawer.draw_path"):
+            self.maze_drawer.draw_path(ctx)
 
         # Update the agent position while animating movement, if it completes change state to IDLE
         if self.state == MazeScreenState.ANIMATING_MOVEMENT:
@@ -196,19 +238,17 @@ class MazeScreen:
 
     def set_algorithm_and_start(self, algorithm: str):
         # Set the function to be called by the searcher
-        if algorithm == "Depth-First Search":
-            self.searcher.set_algorithm(dfs.run)
-        elif algorithm == "Breadth-First Search":
-            self.searcher.set_algorithm(bfs.run)
-        elif algorithm == "Dijkstra's":
-            self.searcher.set_algorithm(dijkstra.run)
-        elif algorithm == "A*":
-            self.searcher.set_algorithm(astar.run)
-        else:
+        search_algorithm = registry.get_algorithm(algorithm, self.preprocessing, self.tie_break)
+        if search_algorithm is None:
             print("Please select an algorithm first")
             return
+        for message in self.preprocessing.pop_build_messages():
+            print(message)
+        self.searcher.set_algorithm(search_algorithm)
 
-        # Reset UI elements and set the state to SEARCHING
+        # Reset UI elements and set the state to SEARCHING, naming the tie break if it isn't the usual one
+        if self.tie_break != TIE_BREAK_LIFO and algorithm in registry.TIE_BREAK_ALGORITHM_NAMES:
+            algorithm = f"{algorithm} ({self.tie_break})"
         self.algorithm_label.set_text(algorithm)
         self.nodes_explored_label.set_text("0")
         self.path_length_label.set_text("??")
@@ -216,8 +256,23 @@ class MazeScreen:
         self.current_cost_label.set_text("0")
         self.current_depth_label.set_text("0")
         self.agent_position = None
+        self.results_shown = 0
         self.state = MazeScreenState.SEARCHING
 
+    def on_result_published(self):
+        # A* only needs running once per maze to compare against
+        if self.astar_nodes_explored is None:
+            reference = Searcher(self.searcher.maze)
+            reference.run_search(astar.run)
+            self.astar_nodes_explored = reference.nodes_explored
+
+        result = self.searcher.results[-1]
+        self.results_shown = len(self.searcher.results)
+        self.path_length_label.set_text(str(len(result.path) - 1))
+        self.path_cost_label.set_text(str(result.path_cost))
+        print(f"Published path {self.results_shown}: {result}, "
+              f"{self.astar_nodes_explored - result.expansions} fewer than A*")
+
     def on_search_complete(self, ctx: Context):
         # Update path length label
         path_length = len(self.searcher.path)
@@ -227,46 +282,21 @@ class MazeScreen:
         self.current_cost_label.set_text("-")
 
         # Print output to console
-        print(f"\n==== SEARCH COMPLETE ====")
-        print(f"Maze: {ctx.active_maze.file_name}")
-        print(f"Algorithm: {self.algorithm_label.text}")
-        print(f"Start: {ctx.active_maze.start}")
-        print(f"Goal: {ctx.active_maze.goal}")
-        print(f"Nodes Explored: {self.searcher.nodes_explored}")
-        print(f"Path Length: {str(path_length - 1) if path_length != 0 else 'NO PATH FOUND'}")
-        print(f"Path Cost: {str(self.searcher.path_cost) if path_length != 0 else 'NO PATH FOUND'}\n")
-
-        # Begin animation
-        self.movement_iter = iter(animate_movement(ctx, self.searcher.path, self))
+        self.searcher.print_results(self.algorithm_label.text)
+
+        # Begin animation, the animation steps through the tiles by index so they're made once up front
+        self.movement_iter = iter(animate_movement(ctx, list(self.searcher.path), self))
         self.state = MazeScreenState.ANIMATING_MOVEMENT
 
     # Run through all the different algorithms on the maze, printing the results to the console
     def run_benchmarks(self, ctx: Context):
-        print("\n\n==== RUNNING BENCHMARKS USING ALL SEARCH ALGORITHMS ====")
-        print(f"Maze: {ctx.active_maze.file_name}")
-        print(f"Start: {ctx.active_maze.start}")
-        print(f"Goal: {ctx.active_maze.goal}")
-        self.run_benchmark(ctx, dfs.run, "Depth-First Search")
-        self.run_benchmark(ctx, bfs.run, "Breadth-First Search")
-        self.run_benchmark(ctx, dijkstra.run, "Dijkstra's")
-        self.run_benchmark(ctx, astar.run, "A*")
-
-    def run_benchmark(self, ctx: Context, algorithm, algorithm_name: str):
-        num_runs = 50
-
-        timer = time.perf_counter()
+        benchmark.run_benchmarks(self.searcher, self.tie_break)
 
-        for x in range(num_runs):
-            self.searcher.run_search(algorithm)
-
-        average_time = (time.perf_counter() - timer) * 1000 / num_runs
-
-        path_length = len(self.searcher.path)
-        print(f"\n== {algorithm_name} ==")
-        print(f"Nodes Explored: {self.searcher.nodes_explored}")
-        print(f"Path Length: {str(path_length - 1) if path_length != 0 else 'NO PATH FOUND'}")
-        print(f"Path Cost: {str(self.searcher.path_cost) if path_length != 0 else 'NO PATH FOUND'}")
-        print(f"Operate time (average over {num_runs} runs): {average_time:0.3F} ms")
+    # Run the selected algorithm on the maze under the profiler, saving the profile and printing its hotspots
+    def run_profile(self, ctx: Context):
+        algorithm = self.algo_selection_list.get_single_selection()
+        benchmark.run_profiles(self.searcher, [algorithm])
+        self.title_label.set_text(f"Profiled {algorithm}, see console")
 
 
 def animate_movement(ctx: Context, path: list[int2], maze_screen: MazeScreen):
@@ -61,27 +61,33 @@ class SelectScreen:
     def run(self, ctx: Context):
 
         # Called every frame when the screen is active
-        for event in pygame.event.get():
-            # Process Manager UI Events
-            ctx.manager.process_events(event)
-            # Process other events
-            if event.type == pygame.QUIT:
-                ctx.quit = True
-
-            # Load new maze based on maze_selection_list.get_single_selection()
-            elif event.type == pygame_gui.UI_BUTTON_PRESSED:
-                if event.ui_element == self.load_button:
-                    # Clears UI elements and switches to the maze screen when the user clicks Load
-                    ctx.manager.clear_and_reset()
-                    ctx.set_screen_to(ctx.maze_screen)
-
-            # UI selection of maze type displayed to screen
-            if event.type == pygame_gui.UI_SELECTION_LIST_NEW_SELECTION:
-                if event.ui_element == self.maze_selection_list:
-                    # Look up maze from selection
-                    ctx.active_maze = ctx.mazes[self.maze_selection_list.get_single_selection()]
-                    # Create new drawer
-                    self.drawer = MazeDrawer(ctx.active_maze)
+        with ctx.frame_timer.phase("events"):
+            for event in pygame.event.get():
+                # Process Manager UI Events
+                ctx.manager.process_events(event)
+                # Process camera controls for panning and zooming the maze
+                self.drawer.process_event(event)
+                # Process toggling of the frame timings overlay
+                ctx.frame_timer_overlay.process_event(event)
+                # Process other events
+                if event.type == pygame.QUIT:
+                    ctx.quit = True
+
+                # Load new maze based on maze_selection_list.get_single_selection()
+                elif event.type == pygame_gui.UI_BUTTON_PRESSED:
+                    if event.ui_element == self.load_button:
+                        # Clears UI elements and switches to the maze screen when the user clicks Load
+                        ctx.manager.clear_and_reset()
+                        ctx.set_screen_to(ctx.maze_screen)
+
+                # UI selection of maze type displayed to screen
+                if event.type == pygame_gui.UI_SELECTION_LIST_NEW_SELECTION:
+                    if event.ui_element == self.maze_selection_list:
+                        # Look up maze from selection
+                        ctx.active_maze = ctx.mazes[self.maze_selection_list.get_single_selection()]
+                        # Create new drawer
+                        self.drawer = MazeDrawer(ctx.active_maze)
 
         # Draw Maze to screen by calling draw_maze()
-        self.drawer.draw_maze(ctx)
+        with ctx.frame_timer.phase("maze_drawer.draw_maze"):
+            self.drawer.draw_maze(ctx)
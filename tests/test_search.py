@@ -0,0 +1,196 @@
+import os
+
+import pytest
+
+from src import maze_loader, paths, checkpoint, service
+from src.int2 import int2
+from src.maze import Maze
+from src.searcher import Searcher, TIE_BREAKS
+from src.search import registry, dijkstra
+
+# Directory of the mazes bundled with the project, found from this file so the tests don't depend on where they're run
+MAZE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mazes")
+
+# Engines that always find the cheapest path, checked against Dijkstra's. SMA* is left out as it's only optimal when
+# its node budget fits the path
+OPTIMAL_ALGORITHM_NAMES = ["A*", "A* (landmarks)", "A* (pruned maze)", "ARA*", "IDA*", "Path Database",
+                           "Contraction Hierarchy", registry.SCIPY_ALGORITHM_NAME]
+
+# Mazes the checkpoint tests stop and resume searches on, a large perfect maze and an open one with rough terrain
+CHECKPOINT_MAZE_NAMES = ["51x51 Perfect Maze", "20x20 Island Maze"]
+
+
+@pytest.fixture(scope="module")
+def mazes() -> dict[str, Maze]:
+    """
+    The bundled mazes, parsed once for every test in the module
+    """
+    mazes = {}
+    for file_name in sorted(os.listdir(MAZE_DIRECTORY)):
+        if file_name.endswith(".txt"):
+            maze = maze_loader.parse_file(os.path.join(MAZE_DIRECTORY, file_name))
+            mazes[maze.file_name] = maze
+    return mazes
+
+
+def run_dijkstra(maze: Maze) -> Searcher:
+    """
+    Returns a searcher that has run Dijkstra's on the maze, the reference every optimal engine is checked against
+    """
+    searcher = Searcher(maze)
+    searcher.run_search(dijkstra.run)
+    return searcher
+
+
+@pytest.mark.parametrize("algorithm_name", OPTIMAL_ALGORITHM_NAMES)
+def test_optimal_engines_match_dijkstra(mazes, algorithm_name, tmp_path, monkeypatch):
+    if algorithm_name not in registry.get_algorithm_names():
+        pytest.skip(f"{algorithm_name} isn't available")
+
+    # The path database is saved next to the mazes, so it's kept out of the bundled mazes
+    monkeypatch.setattr(maze_loader, "MAZE_DIRECTORY", str(tmp_path))
+
+    for name, maze in mazes.items():
+        expected = run_dijkstra(maze)
+        searcher = Searcher(maze)
+        searcher.run_search(registry.get_algorithm(algorithm_name, registry.MazePreprocessing(maze)))
+        assert searcher.path_cost == expected.path_cost, name
+        assert len(searcher.path) == 0 or searcher.path[-1] in maze.goals, name
+
+
+@pytest.mark.parametrize("tie_break", TIE_BREAKS)
+@pytest.mark.parametrize("algorithm_name", checkpoint.CHECKPOINT_ALGORITHM_NAMES)
+def test_checkpoint_resume_matches_full_search(mazes, algorithm_name, tie_break, tmp_path):
+    file_path = str(tmp_path / "search.checkpoint")
+    for name in CHECKPOINT_MAZE_NAMES:
+        maze = mazes[name]
+        algorithm = checkpoint.get_algorithm(algorithm_name, checkpoint.get_epsilon(algorithm_name),
+                                             tie_break=tie_break)
+        full_searcher = Searcher(maze)
+        full_stats = full_searcher.run_search(algorithm)
+
+        # Run until half the nodes have been explored, then save at the next expansion
+        checkpointer = checkpoint.Checkpointer(file_path, algorithm_name, tie_break=tie_break)
+        stopped_searcher = Searcher(maze)
+        iterator = iter(algorithm(stopped_searcher))
+        for done, message in iterator:
+            if done or stopped_searcher.nodes_explored >= full_searcher.nodes_explored // 2:
+                break
+        stopped_searcher.checkpointer = checkpointer
+        checkpointer.next_save = 0.0
+        for done, message in iterator:
+            if done or checkpointer.saves > 0:
+                break
+        iterator.close()
+        assert checkpointer.saves == 1, name
+
+        resumed_searcher, resumed_algorithm, resumed_name = checkpoint.load(file_path, maze)
+        resumed_searcher.run_search(resumed_algorithm)
+        assert resumed_name == algorithm_name
+        assert resumed_searcher.priority_queue.tie_break == tie_break or algorithm_name in \
+            ["Depth-First Search", "Breadth-First Search"]
+        assert resumed_searcher.path == full_searcher.path, name
+        assert resumed_searcher.path_cost == full_searcher.path_cost, name
+        assert resumed_searcher.nodes_explored == full_searcher.nodes_explored, name
+        assert resumed_searcher.stats.pushes == full_stats.pushes, name
+        assert resumed_searcher.stats.pops == full_stats.pops, name
+
+
+def test_checkpoint_rejects_a_different_maze(mazes, tmp_path):
+    file_path = str(tmp_path / "search.checkpoint")
+    searcher = Searcher(mazes["20x20 Island Maze"])
+    searcher.run_search(dijkstra.run)
+    checkpoint.save(searcher, file_path, "Dijkstra's")
+    with pytest.raises(Exception):
+        checkpoint.load(file_path, mazes["20x20 Empty Maze"])
+
+
+def test_path_round_trips_through_bytes(mazes):
+    for name, maze in mazes.items():
+        path = run_dijkstra(maze).path
+        unpacked = paths.from_bytes(path.to_bytes())
+        assert unpacked == path, name
+        assert list(unpacked) == list(path), name
+        assert unpacked.cost == path.cost, name
+
+
+def test_path_packs_long_runs_and_turns():
+    # A straight line longer than a run fits in a byte is stored as runs, a staircase as packed moves
+    straight = [int2(x, 0) for x in range(300)]
+    staircase = [int2((i + 1) // 2, i // 2) for i in range(41)]
+    for positions in (straight, staircase):
+        path = paths.from_positions(positions, len(positions) - 1)
+        unpacked = paths.from_bytes(path.to_bytes())
+        assert list(unpacked) == positions
+        assert len(unpacked) == len(positions)
+        assert unpacked.cost == len(positions) - 1
+        assert unpacked[len(positions) // 2] == positions[len(positions) // 2]
+    assert len(paths.from_positions(straight, 299).to_bytes()) < len(paths.pack_moves([2] * 299))
+
+
+def test_empty_path_round_trips_through_bytes():
+    unpacked = paths.from_bytes(paths.Path().to_bytes())
+    assert len(unpacked) == 0
+    assert list(unpacked) == []
+
+
+def test_path_rejects_tiles_that_are_not_next_to_each_other():
+    with pytest.raises(Exception):
+        paths.from_positions([int2(0, 0), int2(2, 0)], 2)
+
+
+def find_wall(maze: Maze) -> list[int]:
+    """
+    Returns the first wall of the maze as [x, y]
+    """
+    for y in range(maze.dimensions.y):
+        for x in range(maze.dimensions.x):
+            if maze.is_wall(int2(x, y)):
+                return [x, y]
+    raise Exception(f"Maze '{maze.file_name}' has no walls")
+
+
+def test_service_rejects_invalid_queries(mazes):
+    search_service = service.SearchService(mazes, workers=1, processes=False)
+    maze_name = "10x11 Sample Maze"
+    maze = mazes[maze_name]
+    invalid_queries = [
+        [maze_name],
+        {"maze": "No Such Maze"},
+        {"maze": maze_name, "algorithm": "No Such Algorithm"},
+        {"maze": maze_name, "start": [True, 1]},
+        {"maze": maze_name, "start": [1.0, 1]},
+        {"maze": maze_name, "start": ["1", 1]},
+        {"maze": maze_name, "start": [1, 1, 1]},
+        {"maze": maze_name, "start": [-1, 1]},
+        {"maze": maze_name, "start": [maze.dimensions.x, 1]},
+        {"maze": maze_name, "start": find_wall(maze)},
+        {"maze": maze_name, "goals": []},
+        {"maze": maze_name, "goals": [1, 1]},
+        {"maze": maze_name, "goals": "[[1, 1]]"},
+        {"maze": maze_name, "goals": [find_wall(maze)]},
+    ]
+    for query in invalid_queries:
+        with pytest.raises(Exception):
+            search_service.submit(query)
+    assert search_service.pending.empty()
+
+
+def test_service_answers_valid_queries(mazes):
+    search_service = service.SearchService(mazes, workers=2, processes=False)
+    search_service.start()
+    try:
+        client = service.LocalClient(search_service)
+        maze_name = "20x20 Island Maze"
+        maze = mazes[maze_name]
+        answer = client.find_path(maze_name)
+        assert answer["cost"] == run_dijkstra(maze).path_cost
+
+        # A query with its own start and goal is searched on a copy of the maze with them
+        goal, edge_cost = maze.get_neighbours(maze.start)[0]
+        start = [maze.start.x, maze.start.y]
+        answer = client.find_path(maze_name, "Dijkstra's", start, [[goal.x, goal.y]])
+        assert answer["cost"] == edge_cost
+        assert answer["path"] == [start, [goal.x, goal.y]]
+    finally:
+        search_service.stop()